@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+#
+# run.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Benchmarks of review arithmetic and summary construction.
+
+Run `python benchmarks/run.py` from the top directory of the repository.
+Results are printed and, with `--output`, saved as a JSON file. Giving
+a saved file with `--baseline` compares the results with it and exits with
+status 1 if a benchmark becomes slower than the threshold.
+
+Examples:
+  python benchmarks/run.py --output baseline.json
+  python benchmarks/run.py --baseline baseline.json --threshold 1.2
+"""
+from __future__ import absolute_import, division, print_function
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from review.approximate import approximate
+from review.histogram import Bins
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+from review.summation import MODES
+from review.summation import RunningSum
+
+
+SIZES = (10, 1000, 100000, 1000000)
+"""Default numbers of reviews."""
+
+BINS = (5, 100)
+"""Default numbers of bins."""
+
+BENCHMARKS = []
+"""Collection of pairs of a name and a function to prepare a benchmark."""
+
+
+def benchmark(name):
+    """Register a function preparing a benchmark.
+
+    The decorated function takes the number of reviews and the number of
+    bins, and returns a function without arguments to be timed.
+
+    Args:
+      name: name of the benchmark.
+    """
+    def decorator(func):
+        """Register the function."""
+        BENCHMARKS.append((name, func))
+        return func
+    return decorator
+
+
+def _scores(n, bins):
+    """Random integer ratings."""
+    return [random.randint(1, bins) for _ in range(n)]
+
+
+@benchmark("AverageReview.__add__")
+def _average_add(n, _):
+    reviews = [AverageReview(random.random()) for _ in range(n)]
+    return lambda: sum(reviews[1:], reviews[0])
+
+
+@benchmark("AverageReview.__rmul__")
+def _average_rmul(n, _):
+    reviews = [AverageReview(random.random()) for _ in range(n)]
+    return lambda: [2.5 * r for r in reviews]
+
+
+@benchmark("AverageReview.score")
+def _average_score(n, _):
+    reviews = [AverageReview(random.random()) for _ in range(n)]
+    return lambda: [r.score for r in reviews]
+
+
+@benchmark("AverageSummary.__init__")
+def _average_summary(n, _):
+    reviews = [AverageReview(random.random()) for _ in range(n)]
+    return lambda: AverageSummary(reviews)
+
+
+@benchmark("AverageSummary.__init__[ReviewArray]")
+def _average_summary_array(n, _):
+    reviews = ReviewArray(np.random.rand(n))
+    return lambda: AverageSummary(reviews)
+
+
+@benchmark("AverageSummary.difference")
+def _average_difference(n, _):
+    reviews = [AverageReview(random.random()) for _ in range(n)]
+    summary = AverageSummary(reviews)
+    return lambda: [summary.difference(r) for r in reviews]
+
+
+@benchmark("AverageSummary.differences")
+def _average_differences(n, _):
+    reviews = ReviewArray(np.random.rand(n))
+    summary = AverageSummary(reviews)
+    return lambda: summary.differences(reviews)
+
+
+@benchmark("HistoReview.__add__")
+def _histo_add(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    return lambda: sum(reviews[1:], reviews[0])
+
+
+@benchmark("HistoReview.__rmul__")
+def _histo_rmul(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    return lambda: [2.5 * r for r in reviews]
+
+
+@benchmark("HistoReview.inner_product")
+def _histo_inner_product(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    other = HistoSummary(reviews)._histo
+    return lambda: [other.inner_product(r) for r in reviews]
+
+
+@benchmark("HistoReview.score")
+def _histo_score(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    return lambda: [r.score for r in reviews]
+
+
+@benchmark("HistoSummary.__init__")
+def _histo_summary(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    return lambda: HistoSummary(reviews)
+
+
+@benchmark("HistoSummary.__init__[dense]")
+def _histo_summary_dense(n, bins):
+    domain = Bins(range(1, bins + 1))
+    reviews = [DenseHistoReview(v, bins=domain) for v in _scores(n, bins)]
+    return lambda: HistoSummary(reviews)
+
+
+@benchmark("HistoSummary.difference")
+def _histo_difference(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    summary = HistoSummary(reviews)
+    return lambda: [summary.difference(r) for r in reviews]
+
+
+@benchmark("HistoSummary.differences")
+def _histo_differences(n, bins):
+    reviews = [HistoReview(v) for v in _scores(n, bins)]
+    summary = HistoSummary(reviews)
+    return lambda: summary.differences(reviews)
+
+
+@benchmark("approximate[ndarray]")
+def _approximate(n, _):
+    scores = np.random.rand(n * 10)
+    return lambda: approximate(scores, threshold=100, size=100)
+
+
+def _summation(mode):
+    """Create functions preparing benchmarks of a summation mode."""
+    def running_sum(n, _):
+        values = np.random.rand(n)
+        return lambda: RunningSum(mode).add(values).value
+
+    def stream(n, _):
+        scores = np.random.rand(n).tolist()
+        return lambda: AverageSummary.from_stream(scores, summation=mode)
+
+    return running_sum, stream
+
+
+for _mode in MODES:
+    _running_sum, _stream = _summation(_mode)
+    benchmark("RunningSum.add[{0}]".format(_mode))(_running_sum)
+    benchmark("AverageSummary.from_stream[{0}]".format(_mode))(_stream)
+
+
+def measure(func, repeat, min_time):
+    """Measure running time of a function.
+
+    The function is called enough times so that each measurement takes at
+    least `min_time` seconds.
+
+    Args:
+      func: a function without arguments.
+      repeat: the number of measurements.
+      min_time: the minimum duration of a measurement in seconds.
+
+    Returns:
+      a dict of the best and the mean time of one call in seconds, and the
+      number of calls in each measurement.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 10
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return {"best": min(times), "mean": sum(times) / len(times), "number": number}
+
+
+def run(sizes, bins, pattern=None, repeat=3, min_time=.2, seed=0):
+    """Run benchmarks.
+
+    Args:
+      sizes: numbers of reviews.
+      bins: numbers of bins of histograms.
+      pattern: if given, run only benchmarks of which name contains it.
+      repeat: the number of measurements of each benchmark.
+      min_time: the minimum duration of a measurement in seconds.
+      seed: seed of random numbers.
+
+    Returns:
+      a dict mapping benchmark IDs to results of :func:`measure`.
+    """
+    res = {}
+    for name, prepare in BENCHMARKS:
+        if pattern and pattern not in name:
+            continue
+        for n in sizes:
+            for b in (bins if name.startswith("Histo") else bins[:1]):
+                random.seed(seed)
+                np.random.seed(seed)
+                key = "{0}[n={1},bins={2}]".format(name, n, b)
+                res[key] = measure(prepare(n, b), repeat, min_time)
+                print("{0:<60} {1:12.3e} s".format(key, res[key]["best"]))
+                sys.stdout.flush()
+    return res
+
+
+def compare(results, baseline, threshold):
+    """Compare results with a baseline.
+
+    Args:
+      results: a dict returned by :func:`run`.
+      baseline: a dict returned by :func:`run` in a previous run.
+      threshold: the maximum allowed ratio of the best time to the baseline.
+
+    Returns:
+      a list of benchmark IDs slower than the threshold.
+    """
+    slower = []
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        ratio = results[key]["best"] / baseline[key]["best"]
+        mark = ""
+        if ratio > threshold:
+            slower.append(key)
+            mark = " <- slower"
+        print("{0:<60} {1:8.2f}x{2}".format(key, ratio, mark))
+    return slower
+
+
+def main():
+    """The main function.
+
+    Returns:
+      Status code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of review arithmetic and summaries.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES,
+        help="numbers of reviews (default: %(default)s)")
+    parser.add_argument(
+        "--bins", type=int, nargs="+", default=BINS,
+        help="numbers of bins of histograms (default: %(default)s)")
+    parser.add_argument(
+        "--filter", dest="pattern",
+        help="run only benchmarks of which name contains this string")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="the number of measurements (default: %(default)s)")
+    parser.add_argument(
+        "--min-time", type=float, default=.2,
+        help="minimum seconds of a measurement (default: %(default)s)")
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--baseline", help="compare results with this JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2,
+        help="allowed slowdown ratio against the baseline (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = run(
+        args.sizes, args.bins, args.pattern, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump({
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "results": results,
+            }, fp, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
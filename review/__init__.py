@@ -35,12 +35,44 @@ This module has the following aliases:
 
 - :class:`AverageReview <review.scalar.AverageReview>`
 - :class:`AverageSummary <review.scalar.AverageSummary>`
+- :class:`ReviewArray <review.scalar.ReviewArray>`
+- :class:`IncrementalAverageSummary <review.scalar.IncrementalAverageSummary>`
+- :class:`WeightedAverageSummary <review.scalar.WeightedAverageSummary>`
+- :class:`AverageAccumulator <review.scalar.AverageAccumulator>`
+- :class:`DistributionSummary <review.sketch.DistributionSummary>`
 - :class:`HistoReview <review.histogram.HistoReview>`
 - :class:`HistoSummary <review.histogram.HistoSummary>`
+- :class:`DenseHistoReview <review.histogram.DenseHistoReview>`
+- :class:`OneHotHistoReview <review.histogram.OneHotHistoReview>`
+- :class:`Bins <review.histogram.Bins>`
+- :class:`IncrementalHistoSummary <review.histogram.IncrementalHistoSummary>`
+- :class:`WeightedHistoSummary <review.histogram.WeightedHistoSummary>`
+- :class:`HistoAccumulator <review.histogram.HistoAccumulator>`
+- :class:`HistoMatrix <review.histogram.HistoMatrix>`
+- :class:`AverageTimeline <review.timeline.AverageTimeline>`
+- :class:`HistoTimeline <review.timeline.HistoTimeline>`
+- :func:`summarize_many <review.parallel.summarize_many>`
+- :class:`ReviewStore <review.store.ReviewStore>`
 
 """
 from __future__ import absolute_import
 from review.scalar import AverageReview
 from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+from review.scalar import IncrementalAverageSummary
+from review.scalar import WeightedAverageSummary
+from review.scalar import AverageAccumulator
+from review.sketch import DistributionSummary
 from review.histogram import HistoReview
 from review.histogram import HistoSummary
+from review.histogram import DenseHistoReview
+from review.histogram import OneHotHistoReview
+from review.histogram import Bins
+from review.histogram import IncrementalHistoSummary
+from review.histogram import WeightedHistoSummary
+from review.histogram import HistoAccumulator
+from review.histogram import HistoMatrix
+from review.timeline import AverageTimeline
+from review.timeline import HistoTimeline
+from review.parallel import summarize_many
+from review.store import ReviewStore
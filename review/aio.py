@@ -0,0 +1,276 @@
+#
+# aio.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Asyncio component keeping summaries of products current.
+
+:class:`SummaryUpdater` receives `(product, review)` events, collects them
+into micro batches, and adds each batch to incremental summaries of the
+products with their vectorized `extend` methods. Events are buffered in
+a bounded :class:`asyncio.Queue`, so producers awaiting :meth:`put` or
+:meth:`consume` slow down when the updater falls behind.
+
+If a batch fails, e.g. it has a review of a wrong type, the error is
+raised to producers and to :meth:`SummaryUpdater.flush`, and later events
+are drained without being applied, so that summaries keep their state at
+the failure.
+
+Example::
+
+  async def mine(feed):
+      async with SummaryUpdater(IncrementalHistoSummary) as updater:
+          await updater.consume(feed)
+          summaries = await updater.snapshot()
+
+This module requires Python 3.5 or later.
+"""
+import asyncio
+from collections import OrderedDict
+
+from review.histogram import HistoSummary
+from review.histogram import IncrementalHistoSummary
+from review.scalar import AverageSummary
+from review.scalar import IncrementalAverageSummary
+
+
+class SummaryUpdater(object):
+    """Per-product summaries updated from a stream of review events.
+
+    A batch is applied when `batch_size` events are collected or `window`
+    seconds have passed since the first event of the batch arrived.
+
+    Args:
+      summary_cls: IncrementalAverageSummary, IncrementalHistoSummary, or
+        their subclass (default: IncrementalAverageSummary).
+      window: the maximum seconds an event waits for other events of its
+        batch (default: 0.01).
+      batch_size: the maximum number of events in a batch (default: 1024).
+      maxsize: the maximum number of events buffered before producers are
+        blocked (default: 8192).
+      bins: bins of histogram summaries; see :class:`HistoSummary`
+        (default: None).
+    """
+    __slots__ = (
+        "_summary_cls", "_window", "_batch_size", "_maxsize", "_bins",
+        "_summaries", "_queue", "_task", "_error")
+
+    def __init__(self, summary_cls=IncrementalAverageSummary, window=0.01,
+                 batch_size=1024, maxsize=8192, bins=None):
+        if not isinstance(summary_cls, type) or not issubclass(
+                summary_cls,
+                (IncrementalAverageSummary, IncrementalHistoSummary)):
+            raise TypeError(
+                "{0} is not an incremental summary class.".format(summary_cls))
+        if batch_size < 1:
+            raise ValueError(
+                "batch_size must be positive: {0}".format(batch_size))
+        if bins is not None and issubclass(summary_cls, AverageSummary):
+            raise ValueError("bins are not used by scalar summaries.")
+        self._summary_cls = summary_cls
+        self._window = window
+        self._batch_size = batch_size
+        self._maxsize = maxsize
+        self._bins = bins
+        self._summaries = {}
+        self._queue = None
+        self._task = None
+        self._error = None
+
+    @property
+    def pending(self):
+        """The number of events not applied yet."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def __len__(self):
+        return len(self._summaries)
+
+    async def start(self):
+        """Start the task applying batches.
+
+        The queue is created here, so that it belongs to the running loop.
+        """
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(self._maxsize)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        """Apply buffered events and stop the task.
+
+        The task is stopped even if applying events failed; the error is
+        raised after that.
+        """
+        if self._task is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def put(self, product, review):
+        """Add an event, waiting while the buffer is full.
+
+        Args:
+          product: a product ID.
+          review: a review or a rating of the product.
+        """
+        self._check()
+        await self._queue.put((product, review))
+
+    def put_nowait(self, product, review):
+        """Add an event without waiting.
+
+        Raises:
+          asyncio.QueueFull: if the buffer is full.
+        """
+        self._check()
+        self._queue.put_nowait((product, review))
+
+    async def consume(self, events):
+        """Add all events of an async iterator.
+
+        Args:
+          events: an async iterator of `(product, review)` pairs.
+
+        Returns:
+          the number of consumed events.
+        """
+        n = 0
+        async for product, review in events:
+            await self.put(product, review)
+            n += 1
+        return n
+
+    async def flush(self):
+        """Wait until all buffered events are applied.
+        """
+        self._check()
+        await self._queue.join()
+        self._check()
+
+    async def snapshot(self, products=None):
+        """Summaries including all events given before the call.
+
+        Args:
+          products: an iterable of product IDs (default: all products).
+
+        Returns:
+          a dict mapping product IDs to :class:`AverageSummary` or
+          :class:`HistoSummary`. They are copies and are not updated
+          afterward.
+        """
+        await self.flush()
+        if products is None:
+            products = list(self._summaries)
+        res = OrderedDict()
+        for p in products:
+            s = self._summaries.get(p)
+            if s is not None:
+                res[p] = self._freeze(s)
+        return res
+
+    def _freeze(self, summary):
+        """Immutable copy of an incremental summary.
+        """
+        if isinstance(summary, IncrementalHistoSummary):
+            return HistoSummary._from_sums(
+                summary.count, summary.total,
+                {k: list(p) for k, p in summary._partials.items()})
+        return AverageSummary._from_sums(
+            summary.count, summary.total, list(summary._partials))
+
+    def _check(self):
+        """Raise an error if the updater is not running or has failed.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._task is None:
+            raise RuntimeError("the updater is not started.")
+
+    async def _run(self):
+        """Collect events into batches and apply them.
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._window
+            while len(batch) < self._batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # After a failure, events are only drained so that summaries
+            # keep the state at the failure and producers aren't blocked.
+            if self._error is None:
+                self._error = _failure(self._apply, batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _apply(self, batch):
+        """Add a batch of events to summaries.
+        """
+        groups = OrderedDict()
+        for product, review in batch:
+            groups.setdefault(product, []).append(review)
+        for product, reviews in groups.items():
+            summary = self._summaries.get(product)
+            if summary is None:
+                summary = self._new_summary()
+            summary.extend(reviews)
+            self._summaries[product] = summary
+
+    def _new_summary(self):
+        """Create an empty summary.
+        """
+        if self._bins is not None:
+            return self._summary_cls(bins=self._bins)
+        return self._summary_cls()
+
+
+def _failure(func, *args):
+    """Call a function and return the exception it raised, or None.
+
+    The exception is caught in this plain function rather than in the
+    running coroutine, so that its traceback doesn't hold the frame of the
+    coroutine, and clearing frames of the re-raised error can't close it.
+    """
+    try:
+        func(*args)
+    except Exception as e:  # pylint: disable=broad-except
+        return e
+    return None
@@ -0,0 +1,536 @@
+#
+# approximate.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Summaries estimated from uniform samples of reviews.
+
+:class:`SampledAverageSummary` and :class:`SampledHistoSummary` compute
+summaries from at most `size` reviews sampled uniformly without
+replacement, and report standard errors of the estimates.
+Reviews given as arrays or sequences are sampled by their indexes, so that
+only sampled reviews are read; other iterables are read once into
+a :class:`Reservoir`.
+
+:func:`approximate` chooses an exact summary for products having at most
+`threshold` reviews and a sampled summary for the others.
+"""
+from __future__ import absolute_import
+import math
+
+import numpy as np
+
+from review.histogram import Bins
+from review.histogram import DenseHistoReview
+from review.histogram import HistoMatrix
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import _share_bins
+from review.scalar import AverageSummary
+from review.scalar import CHUNKSIZE
+from review.scalar import ReviewArray
+from review.scalar import _to_array
+from review.summation import NAIVE
+from review.summation import PAIRWISE
+
+
+SAMPLE_SIZE = 1000
+"""Default number of sampled reviews."""
+
+THRESHOLD = 10000
+"""Default number of reviews over which :func:`approximate` samples."""
+
+
+class Reservoir(object):
+    """Uniform sample of a stream without replacement.
+
+    The reservoir keeps the first `size` items, and then the i-th item
+    replaces a random item of the sample with probability `size / i`.
+    Chunks of items are processed as vectorized random draws, and only
+    accepted items are copied.
+
+    Args:
+      size: the maximum number of sampled items.
+      seed: a seed of random sampling (default: None).
+    """
+    __slots__ = ("_size", "_sample", "_n", "_random")
+
+    def __init__(self, size=SAMPLE_SIZE, seed=None):
+        if size < 1:
+            raise ValueError("size must be positive: {0}".format(size))
+        self._size = size
+        self._sample = []
+        self._n = 0
+        self._random = np.random.RandomState(seed)
+
+    @property
+    def size(self):
+        """The maximum number of sampled items."""
+        return self._size
+
+    @property
+    def count(self):
+        """The number of items given to this reservoir."""
+        return self._n
+
+    @property
+    def sample(self):
+        """List of sampled items."""
+        return self._sample
+
+    def __len__(self):
+        return len(self._sample)
+
+    def add(self, item):
+        """Add an item.
+
+        Returns:
+          this reservoir.
+        """
+        return self.extend([item])
+
+    def extend(self, items):
+        """Add a sequence of items.
+
+        Args:
+          items: a list or an array of items.
+
+        Returns:
+          this reservoir.
+        """
+        m = len(items)
+        fill = max(0, min(self._size - self._n, m))
+        self._sample.extend(items[i] for i in range(fill))
+        if fill < m:
+            positions = np.arange(self._n + fill + 1, self._n + m + 1)
+            slots = (self._random.random_sample(m - fill) * positions).astype(
+                np.int64)
+            for i in np.flatnonzero(slots < self._size):
+                self._sample[slots[i]] = items[fill + i]
+        self._n += m
+        return self
+
+    def merge(self, other):
+        """Add items sampled by another reservoir.
+
+        The merged sample is a uniform sample of the items given to both
+        reservoirs.
+
+        Args:
+          other: a Reservoir.
+
+        Returns:
+          this reservoir.
+        """
+        n = self._n + other.count
+        if n <= self._size:
+            self._sample.extend(other.sample)
+        else:
+            if not other.count:
+                k = self._size
+            elif not self._n:
+                k = 0
+            else:
+                k = self._random.hypergeometric(
+                    self._n, other.count, self._size)
+            self._sample = self._pick(self._sample, k) + \
+                self._pick(other.sample, self._size - k)
+        self._n = n
+        return self
+
+    def _pick(self, items, k):
+        """Pick k items at random.
+        """
+        return [items[i] for i in _choice(self._random, len(items), k)]
+
+    def __str__(self):
+        return "Reservoir(size={0}, n={1})".format(self._size, self._n)
+
+
+class SampledAverageSummary(AverageSummary):
+    """Scalar summary estimated from a sample of reviews.
+
+    The summary score is the mean of sampled scores. :attr:`count` is the
+    number of all reviews and :attr:`total` is the estimated sum of their
+    scores, so that merging with other summaries weights the estimate by
+    the number of reviews.
+
+    Args:
+      scores: an iterable of reviews or float values, a ReviewArray, or
+        an array of scores.
+      size: the maximum number of sampled reviews (default: 1000).
+      seed: a seed of random sampling (default: None).
+    """
+    __slots__ = ("_m", "_stderr")
+
+    def __init__(self, scores, size=SAMPLE_SIZE, seed=None):
+        sample, n = _sample(scores, size, np.random.RandomState(seed))
+        self._set_sample(sample, n)
+
+    @classmethod
+    def from_stream(cls, scores, chunksize=CHUNKSIZE, summation=PAIRWISE,
+                    size=SAMPLE_SIZE, seed=None):
+        """Create a summary from a stream of reviews in one pass.
+
+        Reviews are sampled by a reservoir, so that memory usage is
+        proportional to the sample size. `chunksize` and `summation` are not
+        used.
+
+        Args:
+          scores: an iterable of reviews or float values.
+          chunksize: ignored.
+          summation: ignored.
+          size: the maximum number of sampled reviews (default: 1000).
+          seed: a seed of random sampling (default: None).
+
+        Returns:
+          a new summary.
+        """
+        return cls(iter(scores), size, seed)
+
+    @classmethod
+    def _from_sample(cls, sample, n):
+        """Create a summary from a uniform sample of n reviews.
+        """
+        res = cls.__new__(cls)
+        res._set_sample(sample, n)
+        return res
+
+    def _set_sample(self, sample, n):
+        """Estimate the summary from a uniform sample of n reviews.
+        """
+        sample = _to_array(sample)
+        self._m = len(sample)
+        self._n = n
+        self._partials = None
+        if not self._m:
+            self._total, self._stderr = 0., float("nan")
+        else:
+            mean = float(np.mean(sample))
+            self._total = mean * n
+            self._stderr = float(_stderr(
+                np.var(sample, ddof=1), self._m, n)) if self._m > 1 else 0.
+        self._update()
+
+    @property
+    def sample_size(self):
+        """The number of sampled reviews."""
+        return self._m
+
+    @property
+    def exact(self):
+        """True if all reviews are sampled."""
+        return self._m == self._n
+
+    @property
+    def stderr(self):
+        """Standard error of the score.
+
+        It includes the finite population correction, so it is zero if all
+        reviews are sampled.
+        """
+        return self._stderr
+
+    def error_bound(self, confidence=.95):
+        """Half width of a confidence interval of the score.
+
+        Args:
+          confidence: confidence level of the interval (default: 0.95).
+
+        Returns:
+          a float value `e` such that the mean of all reviews is in
+          `score +/- e` with the given confidence under the normal
+          approximation.
+        """
+        return _z(confidence) * self._stderr
+
+
+class SampledHistoSummary(HistoSummary):
+    """Vector summary estimated from a sample of reviews.
+
+    The summary is the mean of sampled reviews. It is dense if `bins` are
+    given or the sampled reviews are dense reviews sharing the same bins.
+    :attr:`count` is the number of all reviews and :attr:`total` is the
+    estimated sum of them.
+
+    Args:
+      reviews: an iterable of reviews or ratings.
+      size: the maximum number of sampled reviews (default: 1000).
+      seed: a seed of random sampling (default: None).
+      bins: an instance of :class:`Bins` or an iterable of quantized ratings
+        to make a dense summary (default: None).
+    """
+    __slots__ = ("_m", "_stderr")
+
+    def __init__(self, reviews, size=SAMPLE_SIZE, seed=None, bins=None):
+        sample, n = _sample(reviews, size, np.random.RandomState(seed))
+        self._set_sample(sample, n, bins)
+
+    @classmethod
+    def from_stream(cls, reviews, bins=None, chunksize=CHUNKSIZE,
+                    summation=NAIVE, size=SAMPLE_SIZE, seed=None):
+        """Create a summary from a stream of reviews in one pass.
+
+        Reviews are sampled by a reservoir, so that memory usage is
+        proportional to the sample size. `chunksize` and `summation` are not
+        used.
+
+        Args:
+          reviews: an iterable of reviews or ratings.
+          bins: an instance of :class:`Bins` or an iterable of quantized
+            ratings to make a dense summary (default: None).
+          chunksize: ignored.
+          summation: ignored.
+          size: the maximum number of sampled reviews (default: 1000).
+          seed: a seed of random sampling (default: None).
+
+        Returns:
+          a new summary.
+        """
+        return cls(iter(reviews), size, seed, bins)
+
+    @classmethod
+    def _from_sample(cls, sample, n, bins=None):
+        """Create a summary from a uniform sample of n reviews.
+        """
+        res = cls.__new__(cls)
+        res._set_sample(sample, n, bins)
+        return res
+
+    def _set_sample(self, sample, n, bins):
+        """Estimate the summary from a uniform sample of n reviews.
+        """
+        sample = [
+            r if isinstance(r, HistoReview) else HistoReview(r)
+            for r in sample]
+        if not sample:
+            raise ValueError("no reviews are given.")
+        if bins is not None and not isinstance(bins, Bins):
+            bins = Bins(bins)
+        dense = bins is not None
+        if bins is None and _share_bins(sample):
+            bins = sample[0].bins
+            dense = True
+        matrix = HistoMatrix.from_reviews(sample, bins)
+        bins, values = matrix.bins, matrix.toarray()
+        self._m, self._n = len(sample), n
+        self._partials = None
+        stderr = _stderr(values.var(axis=0, ddof=1), self._m, n) \
+            if self._m > 1 else np.zeros(len(bins))
+        self._histo = _review(bins, values.mean(axis=0), dense)
+        self._total = n * self._histo
+        self._stderr = _review(bins, stderr, dense)
+
+    @property
+    def sample_size(self):
+        """The number of sampled reviews."""
+        return self._m
+
+    @property
+    def exact(self):
+        """True if all reviews are sampled."""
+        return self._m == self._n
+
+    @property
+    def stderr(self):
+        """Review of which weights are standard errors of the bins.
+
+        They include the finite population correction, so they are zero if
+        all reviews are sampled.
+        """
+        return self._stderr
+
+    def error_bound(self, confidence=.95):
+        """Half widths of confidence intervals of the weights of bins.
+
+        Args:
+          confidence: confidence level of the intervals (default: 0.95).
+
+        Returns:
+          a review of which weight of each bin is `e` such that the mean
+          weight of the bin over all reviews is in `weight +/- e` with the
+          given confidence under the normal approximation.
+        """
+        return _z(confidence) * self._stderr
+
+
+def approximate(reviews, summary_cls=AverageSummary, threshold=THRESHOLD,
+                size=SAMPLE_SIZE, seed=None, bins=None):
+    """Create an exact summary or a sampled summary depending on the count.
+
+    If reviews are given as an array or a sequence, the count is known
+    beforehand and an exact summary is created from at most `threshold`
+    reviews. Otherwise the reviews are read once into a reservoir of
+    `threshold` reviews, which holds all the reviews if the stream is not
+    longer than that, and is subsampled to `size` reviews otherwise.
+
+    Args:
+      reviews: an iterable of reviews or ratings, a ReviewArray, or an array
+        of ratings.
+      summary_cls: AverageSummary or HistoSummary (default: AverageSummary).
+      threshold: the maximum number of reviews summarized exactly
+        (default: 10000).
+      size: the number of sampled reviews for larger products; at most
+        `threshold` (default: 1000).
+      seed: a seed of random sampling (default: None).
+      bins: bins of histogram summaries; see :class:`HistoSummary`
+        (default: None).
+
+    Returns:
+      an instance of `summary_cls`, or a sampled summary if there are more
+      than `threshold` reviews.
+    """
+    size = min(size, threshold)
+    if not isinstance(summary_cls, type) or \
+            not issubclass(summary_cls, (AverageSummary, HistoSummary)):
+        raise TypeError(
+            "{0} is not a supported summary class.".format(summary_cls))
+    histogram = issubclass(summary_cls, HistoSummary)
+
+    random = np.random.RandomState(seed)
+    if _sized(reviews):
+        if len(reviews) > threshold:
+            sample, n = _sample(reviews, size, random)
+        else:
+            sample, n = reviews, None
+    else:
+        reservoir = Reservoir(threshold, random.randint(2 ** 31))
+        for chunk in _buffered(reviews):
+            reservoir.extend(chunk)
+        n = reservoir.count
+        if n > threshold:
+            sample = [
+                reservoir.sample[i] for i in _choice(random, threshold, size)]
+        else:
+            sample, n = reservoir.sample, None
+
+    if n is None:
+        if histogram:
+            return summary_cls(sample, bins=bins)
+        return summary_cls(sample)
+    if histogram:
+        return SampledHistoSummary._from_sample(sample, n, bins)
+    return SampledAverageSummary._from_sample(sample, n)
+
+
+def _sized(reviews):
+    """Check reviews can be sampled by indexes.
+    """
+    return isinstance(reviews, (ReviewArray, np.ndarray)) or (
+        hasattr(reviews, "__len__") and hasattr(reviews, "__getitem__"))
+
+
+def _sample(reviews, size, random):
+    """Sample reviews uniformly without replacement.
+
+    Returns:
+      a tuple of a list or an array of sampled reviews and the number of
+      all reviews.
+    """
+    if size < 1:
+        raise ValueError("size must be positive: {0}".format(size))
+    if isinstance(reviews, ReviewArray):
+        reviews = reviews.scores
+    if _sized(reviews):
+        n = len(reviews)
+        if n <= size:
+            return reviews, n
+        index = np.sort(_choice(random, n, size))
+        if isinstance(reviews, np.ndarray):
+            return reviews[index], n
+        return [reviews[i] for i in index], n
+    reservoir = Reservoir(size, random.randint(2 ** 31))
+    for chunk in _buffered(reviews):
+        reservoir.extend(chunk)
+    return reservoir.sample, reservoir.count
+
+
+def _choice(random, n, size):
+    """Pick distinct integers in [0, n) uniformly at random.
+
+    :meth:`numpy.random.RandomState.choice` without replacement permutes all
+    n integers. If the sample is much smaller than n, this function runs
+    Floyd's algorithm instead, which takes O(size) time and memory.
+
+    Args:
+      random: a RandomState.
+      n: the number of integers to pick from.
+      size: the number of integers to pick; at most n.
+
+    Returns:
+      an integer array of the picked integers.
+    """
+    if size * 16 >= n:
+        return random.permutation(n)[:size]
+    tops = np.arange(n - size, n)
+    draws = np.minimum(
+        (random.random_sample(size) * (tops + 1)).astype(np.int64), tops)
+    picked = set()
+    res = np.empty(size, dtype=np.int64)
+    for i, (top, t) in enumerate(zip(tops.tolist(), draws.tolist())):
+        if t in picked:
+            t = top
+        picked.add(t)
+        res[i] = t
+    return res
+
+
+def _buffered(reviews):
+    """Read a stream of reviews in lists of reviews.
+    """
+    buf = []
+    for r in reviews:
+        buf.append(r)
+        if len(buf) == SAMPLE_SIZE:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def _stderr(variance, m, n):
+    """Standard error of a mean of a sample of m items out of n items.
+
+    The variance is the unbiased sample variance, so the finite population
+    correction is `(n - m) / n`.
+    """
+    return np.sqrt(variance / m * (n - m) / n)
+
+
+def _z(confidence):
+    """Two sided critical value of the standard normal distribution.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(
+            "confidence must be in (0, 1): {0}".format(confidence))
+    lo, hi = 0., 40.
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if math.erf(mid / math.sqrt(2)) < confidence:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def _review(bins, weights, dense):
+    """Create a review from weights of bins.
+    """
+    if dense:
+        return DenseHistoReview._from_array(bins, weights)
+    return HistoReview._from_dict(dict(zip(bins.keys, weights.tolist())))
@@ -20,6 +20,7 @@
 #
 """Defines abstract Review and Summary classes.
 """
+import csv
 import math
 import numbers
 
@@ -107,6 +108,55 @@ class Review(_MultipliableImmutableAdditiveGroup):
         """A float value representing score of this review. """
         raise NotImplementedError
 
+    @classmethod
+    def from_array(cls, values, dates=None):
+        """Create reviews from an array of values at once.
+
+        Args:
+          values: an array or an iterable of review values.
+          dates: an array or an iterable of dates of the reviews (default: None).
+
+        Returns:
+          a collection of reviews.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def from_csv(cls, fp, column=0, date_column=None, delimiter=",",
+                 header=False, **kwargs):
+        """Create reviews from a CSV file.
+
+        Values are read by the csv module and passed to :meth:`from_array`.
+
+        Args:
+          fp: a path or a file object of a CSV file.
+          column: index of the column of review values (default: 0).
+          date_column: index of the column of dates (default: None).
+          delimiter: delimiter of columns (default: ",").
+          header: if True, skip the first line (default: False).
+          kwargs: other keyword arguments passed to :meth:`from_array`.
+
+        Returns:
+          a collection of reviews returned by :meth:`from_array`.
+        """
+        if isinstance(fp, str):
+            with open(fp) as f:
+                return cls.from_csv(
+                    f, column, date_column, delimiter, header, **kwargs)
+
+        values, dates = [], []
+        reader = csv.reader(fp, delimiter=delimiter)
+        if header:
+            next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            values.append(float(row[column]))
+            if date_column is not None:
+                dates.append(row[date_column] or None)
+        return cls.from_array(
+            values, dates if date_column is not None else None, **kwargs)
+
 
 class Summary(object):
     """ Abstract class of summary of reviews.
@@ -118,9 +168,40 @@ class Summary(object):
     Each summary type might be related to a review type.
     Summary must implements a class method `review_class` to return the
     associated review class.
+
+    Summary keeping sufficient statistics of reviews also implements `merge`
+    and `subtract`, then this class complements `__add__` and `__sub__`.
     """
     __slots__ = ()
 
+    def merge(self, other):
+        """Summary of the reviews of this summary and another summary.
+
+        Args:
+          other: a summary of the same type.
+
+        Returns:
+          a new summary.
+        """
+        raise NotImplementedError
+
+    def subtract(self, other):
+        """Summary of the reviews of this summary except another summary.
+
+        Args:
+          other: a summary of reviews which are a part of this summary's.
+
+        Returns:
+          a new summary.
+        """
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def __sub__(self, other):
+        return self.subtract(other)
+
     def difference(self, r):
         """Compute a difference between this summary and a given review score.
 
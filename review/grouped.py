@@ -0,0 +1,271 @@
+#
+# grouped.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Summaries of all products computed from flat arrays of reviews.
+
+:func:`average_summaries` and :func:`histo_summaries` take parallel arrays
+of product IDs and ratings, and optionally weights and dates of reviews.
+They compute mean scores or mean histograms of all products at once with
+:func:`numpy.unique` and :func:`numpy.bincount`, without grouping reviews
+in Python. The results are :class:`GroupedSummaries`, mappings from product
+IDs to summaries which create summary objects only when they are accessed.
+"""
+from __future__ import absolute_import
+import functools
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+import numpy as np
+
+from review.histogram import Bins
+from review.histogram import DenseHistoReview
+from review.histogram import HistoSummary
+from review.histogram import _bins_of
+from review.histogram import _columns
+from review.histogram import _quantize
+from review.scalar import AverageSummary
+from review.scalar import _to_dates
+from review.summation import NAIVE
+from review.summation import group_totals
+from review.timeline import _to_datetime
+
+
+class GroupedSummaries(Mapping):
+    """Mapping from product IDs to summaries.
+
+    Sums of reviews of all products are kept in one array and a summary of
+    a product is created at the first access.
+
+    Args:
+      products: a list of product IDs.
+      sums: an array of which i-th element or row is the weighted sum of
+        reviews of the i-th product.
+      weights: an array of sums of weights of reviews of products.
+      counts: an integer array of the numbers of reviews of products.
+      build: a function creating a summary from a sum of weights, a sum of
+        reviews, and partial sums of the sum of reviews or None.
+      partials: a list of which i-th element is partial sums of the sum of
+        reviews of the i-th product, or None (default: None).
+    """
+    __slots__ = (
+        "_products", "_index", "_sums", "_weights", "_means", "_counts",
+        "_build", "_partials", "_cache")
+
+    def __init__(self, products, sums, weights, counts, build, partials=None):
+        self._products = products
+        self._index = {p: i for i, p in enumerate(products)}
+        self._sums = sums
+        self._weights = weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / weights.reshape((-1,) + (1,) * (sums.ndim - 1))
+        means.flags.writeable = False
+        self._means = means
+        counts.flags.writeable = False
+        self._counts = counts
+        self._build = build
+        self._partials = partials
+        self._cache = {}
+
+    @property
+    def products(self):
+        """List of product IDs in ascending order."""
+        return self._products
+
+    @property
+    def means(self):
+        """Read-only array of means of products.
+
+        Means of products of which weights sum to zero are NaN.
+        """
+        return self._means
+
+    @property
+    def counts(self):
+        """Read-only integer array of the numbers of reviews of products."""
+        return self._counts
+
+    def __getitem__(self, product):
+        res = self._cache.get(product)
+        if res is None:
+            i = self._index[product]
+            res = self._build(
+                float(self._weights[i]), self._sums[i],
+                self._partials[i] if self._partials is not None else None)
+            self._cache[product] = res
+        return res
+
+    def __contains__(self, product):
+        return product in self._index
+
+    def __iter__(self):
+        return iter(self._products)
+
+    def __len__(self):
+        return len(self._products)
+
+
+def average_summaries(products, scores, weights=None, dates=None, since=None,
+                      until=None, summation=NAIVE):
+    """Compute scalar summaries of all products.
+
+    Sums of products are computed by :func:`numpy.bincount` by default.
+    Other summation modes sum each product separately; with `"fsum"`,
+    summaries are correctly rounded and keep exact partial sums, so that
+    they can be merged with summaries of other shards exactly. Sums of
+    weights, i.e. counts of weighted summaries, are still added as floats
+    when summaries are merged.
+
+    Args:
+      products: an array of product IDs of reviews.
+      scores: an array of scores of reviews.
+      weights: an array of non-negative weights of reviews (default: None).
+      dates: an array of dates of reviews (default: None).
+      since: if given, only reviews posted at or after this date are used.
+      until: if given, only reviews posted at or before this date are used.
+      summation: a summation mode defined in :mod:`review.summation`
+        (default: naive).
+
+    Returns:
+      a GroupedSummaries mapping product IDs to AverageSummary.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    keys, groups, weights, mask = _group(
+        products, len(scores), weights, dates, since, until)
+    scores = scores[mask]
+    n_groups = len(keys)
+
+    sums, partials = group_totals(
+        groups, scores * weights, n_groups, summation)
+    totals, _ = group_totals(groups, weights, n_groups, summation)
+    return GroupedSummaries(
+        keys, sums, totals, np.bincount(groups, minlength=n_groups),
+        _average_summary, partials)
+
+
+def histo_summaries(products, ratings, weights=None, dates=None, since=None,
+                    until=None, quantizer=round, bins=None, summation=NAIVE):
+    """Compute histogram summaries of all products.
+
+    Ratings are one-hot reviews, and summaries are dense. Summation modes
+    are same as :func:`average_summaries`.
+
+    Args:
+      products: an array of product IDs of reviews.
+      ratings: an array of ratings of reviews.
+      weights: an array of non-negative weights of reviews (default: None).
+      dates: an array of dates of reviews (default: None).
+      since: if given, only reviews posted at or after this date are used.
+      until: if given, only reviews posted at or before this date are used.
+      quantizer: a function or a :class:`review.quantizer.Quantizer` to
+        quantize ratings (default: round).
+      bins: an instance of :class:`review.histogram.Bins` or an iterable of
+        quantized ratings (default: the bins of the quantizer if it has,
+        otherwise all quantized ratings).
+      summation: a summation mode defined in :mod:`review.summation`
+        (default: naive).
+
+    Returns:
+      a GroupedSummaries mapping product IDs to HistoSummary.
+    """
+    ratings = np.asarray(ratings)
+    if ratings.dtype.kind not in "biuf":
+        raise TypeError("ratings must be an array of numbers.")
+    keys, groups, weights, mask = _group(
+        products, len(ratings), weights, dates, since, until)
+    quantized = _quantize(ratings[mask], quantizer)
+    if bins is None:
+        bins = _bins_of(quantizer)
+    if bins is None:
+        bins = Bins(np.unique(quantized).tolist())
+    elif not isinstance(bins, Bins):
+        bins = Bins(bins)
+    n_groups, n_bins = len(keys), len(bins)
+
+    sums, partials = group_totals(
+        groups * n_bins + _columns(bins, quantized), weights,
+        n_groups * n_bins, summation)
+    if partials is not None:
+        partials = [
+            partials[i:i + n_bins] for i in range(0, len(partials), n_bins)]
+    totals, _ = group_totals(groups, weights, n_groups, summation)
+    return GroupedSummaries(
+        keys, sums.reshape(n_groups, n_bins), totals,
+        np.bincount(groups, minlength=n_groups),
+        functools.partial(_histo_summary, bins), partials)
+
+
+def _group(products, n, weights, dates, since, until):
+    """Select reviews and assign group indexes to them.
+
+    Returns:
+      a tuple of a list of product IDs, an integer array of group indexes of
+      selected reviews, a float array of weights of selected reviews, and
+      a boolean array selecting reviews.
+    """
+    products = np.asarray(products)
+    if products.shape != (n,):
+        raise ValueError(
+            "products must have one ID per review: {0} != {1}".format(
+                products.shape, (n,)))
+    mask = np.ones(n, dtype=bool)
+    if dates is not None:
+        dates = _to_dates(dates)
+        if dates.shape != (n,):
+            raise ValueError(
+                "dates must have one value per review: {0} != {1}".format(
+                    dates.shape, (n,)))
+        if since is not None:
+            mask &= dates >= _to_datetime(since)
+        if until is not None:
+            mask &= dates <= _to_datetime(until)
+    elif since is not None or until is not None:
+        raise ValueError("since and until require dates.")
+
+    if weights is None:
+        weights = np.ones(n)
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.shape != (n,):
+            raise ValueError(
+                "weights must have one value per review: {0} != {1}".format(
+                    weights.shape, (n,)))
+        if (weights < 0).any():
+            raise ValueError("weights must be non-negative.")
+
+    keys, groups = np.unique(products[mask], return_inverse=True)
+    return keys.tolist(), groups.ravel(), weights[mask], mask
+
+
+def _average_summary(weight, total, partials):
+    """Create a scalar summary from a sum of weights and a sum of scores.
+    """
+    return AverageSummary._from_sums(weight, float(total), partials)
+
+
+def _histo_summary(bins, weight, total, partials):
+    """Create a histogram summary from a sum of weights and a sum of reviews.
+    """
+    if partials is not None:
+        partials = dict(zip(bins.keys, partials))
+    return HistoSummary._from_sums(
+        weight, DenseHistoReview._from_array(bins, total), partials)
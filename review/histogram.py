@@ -21,19 +21,42 @@
 """Implementations of histogram review and summary classes.
 """
 from __future__ import absolute_import
+from collections import OrderedDict
 from collections import defaultdict
+import math
 import numbers
 
 import numpy as np
 
 from review.base import Review
 from review.base import Summary
+from review.scalar import _to_dates
+from review.scalar import _weights
+from review.summation import FSUM
+from review.summation import MODES
+from review.summation import NAIVE
+from review.summation import RunningSum
+from review.summation import add_partials
+from review.summation import group_totals
+from review.summation import subtract_partials
 
 
 class HistoReview(Review):
     """Vector Review.
+
+    Since reviews are immutable, the score, the norm, and the sorted tuple
+    of bins are computed at the first access and cached.
+
+    To create a :class:`DenseHistoReview` when the quantizer reports
+    a bounded domain of bins, use :meth:`create`.
+
+    Args:
+      v: a rating or a dict mapping ratings to weights.
+      quantizer: a function or a :class:`review.quantizer.Quantizer` to
+        quantize ratings (default: round).
+      date: the date when this review was posted (default: None).
     """
-    __slots__ = ("_v")
+    __slots__ = ("_v", "_score", "_norm", "_keys")
 
     def __init__(self, v, quantizer=round, date=None):
         super(HistoReview, self).__init__(date)
@@ -43,14 +66,26 @@ class HistoReview(Review):
                 self._v[quantizer(key)] = float(value)
         else:
             self._v[quantizer(v)] = 1.
+        self._clear_cache()
+
+    def _clear_cache(self):
+        """Initialize cached values.
+
+        Every constructor must call this method.
+        """
+        self._score = None
+        self._norm = None
+        self._keys = None
 
     @property
     def score(self):
         """A float value representing score of this review. """
-        res = 0.
-        for k in self:
-            res += k * self[k]
-        return res
+        if self._score is None:
+            res = 0.
+            for k in self.keys():
+                res += k * self[k]
+            self._score = res
+        return self._score
 
     @property
     def vector(self):
@@ -58,10 +93,22 @@ class HistoReview(Review):
         """
         return self._v
 
+    def keys(self):
+        """Bins of this review.
+
+        Returns:
+          a tuple of bins in ascending order.
+        """
+        if self._keys is None:
+            self._keys = tuple(sorted(self._v))
+        return self._keys
+
     def norm(self):
         """ 1-Norm of this vector.
         """
-        return sum(self._v.values(), 0.)
+        if self._norm is None:
+            self._norm = sum(self._v.values(), 0.)
+        return self._norm
 
     def inner_product(self, other):
         """ Inner product of two vectors.
@@ -75,37 +122,190 @@ class HistoReview(Review):
         if not isinstance(other, HistoReview):
             raise TypeError(
                 "other must be an HistoReview: {0}".format(type(other)))
+        small, large = self, other
+        if len(small.keys()) > len(large.keys()):
+            small, large = large, small
+        x, y = small.vector, large.vector
         res = 0.
-        for k in set(self.vector.keys()) & set(other.vector.keys()):
-            res += self.vector[k] * other.vector[k]
+        for k in small.keys():
+            if k in y:
+                res += x[k] * y[k]
         return res
 
     def __eq__(self, other):
         if not isinstance(other, HistoReview):
             return False
-        if self.vector.keys() != other.vector.keys():
+        if self.keys() != other.keys():
             return False
         for k in self:
             if self[k] != other[k]:
                 return False
         return True
 
+    @staticmethod
+    def create(v, quantizer=round, date=None):
+        """Create a review in the layout the quantizer calls for.
+
+        If the quantizer reports a bounded domain of bins, e.g. quantizers in
+        :mod:`review.quantizer` with bounds, the review is a
+        :class:`DenseHistoReview` over the domain, otherwise a HistoReview.
+
+        Args:
+          v: a rating or a dict mapping ratings to weights.
+          quantizer: a function or a :class:`review.quantizer.Quantizer` to
+            quantize ratings (default: round).
+          date: the date when this review was posted (default: None).
+
+        Returns:
+          a new review.
+        """
+        if _bins_of(quantizer) is not None:
+            return DenseHistoReview(v, quantizer, date)
+        return HistoReview(v, quantizer, date)
+
+    @classmethod
+    def from_array(cls, values, dates=None, quantizer=round, bins=None):
+        """Create one-hot reviews from an array of ratings at once.
+
+        Ratings are validated and quantized as an array. If the quantizer is
+        the builtin round or a :class:`review.quantizer.Quantizer`,
+        the quantization is vectorized.
+
+        Args:
+          values: an array or an iterable of ratings.
+          dates: an array or an iterable of dates of the reviews, converted
+            to :class:`datetime.datetime` as dates of
+            :class:`review.scalar.ReviewArray` (default: None).
+          quantizer: a function or a Quantizer to quantize ratings
+            (default: round).
+          bins: an instance of :class:`Bins` or an iterable of quantized
+            ratings to create dense reviews (default: the bins of the
+            quantizer if it has).
+
+        Returns:
+          a list of HistoReview, or DenseHistoReview if bins are given.
+          Reviews without dates are interned instances of
+          :class:`OneHotHistoReview`, see :meth:`interned`.
+        """
+        if hasattr(values, "__len__"):
+            values = np.asarray(values)
+        else:
+            values = np.fromiter(values, dtype=np.float64)
+        if values.dtype.kind not in "biuf":
+            raise TypeError("values must be an array of numbers.")
+        keys = _quantize(values, quantizer).tolist()
+        if bins is None:
+            bins = _bins_of(quantizer)
+        if dates is None:
+            dates = [None] * len(keys)
+        else:
+            dates = _to_dates(dates).astype(object).tolist()
+            if len(dates) != len(keys):
+                raise ValueError(
+                    "dates must have the same length as values: {0} != {1}".format(
+                        len(dates), len(keys)))
+
+        if bins is not None:
+            if not isinstance(bins, Bins):
+                bins = Bins(bins)
+            cols = _columns(bins, np.asarray(keys))
+            rows = np.zeros((len(keys), len(bins)))
+            rows[np.arange(len(keys)), cols] = 1.
+            return [
+                DenseHistoReview._from_array(bins, a, d)
+                for a, d in zip(rows, dates)]
+        if all(d is None for d in dates):
+            return [_one_hot(k) for k in keys]
+        return [
+            HistoReview._from_dict({k: 1.}, d) for k, d in zip(keys, dates)]
+
+    @classmethod
+    def _from_dict(cls, v, date=None):
+        """Create a review from a dict of quantized ratings without copying it.
+
+        Args:
+          v: a dict mapping quantized ratings to float weights.
+          date: the date when this review was posted (default: None).
+
+        Returns:
+          a new review.
+        """
+        res = cls.__new__(cls)
+        Review.__init__(res, date)
+        res._v = v
+        res._clear_cache()
+        return res
+
+    @staticmethod
+    def interned(v, quantizer=round):
+        """Shared review of a given rating or vector.
+
+        Reviews returned by this method are cached and the same instance is
+        returned for the same vector, so that identical reviews share their
+        storage. Reviews of single ratings are instances of
+        :class:`OneHotHistoReview`, and reviews are dense if the quantizer
+        reports its bins.
+
+        One-hot reviews are cached for each quantized rating. Other vectors
+        can have continuous weights, so only the 1024 most recently used
+        ones are cached, and older ones are evicted.
+
+        Interned reviews don't have dates and must not be given dates,
+        since they are shared.
+
+        Args:
+          v: a rating or a dict mapping ratings to weights.
+          quantizer: a function or a :class:`review.quantizer.Quantizer` to
+            quantize ratings (default: round).
+
+        Returns:
+          an interned review.
+        """
+        bins = _bins_of(quantizer)
+        if isinstance(v, dict):
+            vector = {quantizer(k): float(w) for k, w in v.items()}
+            if len(vector) != 1 or list(vector.values()) != [1.]:
+                ident = (bins, tuple(sorted(vector.items())))
+                res = _INTERNED_VECTORS.pop(ident, None)
+                if res is None:
+                    if bins is None:
+                        res = HistoReview._from_dict(vector)
+                    else:
+                        res = DenseHistoReview(vector, _identity, bins=bins)
+                    if len(_INTERNED_VECTORS) >= _INTERNED_VECTORS_SIZE:
+                        _INTERNED_VECTORS.popitem(last=False)
+                _INTERNED_VECTORS[ident] = res
+                return res
+            key = list(vector)[0]
+        else:
+            key = quantizer(v)
+        return _one_hot(key, bins)
+
+    @staticmethod
+    def clear_interned():
+        """Clear the cache of interned reviews.
+
+        Reviews already returned by :meth:`interned` are still usable.
+        """
+        _INTERNED.clear()
+        _INTERNED_VECTORS.clear()
+
     def __add__(self, other):
         if not isinstance(other, HistoReview):
             raise TypeError(
                 "other is {0}, not HistoReview".format(type(other)))
-        res = defaultdict(float, self._v)
+        res = defaultdict(float, self.vector)
         for k in other:
             res[k] += other[k]
-        return HistoReview(res)
+        return HistoReview._from_dict(dict(res))
 
     def __rmul__(self, other):
         if not isinstance(other, numbers.Number):
             raise TypeError("other is {0}, not a number".format(type(other)))
-        res = self._v.copy()
+        res = dict(self.vector)
         for k in res:
-            res[k] *= other
-        return HistoReview(res)
+            res[k] *= float(other)
+        return HistoReview._from_dict(res)
 
     def __getitem__(self, key):
         return self._v[key]
@@ -116,25 +316,522 @@ class HistoReview(Review):
     def __contains__(self, v):
         return v in self._v
 
+    def __reduce__(self):
+        if type(self) is HistoReview:
+            return _histo_review, (self._v, self.date)
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
     def __str__(self):
         return ", ".join(["{0}:{1}".format(i, self[i]) for i in self])
 
 
+class Bins(object):
+    """Domain of histogram bins.
+
+    Bins is an ordered set of quantized ratings. Dense histograms use
+    a Bins to map quantized ratings to positions of their vectors.
+
+    Args:
+      keys: an iterable of quantized ratings.
+    """
+    __slots__ = ("_keys", "_index", "_values")
+
+    def __init__(self, keys):
+        self._keys = tuple(sorted(set(keys)))
+        self._index = {k: i for i, k in enumerate(self._keys)}
+        values = np.array(self._keys, dtype=np.float64)
+        values.flags.writeable = False
+        self._values = values
+
+    @property
+    def keys(self):
+        """Tuple of quantized ratings in ascending order."""
+        return self._keys
+
+    @property
+    def values(self):
+        """Read-only float64 array of the quantized ratings."""
+        return self._values
+
+    def index(self, key):
+        """Position of a given quantized rating.
+
+        Args:
+          key: a quantized rating.
+
+        Returns:
+          the index of the given rating.
+
+        Raises:
+          KeyError: if the rating is not in this domain.
+        """
+        return self._index[key]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Bins):
+            return False
+        return self._keys == other.keys
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._keys)
+
+    def __reduce__(self):
+        return Bins, (self._keys,)
+
+    def __str__(self):
+        return str(self._keys)
+
+
+class DenseHistoReview(HistoReview):
+    """Vector review stored as a fixed-length array.
+
+    DenseHistoReview has the same interface as :class:`HistoReview` but
+    stores the histogram as a float64 array over a given domain of bins.
+    Arithmetic, inner products, and norms of two dense reviews sharing a
+    domain are computed as vector operations.
+
+    Unlike HistoReview, :attr:`vector` and iteration only yield non-zero bins.
+
+    Args:
+      v: a rating or a dict mapping ratings to weights.
+      quantizer: a function to quantize ratings (default: round).
+      date: the date when this review was posted (default: None).
+      bins: an instance of :class:`Bins` or an iterable of quantized
+        ratings defining the domain of the histogram (default: the bins of
+        the quantizer).
+    """
+    __slots__ = ("_bins", "_a")
+
+    def __init__(self, v, quantizer=round, date=None, bins=None):
+        Review.__init__(self, date)
+        if bins is None:
+            bins = _bins_of(quantizer)
+        if bins is None:
+            raise ValueError("bins must be given to DenseHistoReview.")
+        if not isinstance(bins, Bins):
+            bins = Bins(bins)
+        self._v = None
+        self._bins = bins
+        a = np.zeros(len(bins))
+        if isinstance(v, dict):
+            for key, value in v.items():
+                a[self._position(quantizer(key))] = float(value)
+        else:
+            a[self._position(quantizer(v))] = 1.
+        a.flags.writeable = False
+        self._a = a
+        self._clear_cache()
+
+    @classmethod
+    def _from_array(cls, bins, a, date=None):
+        """Create a dense review from a float64 array without copying it.
+
+        Args:
+          bins: an instance of Bins.
+          a: a float64 array of which length is same as the bins.
+          date: the date when this review was posted (default: None).
+
+        Returns:
+          a new DenseHistoReview.
+        """
+        res = cls.__new__(cls)
+        Review.__init__(res, date)
+        res._v = None
+        res._bins = bins
+        a.flags.writeable = False
+        res._a = a
+        res._clear_cache()
+        return res
+
+    def _position(self, key):
+        """Position of a quantized rating in the vector.
+        """
+        try:
+            return self._bins.index(key)
+        except KeyError:
+            raise ValueError(
+                "{0} is not in the bins {1}".format(key, self._bins))
+
+    def _is_compatible(self, other):
+        """Check a given review is a dense review sharing the same bins.
+        """
+        return isinstance(other, DenseHistoReview) and self._bins == other.bins
+
+    @property
+    def score(self):
+        """A float value representing score of this review. """
+        if self._score is None:
+            self._score = float(np.dot(self._bins.values, self._a))
+        return self._score
+
+    @property
+    def vector(self):
+        """ Raw vector consisting of non-zero bins.
+        """
+        return {k: float(v) for k, v in zip(self._bins, self._a) if v != 0}
+
+    @property
+    def bins(self):
+        """Domain of this histogram."""
+        return self._bins
+
+    @property
+    def array(self):
+        """Read-only float64 array of this histogram."""
+        return self._a
+
+    def keys(self):
+        """Non-zero bins of this review.
+
+        Returns:
+          a tuple of bins in ascending order.
+        """
+        if self._keys is None:
+            self._keys = tuple(k for k, v in zip(self._bins, self._a) if v != 0)
+        return self._keys
+
+    def norm(self):
+        """ 1-Norm of this vector.
+        """
+        if self._norm is None:
+            self._norm = float(self._a.sum())
+        return self._norm
+
+    def inner_product(self, other):
+        """ Inner product of two vectors.
+
+        Args:
+          other: a HistogramReview instance.
+
+        Returns:
+          the inner product between this and the other.
+        """
+        if self._is_compatible(other):
+            return float(np.dot(self._a, other.array))
+        return super(DenseHistoReview, self).inner_product(other)
+
+    def __eq__(self, other):
+        if self._is_compatible(other):
+            return bool(np.array_equal(self._a, other.array))
+        return super(DenseHistoReview, self).__eq__(other)
+
+    def __add__(self, other):
+        if self._is_compatible(other):
+            return DenseHistoReview._from_array(self._bins, self._a + other.array)
+        return super(DenseHistoReview, self).__add__(other)
+
+    def __rmul__(self, other):
+        if not isinstance(other, numbers.Number):
+            raise TypeError("other is {0}, not a number".format(type(other)))
+        return DenseHistoReview._from_array(self._bins, other * self._a)
+
+    def __getitem__(self, key):
+        return self._a[self._bins.index(key)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __contains__(self, v):
+        return v in self._bins and self._a[self._bins.index(v)] != 0
+
+    def __reduce__(self):
+        if type(self) is DenseHistoReview:
+            return _dense_histo_review, (self._bins, self._a, self.date)
+        return super(DenseHistoReview, self).__reduce__()
+
+
+class OneHotHistoReview(HistoReview):
+    """Vector review of a single rating.
+
+    Most reviews consist of one rating of which weight is 1. This class
+    stores only the quantized rating instead of a dict, and compares and
+    computes inner products with other reviews in constant time.
+    :meth:`HistoReview.interned` and :meth:`HistoReview.from_array` return
+    shared instances of this class.
+
+    Args:
+      key: a quantized rating.
+      date: the date when this review was posted (default: None).
+    """
+    __slots__ = ("_key")
+
+    def __init__(self, key, date=None):
+        Review.__init__(self, date)
+        self._v = None
+        self._key = key
+        self._clear_cache()
+
+    @property
+    def score(self):
+        """A float value representing score of this review. """
+        return self._key * 1.
+
+    @property
+    def vector(self):
+        """ Raw vector.
+        """
+        if self._v is None:
+            self._v = {self._key: 1.}
+        return self._v
+
+    @property
+    def key(self):
+        """The quantized rating of this review."""
+        return self._key
+
+    def keys(self):
+        """Bins of this review.
+
+        Returns:
+          a tuple of the quantized rating.
+        """
+        return (self._key,)
+
+    def norm(self):
+        """ 1-Norm of this vector.
+        """
+        return 1.
+
+    def inner_product(self, other):
+        """ Inner product of two vectors.
+
+        Args:
+          other: a HistogramReview instance.
+
+        Returns:
+          the inner product between this and the other.
+        """
+        if isinstance(other, OneHotHistoReview):
+            return 1. if self._key == other.key else 0.
+        if not isinstance(other, HistoReview):
+            raise TypeError(
+                "other must be an HistoReview: {0}".format(type(other)))
+        return float(other[self._key]) if self._key in other else 0.
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, OneHotHistoReview):
+            return self._key == other.key
+        return super(OneHotHistoReview, self).__eq__(other)
+
+    def __getitem__(self, key):
+        if key != self._key:
+            raise KeyError(key)
+        return 1.
+
+    def __iter__(self):
+        return iter((self._key,))
+
+    def __contains__(self, v):
+        return v == self._key
+
+    def __reduce__(self):
+        if self.date is None:
+            return _one_hot, (self._key,)
+        return OneHotHistoReview, (self._key, self.date)
+
+
+CHUNKSIZE = 1024
+"""Default number of ratings added at once in streaming summaries."""
+
+
 class HistoSummary(Summary):
     """ Vector summary.
+
+    If reviews are :class:`DenseHistoReview` sharing the same bins,
+    the summary is also dense and computed as a vector operation.
+    Giving `bins` makes the summary dense regardless of the types of reviews.
+
+    The summary also keeps the number of reviews and the sum of their
+    vectors, so that summaries of disjoint sets of reviews can be merged,
+    and a summary of a subset can be subtracted, without reading the reviews
+    again. With `summation="fsum"`, the sum of each bin is also kept exactly
+    as partial sums, so that merging and subtracting such summaries are
+    exact.
+
+    Args:
+      reviews: an iterable of reviews or ratings, a single review, or
+        a single rating.
+      bins: an instance of :class:`Bins` or an iterable of quantized ratings
+        to make a dense summary (default: None).
+      summation: a summation mode defined in :mod:`review.summation`
+        (default: naive).
     """
-    __slots__ = ("_histo")  # _histo: an instance of HistoReview
+    # _histo: an instance of HistoReview
+    # _n: the number of reviews, _total: a HistoReview of the sum of them
+    # _partials: a dict mapping bins to partial sums in fsum mode, or None
+    __slots__ = ("_histo", "_n", "_total", "_partials")
 
-    def __init__(self, reviews):
-        if hasattr(reviews, "__iter__"):
-            reviews = list(reviews)
-            if not isinstance(reviews[0], HistoReview):
-                reviews = [HistoReview(r) for r in reviews]
-            self._histo = np.mean(reviews)
-        elif isinstance(reviews, HistoReview):
-            self._histo = reviews
+    def __init__(self, reviews, bins=None, summation=NAIVE):
+        if bins is not None and not isinstance(bins, Bins):
+            bins = Bins(bins)
+        if not isinstance(reviews, HistoReview) and \
+                hasattr(reviews, "__iter__"):
+            acc, n = _accumulate(reviews, bins, summation=summation)
+            self._assign(n, acc.finalize(), acc.partials)
+            return
+        if isinstance(reviews, HistoReview):
+            self._histo = reviews if bins is None else _to_dense(reviews, bins)
+        elif bins is not None:
+            self._histo = _to_dense(reviews, bins)
         else:
             self._histo = HistoReview(reviews)
+        self._n, self._total = 1, self._histo
+        self._partials = None
+        if summation == FSUM:
+            self._partials = {k: [v] for k, v in self._histo.vector.items()}
+
+    def _assign(self, n, total, partials=None):
+        """Set the number of reviews and the sum of them.
+        """
+        self._n, self._total, self._partials = n, total, partials
+        self._histo = _mean(total, n)
+
+    @classmethod
+    def _from_sums(cls, n, total, partials=None):
+        """Create a summary from the number of reviews and the sum of them.
+
+        Args:
+          n: the number of reviews.
+          total: a HistoReview of the sum of them.
+          partials: a dict mapping bins to exact partial sums of their
+            weights, or None.
+        """
+        res = cls.__new__(cls)
+        res._assign(n, total, partials)
+        return res
+
+    @classmethod
+    def from_stream(cls, reviews, bins=None, chunksize=CHUNKSIZE,
+                    summation=NAIVE):
+        """Create a summary from a stream of reviews in one pass.
+
+        Reviews are summed into a :class:`HistoAccumulator`, so that memory
+        usage is proportional to the number of bins, not to the length of
+        the stream. Ratings in the stream are buffered and added
+        `chunksize` ratings at once. Constructing a summary from an iterable
+        uses this method with the default arguments.
+
+        With `summation="fsum"`, the weight of each bin is the correctly
+        rounded mean and doesn't depend on the order of reviews or the chunk
+        size.
+
+        Args:
+          reviews: an iterable of reviews or ratings. Elements can also be
+            one dimensional arrays of ratings, which are added as chunks.
+          bins: an instance of :class:`Bins` or an iterable of quantized
+            ratings to make a dense summary (default: None).
+          chunksize: the number of ratings added at once (default: 1024).
+          summation: a summation mode defined in :mod:`review.summation`
+            (default: naive).
+
+        Returns:
+          a new summary.
+
+        Raises:
+          ValueError: if the stream is empty.
+        """
+        if bins is not None and not isinstance(bins, Bins):
+            bins = Bins(bins)
+        acc, n = _accumulate(reviews, bins, chunksize, summation)
+        return cls._from_sums(n, acc.finalize(), acc.partials)
+
+    def _sums(self):
+        """A HistoReview of the sum of the reviews in this summary.
+        """
+        return self._total
+
+    @property
+    def count(self):
+        """The number of reviews in this summary.
+
+        For weighted summaries, the sum of weights of the reviews.
+        """
+        return self._n
+
+    @property
+    def total(self):
+        """A HistoReview of the sum of the reviews in this summary."""
+        return self._sums()
+
+    def merge(self, other):
+        """Summary of the reviews of this summary and another summary.
+
+        The counts and the sums of the reviews are added, so that the result
+        is same as the summary of all the reviews up to rounding errors of
+        the sums; they are identical if reviews are one-hot, or if both
+        summaries keep exact partial sums, i.e. they are built with
+        `summation="fsum"`. The result is dense if both summaries are dense
+        on the same bins.
+
+        Args:
+          other: a HistoSummary of reviews not in this summary.
+
+        Returns:
+          a new HistoSummary.
+        """
+        if not isinstance(other, HistoSummary):
+            raise TypeError(
+                "other is {0}, not HistoSummary".format(type(other)))
+        total = self._sums() + other._sums()
+        partials = None
+        if self._partials is not None and other._partials is not None:
+            partials = _combine(self._partials, other._partials, add_partials)
+            total = _exact_review(total, partials)
+        return HistoSummary._from_sums(self._n + other._n, total, partials)
+
+    def subtract(self, other):
+        """Summary of the reviews of this summary except another summary.
+
+        Bins of which weights become zero are removed from sparse results.
+
+        Args:
+          other: a HistoSummary of a subset of the reviews of this summary.
+
+        Returns:
+          a new HistoSummary. It is empty if no reviews remain.
+
+        Raises:
+          ValueError: if the other summary has more reviews than this summary.
+        """
+        if not isinstance(other, HistoSummary):
+            raise TypeError(
+                "other is {0}, not HistoSummary".format(type(other)))
+        n = self._n - other._n
+        if n < 0:
+            raise ValueError(
+                "other summary has more reviews than this summary.")
+        total = self._sums() - other._sums()
+        partials = None
+        if self._partials is not None and other._partials is not None:
+            partials = _combine(
+                self._partials, other._partials, subtract_partials)
+            partials = {k: p for k, p in partials.items() if n and p}
+            total = _exact_review(total, partials)
+        if isinstance(total, DenseHistoReview):
+            if not n:
+                total = DenseHistoReview._from_array(
+                    total.bins, np.zeros(len(total.bins)))
+        else:
+            total = HistoReview._from_dict({
+                k: v for k, v in total.vector.items() if n and v != 0})
+        return HistoSummary._from_sums(n, total, partials)
 
     def difference(self, r):
         """Compute a difference between this summary and a given review score.
@@ -149,12 +846,64 @@ class HistoSummary(Summary):
             raise TypeError("r must be an HistoReview: {0}".format(type(r)))
         return abs(1 - self._histo.inner_product(r))
 
+    def differences(self, reviews):
+        """Compute differences between this summary and given reviews.
+
+        Args:
+          reviews: an iterable of HistoReview, a HistoMatrix, or a two
+            dimensional array of which rows are histograms defined on the bins
+            of this summary. The last one requires this summary to be dense.
+
+        Returns:
+          a float array of the differences between this summary and each of
+          the given reviews.
+        """
+        if isinstance(reviews, np.ndarray):
+            if not isinstance(self._histo, DenseHistoReview):
+                raise ValueError("a matrix requires a dense summary.")
+            if reviews.ndim != 2 or reviews.shape[1] != len(self._histo.bins):
+                raise ValueError(
+                    "shape of the matrix {0} doesn't match the bins {1}".format(
+                        reviews.shape, self._histo.bins))
+            return np.abs(1 - reviews.dot(self._histo.array))
+
+        if isinstance(reviews, HistoMatrix):
+            histo = np.array([
+                self._histo[k] if k in self._histo else 0.
+                for k in reviews.bins
+            ], dtype=np.float64)
+            return np.abs(1 - reviews.dot(histo))
+
+        reviews = list(reviews)
+        for r in reviews:
+            if not isinstance(r, HistoReview):
+                raise TypeError("r must be an HistoReview: {0}".format(type(r)))
+        if isinstance(self._histo, DenseHistoReview) and _share_bins(reviews) \
+                and reviews[0].bins == self._histo.bins:
+            matrix = np.stack([r.array for r in reviews])
+            return np.abs(1 - matrix.dot(self._histo.array))
+
+        keys = list(self._histo)
+        index = {k: i for i, k in enumerate(keys)}
+        matrix = np.zeros((len(reviews), len(keys)))
+        for i, r in enumerate(reviews):
+            for k, v in r.vector.items():
+                j = index.get(k)
+                if j is not None:
+                    matrix[i, j] = v
+        histo = np.array([self._histo[k] for k in keys], dtype=np.float64)
+        return np.abs(1 - matrix.dot(histo))
+
     @property
     def score(self):
         """Return a float value representing this summary.
         """
         return self._histo.score
 
+    def __reduce__(self):
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
     def __str__(self):
         return ", ".join(["{0}:{1}".format(i, self._histo[i]) for i in self._histo])
 
@@ -162,3 +911,987 @@ class HistoSummary(Summary):
     def review_class(cls):
         """A review class associated with this summary. """
         return HistoReview
+
+
+class IncrementalHistoSummary(HistoSummary):
+    """Vector summary supporting addition and removal of single reviews.
+
+    The summary keeps the number of reviews and the sum of their vectors,
+    so that adding, removing, and updating a review takes time proportional
+    to the number of bins of the review, independent of the number of
+    reviews. The sum of each bin is kept exactly as non-overlapping partial
+    sums, see :mod:`review.summation`, so that removing a review cancels its
+    addition exactly. The mean vector is computed when it is read, and the
+    results are identical to the ones of a :class:`HistoSummary` built from
+    the same reviews with `summation="fsum"`.
+
+    Args:
+      reviews: an iterable of reviews or ratings, a single review, or
+        a single rating (default: empty).
+      bins: an instance of :class:`Bins` or an iterable of quantized ratings
+        to make a dense summary (default: None).
+    """
+    __slots__ = ("_bins", "_counts")
+
+    def __init__(self, reviews=(), bins=None):
+        if bins is not None and not isinstance(bins, Bins):
+            bins = Bins(bins)
+        self._bins = bins
+        self._histo = None
+        self._n = 0
+        self._partials = {}
+        if bins is None:
+            self._total = defaultdict(float)
+            self._counts = defaultdict(int)
+        else:
+            self._total = np.zeros(len(bins))
+            self._counts = None
+        if not hasattr(reviews, "__iter__"):
+            reviews = [reviews]
+        for r in reviews:
+            self.add(r)
+
+    @classmethod
+    def from_stream(cls, reviews, bins=None, chunksize=CHUNKSIZE,
+                    summation=NAIVE):
+        """Create a summary from a stream of reviews in one pass.
+
+        Reviews are added one by one, so `chunksize` and `summation` are not
+        used.
+
+        Args:
+          reviews: an iterable of reviews or ratings.
+          bins: an instance of :class:`Bins` or an iterable of quantized
+            ratings to make a dense summary (default: None).
+          chunksize: ignored.
+          summation: ignored.
+
+        Returns:
+          a new summary.
+        """
+        return cls(reviews, bins)
+
+    @classmethod
+    def _from_sums(cls, n, total, partials=None):
+        """Create a summary from the number of reviews and the sum of them.
+
+        Since the numbers of reviews having each bin are unknown, every bin of
+        a sparse sum is counted as if all reviews have it. If the partial sums
+        are not given, the sum is taken as exact.
+        """
+        dense = isinstance(total, DenseHistoReview)
+        res = cls(bins=total.bins if dense else None)
+        if partials is None:
+            partials = {k: [v] for k, v in total.vector.items()}
+        for k, p in partials.items():
+            res._add_bin(k, p)
+        if not dense:
+            res._counts.update(dict.fromkeys(partials, n))
+        res._n = n
+        return res
+
+    def _sums(self):
+        if self._bins is not None:
+            return DenseHistoReview._from_array(self._bins, self._total.copy())
+        return HistoReview._from_dict(dict(self._total))
+
+    def _review(self, r):
+        """Convert a rating to a review of this summary.
+        """
+        if self._bins is not None:
+            return _to_dense(r, self._bins)
+        if not isinstance(r, HistoReview):
+            return HistoReview(r)
+        return r
+
+    def _current(self):
+        """The mean of the reviews in this summary.
+        """
+        if self._histo is None:
+            if self._bins is not None:
+                total = self._total / self._n if self._n else self._total.copy()
+                self._histo = DenseHistoReview._from_array(self._bins, total)
+            elif self._n:
+                self._histo = HistoReview._from_dict(
+                    {k: v / self._n for k, v in self._total.items()})
+            else:
+                self._histo = HistoReview({})
+        return self._histo
+
+    def _add_bin(self, key, partials):
+        """Add partial sums to the exact sum of a bin.
+        """
+        p = add_partials(self._partials.get(key, ()), partials)
+        self._partials[key] = p
+        if self._bins is not None:
+            self._total[self._bins.index(key)] = math.fsum(p)
+        else:
+            self._total[key] = math.fsum(p)
+
+    def add(self, review):
+        """Add a review to this summary.
+
+        Args:
+          review: a HistoReview or a rating.
+        """
+        r = self._review(review)
+        for k, v in r.vector.items():
+            self._add_bin(k, [v])
+            if self._bins is None:
+                self._counts[k] += 1
+        self._n += 1
+        self._histo = None
+
+    def extend(self, reviews):
+        """Add reviews to this summary at once.
+
+        Reviews are packed into a :class:`HistoMatrix`, and the exact sums
+        and the counts of bins are computed per bin, so that the summary is
+        updated once per bin instead of once per entry.
+
+        Args:
+          reviews: an iterable of HistoReview or ratings.
+        """
+        matrix = HistoMatrix.from_reviews(
+            [self._review(r) for r in reviews], self._bins)
+        if not len(matrix):
+            return
+        n_bins = len(matrix.bins)
+        _, partials = group_totals(
+            matrix._indices, matrix._data, n_bins, FSUM)
+        counts = np.bincount(matrix._indices, minlength=n_bins)
+        for k, p, c in zip(matrix.bins.keys, partials, counts.tolist()):
+            if c:
+                self._add_bin(k, p)
+                if self._bins is None:
+                    self._counts[k] += c
+        self._n += len(matrix)
+        self._histo = None
+
+    def remove(self, review):
+        """Remove a review from this summary.
+
+        Args:
+          review: a HistoReview or a rating which was added before.
+
+        Raises:
+          ValueError: if this summary is empty.
+        """
+        if not self._n:
+            raise ValueError("summary is empty.")
+        r = self._review(review)
+        for k, v in r.vector.items():
+            if self._bins is None:
+                self._counts[k] -= 1
+                if self._counts[k] <= 0:
+                    del self._counts[k]
+                    del self._total[k]
+                    del self._partials[k]
+                    continue
+            self._add_bin(k, [-v])
+        self._n -= 1
+        if not self._n:
+            self._partials = {}
+            if self._bins is not None:
+                self._total[:] = 0.
+        self._histo = None
+
+    def update(self, old, new):
+        """Replace a review in this summary with another one.
+
+        Args:
+          old: a HistoReview or a rating to be removed.
+          new: a HistoReview or a rating to be added.
+        """
+        self.remove(old)
+        self.add(new)
+
+    def difference(self, r):
+        """Compute a difference between this summary and a given review score.
+
+        Args:
+          An instance of Review.
+
+        Returns:
+          The difference between of the summary and the given review.
+        """
+        self._current()
+        return super(IncrementalHistoSummary, self).difference(r)
+
+    def differences(self, reviews):
+        """Compute differences between this summary and given reviews.
+
+        Args:
+          reviews: an iterable of HistoReview, or a two dimensional array of
+            which rows are histograms defined on the bins of this summary.
+
+        Returns:
+          a float array of the differences between this summary and each of
+          the given reviews.
+        """
+        self._current()
+        return super(IncrementalHistoSummary, self).differences(reviews)
+
+    @property
+    def score(self):
+        """Return a float value representing this summary.
+        """
+        return self._current().score
+
+    def __str__(self):
+        self._current()
+        return super(IncrementalHistoSummary, self).__str__()
+
+
+class WeightedHistoSummary(HistoSummary):
+    """Vector summary weighting reviews.
+
+    The summary is a weighted average of given reviews. The reviews are
+    packed into a :class:`HistoMatrix` once, so that :meth:`reweight` updates
+    the summary with new weights as a single vectorized reduction.
+    The summary is dense if `bins` are given or the reviews are dense reviews
+    sharing the same bins.
+
+    Args:
+      reviews: an iterable of reviews or ratings.
+      weights: an iterable of non-negative weights of the reviews.
+      bins: an instance of :class:`Bins` or an iterable of quantized ratings
+        to make a dense summary (default: None).
+    """
+    __slots__ = ("_matrix", "_weights", "_dense")
+
+    def __init__(self, reviews, weights, bins=None):
+        reviews = [
+            r if isinstance(r, HistoReview) else HistoReview(r)
+            for r in reviews]
+        if bins is not None and not isinstance(bins, Bins):
+            bins = Bins(bins)
+        self._dense = bins is not None
+        if bins is None and _share_bins(reviews):
+            bins = reviews[0].bins
+            self._dense = True
+        self._matrix = HistoMatrix.from_reviews(reviews, bins)
+        self.reweight(weights)
+
+    @classmethod
+    def from_stream(cls, reviews, bins=None, chunksize=CHUNKSIZE,
+                    summation=NAIVE):
+        """Weighted summaries can't be created from a stream.
+
+        They keep all the reviews to be reweighted, and need weights; use
+        the constructor instead.
+
+        Raises:
+          TypeError: always.
+        """
+        raise TypeError(
+            "{0} needs weights and can't be created from a stream.".format(
+                cls.__name__))
+
+    @property
+    def weights(self):
+        """Read-only float64 array of weights of the reviews."""
+        return self._weights
+
+    def reweight(self, weights):
+        """Update weights of the reviews.
+
+        Args:
+          weights: an iterable of non-negative weights of the reviews
+            in the same order as the reviews given to the constructor.
+        """
+        weights = _weights(weights, len(self._matrix))
+        weights.flags.writeable = False
+        self._weights = weights
+        total = self._matrix.weighted_sum(weights)
+        bins = self._matrix.bins
+        if self._dense:
+            total = DenseHistoReview._from_array(bins, total)
+        else:
+            total = HistoReview._from_dict(
+                dict(zip(bins.keys, total.tolist())))
+        self._assign(float(weights.sum()), total)
+
+
+class HistoAccumulator(object):
+    """Mutable accumulator of histogram reviews.
+
+    Reducing reviews with `+` and `*` creates a new dict or array for each
+    operation. The accumulator instead keeps a running sum updated in place,
+    and creates one review when :meth:`finalize` is called. With `bins`,
+    the running sum is a float64 array and dense reviews on the same bins are
+    added without allocating temporary arrays.
+
+    Weights are added one by one by default. Other summation modes keep
+    a :class:`review.summation.RunningSum` per bin instead of a float.
+
+    Args:
+      bins: an instance of :class:`Bins` or an iterable of quantized ratings
+        to accumulate dense reviews (default: None).
+      quantizer: a function to quantize ratings given instead of reviews
+        (default: round).
+      summation: a summation mode defined in :mod:`review.summation`
+        (default: naive).
+    """
+    __slots__ = ("_bins", "_total", "_buffer", "_quantizer", "_summation")
+
+    def __init__(self, bins=None, quantizer=round, summation=NAIVE):
+        if bins is not None and not isinstance(bins, Bins):
+            bins = Bins(bins)
+        if summation not in MODES:
+            raise ValueError("unknown summation mode: {0}".format(summation))
+        self._bins = bins
+        self._quantizer = quantizer
+        self._summation = summation
+        if bins is None:
+            self._total = {}
+            self._buffer = None
+        else:
+            if summation == NAIVE:
+                self._total = np.zeros(len(bins))
+            else:
+                self._total = RunningSum(summation, len(bins))
+            self._buffer = np.empty(len(bins))
+
+    def iadd(self, review):
+        """Add a review to the running sum.
+
+        Args:
+          review: a HistoReview or a rating.
+
+        Returns:
+          this accumulator.
+        """
+        if self._bins is not None and isinstance(review, DenseHistoReview) \
+                and review.bins == self._bins:
+            self._add_vector(review.array)
+        else:
+            self._add(1., review)
+        return self
+
+    __iadd__ = iadd
+
+    def axpy(self, alpha, review):
+        """Add a review multiplied by a scalar to the running sum.
+
+        Args:
+          alpha: a number.
+          review: a HistoReview or a rating.
+
+        Returns:
+          this accumulator.
+        """
+        if not isinstance(alpha, numbers.Number):
+            raise TypeError(
+                "alpha is {0}, not numbers.Number".format(type(alpha)))
+        if self._bins is not None and isinstance(review, DenseHistoReview) \
+                and review.bins == self._bins:
+            np.multiply(review.array, alpha, out=self._buffer)
+            self._add_vector(self._buffer)
+        else:
+            self._add(float(alpha), review)
+        return self
+
+    def extend(self, ratings):
+        """Add one-hot reviews of an array of ratings.
+
+        Ratings are quantized and counted as vector operations.
+
+        Args:
+          ratings: an array or an iterable of ratings.
+
+        Returns:
+          this accumulator.
+        """
+        ratings = np.asarray(
+            ratings if hasattr(ratings, "__len__") else list(ratings))
+        if ratings.dtype.kind not in "biuf":
+            raise TypeError("ratings must be an array of numbers.")
+        keys = _quantize(ratings.ravel(), self._quantizer)
+        if self._bins is not None:
+            self._add_vector(np.bincount(
+                _columns(self._bins, keys),
+                minlength=len(self._bins)).astype(np.float64))
+        else:
+            unique, counts = np.unique(keys, return_counts=True)
+            for k, c in zip(unique.tolist(), counts.tolist()):
+                self._add_entry(k, float(c))
+        return self
+
+    @property
+    def bins(self):
+        """Domain of the running sum, or None if it is sparse."""
+        return self._bins
+
+    @property
+    def summation(self):
+        """Summation mode of the running sum."""
+        return self._summation
+
+    @property
+    def partials(self):
+        """Dict mapping bins to exact partial sums in fsum mode, or None."""
+        if self._summation != FSUM:
+            return None
+        if self._bins is None:
+            return {k: v.partials for k, v in self._total.items()}
+        return dict(zip(self._bins.keys, self._total.partials))
+
+    def _add(self, alpha, review):
+        """Add weights of a review or a rating one by one.
+        """
+        if isinstance(review, HistoReview):
+            items = review.vector.items()
+        else:
+            items = ((self._quantizer(review), 1.),)
+        if self._bins is None:
+            for k, v in items:
+                self._add_entry(k, alpha * v)
+            return
+
+        buf = self._buffer
+        buf[:] = 0.
+        for k, v in items:
+            try:
+                buf[self._bins.index(k)] += alpha * v
+            except KeyError:
+                raise ValueError("{0} is not in the bins {1}".format(
+                    k, self._bins))
+        self._add_vector(buf)
+
+    def _add_entry(self, key, value):
+        """Add a weight to a bin of a sparse running sum.
+        """
+        total = self._total
+        if self._summation == NAIVE:
+            total[key] = total.get(key, 0.) + value
+        else:
+            if key not in total:
+                total[key] = RunningSum(self._summation)
+            total[key].add(value)
+
+    def _add_vector(self, a):
+        """Add a vector to a dense running sum.
+        """
+        if self._summation == NAIVE:
+            self._total += a
+        else:
+            self._total.add(a)
+
+    def finalize(self):
+        """Create a review of the running sum.
+
+        The accumulator can be used after this method is called.
+
+        Returns:
+          a HistoReview, or a DenseHistoReview if bins are given.
+        """
+        if self._bins is None:
+            if self._summation == NAIVE:
+                return HistoReview._from_dict(dict(self._total))
+            return HistoReview._from_dict(
+                {k: v.value for k, v in self._total.items()})
+        if self._summation == NAIVE:
+            return DenseHistoReview._from_array(self._bins, self._total.copy())
+        return DenseHistoReview._from_array(self._bins, self._total.value)
+
+    def __str__(self):
+        return str(self.finalize())
+
+
+class HistoMatrix(object):
+    """Sparse matrix of histogram reviews.
+
+    Rows of the matrix are reviews and columns are bins. The matrix is
+    stored in the compressed sparse row format, i.e. `indptr`, `indices`,
+    and `data` arrays, so that a large number of reviews are kept in flat
+    arrays instead of one dict per review. Summaries of groups of rows,
+    e.g. reviews of each product, and differences between rows and those
+    summaries are computed as vectorized reductions.
+
+    Use :meth:`from_triples` or :meth:`from_reviews` to build a matrix.
+
+    Args:
+      indptr: an integer array of which i-th element is the position of
+        the first entry of i-th row.
+      indices: an integer array of bin indexes of entries.
+      data: a float array of weights of entries.
+      bins: an instance of :class:`Bins` associated with columns.
+    """
+    __slots__ = ("_indptr", "_indices", "_data", "_bins")
+
+    def __init__(self, indptr, indices, data, bins):
+        if not isinstance(bins, Bins):
+            bins = Bins(bins)
+        self._indptr = np.asarray(indptr, dtype=np.int64)
+        self._indices = np.asarray(indices, dtype=np.int64)
+        self._data = np.asarray(data, dtype=np.float64)
+        self._bins = bins
+        if len(self._indices) != len(self._data) or \
+                self._indptr[-1] != len(self._data):
+            raise ValueError("indptr, indices, and data are inconsistent.")
+
+    @classmethod
+    def from_triples(cls, rows, ratings, weights=None, quantizer=round,
+                     n_rows=None, bins=None):
+        """Create a matrix from (row, rating, weight) triples.
+
+        Ratings are quantized by the given quantizer and weights of triples
+        having a same row and a same quantized rating are summed up.
+
+        Args:
+          rows: an integer array of row indexes.
+          ratings: an array of ratings.
+          weights: an array of weights (default: all ones).
+          quantizer: a function or a :class:`review.quantizer.Quantizer` to
+            quantize ratings (default: round).
+          n_rows: the number of rows (default: the max row index + 1).
+          bins: an instance of :class:`Bins` or an iterable of quantized
+            ratings (default: the bins of the quantizer if it has, otherwise
+            all quantized ratings in the triples).
+
+        Returns:
+          a new HistoMatrix.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        keys = _quantize(np.asarray(ratings), quantizer)
+        if weights is None:
+            weights = np.ones(len(rows))
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+        if not len(rows) == len(keys) == len(weights):
+            raise ValueError("rows, ratings, and weights must have a same length.")
+        if n_rows is None:
+            n_rows = int(rows.max()) + 1 if len(rows) else 0
+
+        if bins is None:
+            bins = _bins_of(quantizer)
+        if bins is None:
+            bins = Bins(np.unique(keys).tolist())
+        elif not isinstance(bins, Bins):
+            bins = Bins(bins)
+        cols = _columns(bins, keys)
+
+        cells, inverse = np.unique(rows * len(bins) + cols, return_inverse=True)
+        data = np.bincount(inverse.ravel(), weights=weights, minlength=len(cells))
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(cells // len(bins), minlength=n_rows), out=indptr[1:])
+        return cls(indptr, cells % len(bins), data, bins)
+
+    @classmethod
+    def from_reviews(cls, reviews, bins=None):
+        """Create a matrix from histogram reviews.
+
+        Args:
+          reviews: an iterable of HistoReview.
+          bins: an instance of :class:`Bins` or an iterable of quantized
+            ratings (default: all ratings in the reviews).
+
+        Returns:
+          a new HistoMatrix of which i-th row is the i-th review.
+        """
+        rows, keys, weights = [], [], []
+        n_rows = 0
+        for i, r in enumerate(reviews):
+            if not isinstance(r, HistoReview):
+                raise TypeError("r must be an HistoReview: {0}".format(type(r)))
+            for k, v in r.vector.items():
+                rows.append(i)
+                keys.append(k)
+                weights.append(v)
+            n_rows = i + 1
+        return cls.from_triples(rows, keys, weights, _identity, n_rows, bins)
+
+    @property
+    def bins(self):
+        """Domain of histograms associated with columns."""
+        return self._bins
+
+    @property
+    def shape(self):
+        """Tuple of the number of rows and the number of bins."""
+        return len(self._indptr) - 1, len(self._bins)
+
+    @property
+    def nnz(self):
+        """The number of stored entries."""
+        return len(self._data)
+
+    def __len__(self):
+        return len(self._indptr) - 1
+
+    def __getitem__(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("row index out of range: {0}".format(i))
+        start, end = self._indptr[i], self._indptr[i + 1]
+        keys = self._bins.keys
+        return HistoReview({
+            keys[j]: v for j, v in zip(
+                self._indices[start:end], self._data[start:end])
+        }, _identity)
+
+    def _row_indexes(self):
+        """Row index of each stored entry.
+        """
+        return np.repeat(np.arange(len(self)), np.diff(self._indptr))
+
+    def toarray(self):
+        """Dense representation of this matrix.
+
+        Returns:
+          a two dimensional float array.
+        """
+        res = np.zeros(self.shape)
+        res[self._row_indexes(), self._indices] = self._data
+        return res
+
+    def dot(self, vector):
+        """Product of this matrix and a vector.
+
+        Args:
+          vector: a float array of which length is the number of bins.
+
+        Returns:
+          a float array of inner products between rows and the vector.
+        """
+        vector = np.asarray(vector, dtype=np.float64)
+        return np.bincount(
+            self._row_indexes(), weights=self._data * vector[self._indices],
+            minlength=len(self))
+
+    def weighted_sum(self, weights):
+        """Weighted sum of rows.
+
+        Args:
+          weights: a float array of weights of rows.
+
+        Returns:
+          a float array of which length is the number of bins.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        return np.bincount(
+            self._indices, weights=self._data * weights[self._row_indexes()],
+            minlength=len(self._bins))
+
+    def means(self, groups, n_groups=None):
+        """Mean histograms of groups of rows.
+
+        Args:
+          groups: an integer array of group indexes of rows.
+          n_groups: the number of groups (default: the max group index + 1).
+
+        Returns:
+          a two dimensional float array of which i-th row is the mean
+          histogram of rows in the i-th group. Rows of empty groups are NaN.
+        """
+        sums, counts = self._sums(groups, n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts[:, np.newaxis].astype(np.float64)
+
+    def summaries(self, groups, n_groups=None):
+        """Summaries of groups of rows.
+
+        Summaries keep the numbers of rows in their groups, so that they can
+        be merged with other summaries.
+
+        Args:
+          groups: an integer array of group indexes of rows.
+          n_groups: the number of groups (default: the max group index + 1).
+
+        Returns:
+          a list of dense HistoSummary of which i-th element summarizes rows
+          in the i-th group. Elements for empty groups are None.
+        """
+        sums, counts = self._sums(groups, n_groups)
+        return [
+            HistoSummary._from_sums(
+                int(n), DenseHistoReview._from_array(self._bins, v))
+            if n else None
+            for v, n in zip(sums, counts)]
+
+    def _sums(self, groups, n_groups):
+        """Sums of rows and the numbers of rows of groups.
+
+        Returns:
+          a tuple of a two dimensional float array of which i-th row is the
+          sum of rows in the i-th group, and an integer array of the numbers
+          of rows in groups.
+        """
+        groups = self._groups(groups)
+        if n_groups is None:
+            n_groups = int(groups.max()) + 1 if len(groups) else 0
+        n_bins = len(self._bins)
+        sums = np.bincount(
+            groups[self._row_indexes()] * n_bins + self._indices,
+            weights=self._data, minlength=n_groups * n_bins,
+        ).reshape(n_groups, n_bins)
+        return sums, np.bincount(groups, minlength=n_groups)
+
+    def differences(self, means, groups):
+        """Differences between rows and the summaries of their groups.
+
+        Args:
+          means: a two dimensional float array returned by :meth:`means`.
+          groups: an integer array of group indexes of rows.
+
+        Returns:
+          a float array of which i-th element is the difference between i-th
+          row and the summary of its group, defined as same as
+          :meth:`HistoSummary.difference`.
+        """
+        groups = self._groups(groups)
+        rows = self._row_indexes()
+        inner = np.bincount(
+            rows, weights=self._data * means[groups[rows], self._indices],
+            minlength=len(self))
+        return np.abs(1 - inner)
+
+    def _groups(self, groups):
+        """Validate group indexes.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        if groups.shape != (len(self),):
+            raise ValueError(
+                "groups must have one index per row: {0} != {1}".format(
+                    groups.shape, (len(self),)))
+        return groups
+
+
+def _accumulate(reviews, bins=None, chunksize=CHUNKSIZE, summation=NAIVE):
+    """Sum a stream of reviews in one pass.
+
+    If bins are not given and the first review is dense, the sum is dense
+    until a review not sharing the bins appears.
+
+    Args:
+      reviews: an iterable of reviews, ratings, or arrays of ratings.
+      bins: an instance of Bins to sum reviews as dense reviews
+        (default: None).
+      chunksize: the number of ratings added at once.
+      summation: a summation mode defined in :mod:`review.summation`.
+
+    Returns:
+      a tuple of a HistoAccumulator of the sum and the number of reviews.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive: {0}".format(chunksize))
+    acc = None
+    if bins is not None:
+        acc = HistoAccumulator(bins, summation=summation)
+    buf = []
+    n = 0
+    for r in reviews:
+        if isinstance(r, HistoReview):
+            if acc is None:
+                acc = HistoAccumulator(
+                    r.bins if isinstance(r, DenseHistoReview) else None,
+                    summation=summation)
+            elif bins is None and acc.bins is not None and not (
+                    isinstance(r, DenseHistoReview) and r.bins == acc.bins):
+                acc = HistoAccumulator(summation=summation).iadd(
+                    acc.finalize())
+            acc.iadd(r)
+            n += 1
+            continue
+        if acc is None:
+            acc = HistoAccumulator(summation=summation)
+        if isinstance(r, np.ndarray):
+            acc.extend(r)
+            n += r.size
+            continue
+        if not isinstance(r, numbers.Number):
+            raise TypeError("r ({0}) is not a review or a rating.".format(type(r)))
+        buf.append(r)
+        if len(buf) == chunksize:
+            acc.extend(buf)
+            n += len(buf)
+            del buf[:]
+    if buf:
+        acc.extend(buf)
+        n += len(buf)
+    if not n:
+        raise ValueError("no reviews are given.")
+    return acc, n
+
+
+def _mean(total, n):
+    """Mean review of a sum of reviews.
+
+    Args:
+      total: a HistoReview of the sum of reviews.
+      n: the number of reviews.
+
+    Returns:
+      a HistoReview, or a DenseHistoReview if the sum is dense. If n is zero,
+      an empty review or a dense review of zeros.
+    """
+    if isinstance(total, DenseHistoReview):
+        if not n:
+            return DenseHistoReview._from_array(
+                total.bins, np.zeros(len(total.bins)))
+        return DenseHistoReview._from_array(total.bins, total.array / n)
+    if not n:
+        return HistoReview._from_dict({})
+    return HistoReview._from_dict({k: v / n for k, v in total.vector.items()})
+
+
+def _combine(x, y, op):
+    """Combine partial sums of bins of two summaries.
+
+    Args:
+      x: a dict mapping bins to partial sums.
+      y: a dict mapping bins to partial sums.
+      op: add_partials or subtract_partials.
+
+    Returns:
+      a dict mapping bins in either of them to combined partial sums.
+    """
+    return {k: op(x.get(k, ()), y.get(k, ())) for k in set(x) | set(y)}
+
+
+def _exact_review(total, partials):
+    """Replace weights of a sum of reviews with exact sums.
+
+    Args:
+      total: a HistoReview or a DenseHistoReview of the sum.
+      partials: a dict mapping bins to partial sums.
+
+    Returns:
+      a review of the same type as the sum of which weights are the
+      correctly rounded sums of the partials.
+    """
+    if isinstance(total, DenseHistoReview):
+        a = np.zeros(len(total.bins))
+        for k, p in partials.items():
+            a[total.bins.index(k)] = math.fsum(p)
+        return DenseHistoReview._from_array(total.bins, a)
+    return HistoReview._from_dict(
+        {k: math.fsum(p) for k, p in partials.items()})
+
+
+_INTERNED = {}
+"""Cache of interned one-hot reviews."""
+
+_INTERNED_VECTORS = OrderedDict()
+"""Cache of interned reviews of other vectors in least recently used order."""
+
+_INTERNED_VECTORS_SIZE = 1024
+"""The maximum number of reviews in _INTERNED_VECTORS."""
+
+
+def _histo_review(v, date):
+    """Restore a HistoReview pickled by HistoReview.__reduce__.
+    """
+    return HistoReview._from_dict(v, date)
+
+
+def _dense_histo_review(bins, a, date):
+    """Restore a DenseHistoReview pickled by DenseHistoReview.__reduce__.
+    """
+    return DenseHistoReview._from_array(bins, a, date)
+
+
+def _one_hot(key, bins=None):
+    """Interned review of a single quantized rating.
+
+    Args:
+      key: a quantized rating.
+      bins: an instance of Bins to create a dense review (default: None).
+
+    Returns:
+      a shared OneHotHistoReview, or a DenseHistoReview if bins are given.
+    """
+    ident = (bins, key)
+    res = _INTERNED.get(ident)
+    if res is None:
+        if bins is None:
+            res = OneHotHistoReview(key)
+        else:
+            res = DenseHistoReview(key, _identity, bins=bins)
+        _INTERNED[ident] = res
+    return res
+
+
+def _quantize(ratings, quantizer):
+    """Quantize an array of ratings.
+
+    Args:
+      ratings: an array of ratings.
+      quantizer: a function or a Quantizer to quantize ratings.
+
+    Returns:
+      an array of quantized ratings.
+    """
+    if hasattr(quantizer, "quantize"):
+        return quantizer.quantize(ratings)
+    if quantizer is round:
+        return np.round(ratings.astype(np.float64)).astype(np.int64)
+    if quantizer is _identity:
+        return ratings
+    return np.array([quantizer(v) for v in ratings])
+
+
+def _columns(bins, keys):
+    """Column indexes of quantized ratings.
+
+    Args:
+      bins: an instance of Bins.
+      keys: an array of quantized ratings.
+
+    Returns:
+      an integer array of positions of the ratings in the bins.
+    """
+    cols = np.searchsorted(bins.values, keys)
+    found = np.zeros(len(keys), dtype=bool)
+    inside = cols < len(bins)
+    found[inside] = bins.values[cols[inside]] == keys[inside]
+    if not found.all():
+        raise ValueError(
+            "{0} is not in the bins {1}".format(keys[~found][0], bins))
+    return cols
+
+
+def _to_dense(r, bins):
+    """Convert a review or a rating to a dense review.
+
+    Args:
+      r: a HistoReview or a rating.
+      bins: an instance of Bins.
+
+    Returns:
+      a DenseHistoReview defined on the given bins.
+    """
+    if isinstance(r, DenseHistoReview) and r.bins == bins:
+        return r
+    if isinstance(r, HistoReview):
+        return DenseHistoReview(r.vector, _identity, r.date, bins)
+    return DenseHistoReview(r, bins=bins)
+
+
+def _share_bins(reviews):
+    """Check given reviews are dense reviews sharing the same bins.
+    """
+    if not reviews or not isinstance(reviews[0], DenseHistoReview):
+        return False
+    bins = reviews[0].bins
+    return all(
+        isinstance(r, DenseHistoReview) and r.bins == bins for r in reviews)
+
+
+def _bins_of(quantizer):
+    """Domain of bins reported by a quantizer.
+
+    Returns:
+      an instance of Bins, or None if the quantizer doesn't report a domain.
+    """
+    return getattr(quantizer, "bins", None)
+
+
+def _identity(v):
+    """Quantizer which doesn't change values.
+    """
+    return v
@@ -0,0 +1,273 @@
+#
+# instrument.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Opt-in counters and timers of review operations.
+
+:func:`enable` replaces methods of reviews and summaries with wrappers which
+count and time their calls, and :func:`disable` restores the original
+methods. While instrumentation is disabled, which is the default,
+no wrappers are installed and the library runs at full speed.
+
+The following statistics are collected:
+
+- `calls`: the number of calls of each instrumented method, keyed by
+  `ClassName.method` of the class defining it; summaries created from sums
+  of reviews, e.g. by merging, grouped summaries, timelines, and stores,
+  are counted as calls of `_from_sums`,
+- `time`: total seconds spent in each instrumented method, including time
+  spent in nested instrumented calls,
+- `allocations`: the number of reviews created, keyed by class names,
+- `bins`: the number of histogram bins produced by additions and
+  multiplications of histogram reviews, and visited by their inner
+  products.
+
+Example::
+
+  from review import instrument
+
+  instrument.enable()
+  try:
+      run_mining()
+  finally:
+      instrument.disable()
+  print(instrument.snapshot())
+
+Summary methods and histogram arithmetic are looked up in all subclasses
+of :class:`review.base.Summary` and :class:`review.histogram.HistoReview`
+when :func:`enable` is called, so subclasses defined later are
+instrumented by the next call.
+
+Counters are not synchronized, so instrument only single threaded runs.
+"""
+from __future__ import absolute_import
+from collections import defaultdict
+import contextlib
+import functools
+import time
+
+from review import approximate  # pylint: disable=unused-import
+from review import base
+from review import sketch  # pylint: disable=unused-import
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.scalar import AverageReview
+
+try:
+    _clock = time.perf_counter
+except AttributeError:  # pragma: no cover
+    _clock = time.time
+
+
+_TIMED = (
+    "__init__", "_from_sums", "add", "extend", "remove", "update",
+    "difference", "differences")
+"""Summary methods of which calls are counted and timed."""
+
+_ARITHMETIC = (
+    (base._ImmutableAdditiveGroup, ("__sub__",)),
+    (base._MultipliableImmutableAdditiveGroup, (
+        "__div__", "__truediv__", "__floordiv__", "__neg__")),
+    (base.Review, ("__mul__",)),
+    (AverageReview, ("__add__", "__rmul__")),
+)
+"""Review arithmetic of which calls are counted."""
+
+_HISTOGRAM = ("__add__", "__rmul__", "inner_product")
+"""Histogram arithmetic of which calls and bins are counted."""
+
+_calls = defaultdict(int)
+_time = defaultdict(float)
+_allocations = defaultdict(int)
+_bins = defaultdict(int)
+
+_originals = []
+"""Triples of a class, a method name, and the original method."""
+
+
+def enable():
+    """Install instrumentation wrappers.
+
+    Calling this function when instrumentation is already enabled does
+    nothing. Collected statistics are kept; use :func:`reset` to clear them.
+    """
+    if _originals:
+        return
+    for cls in _subclasses(base.Summary):
+        for name in _TIMED:
+            if name in cls.__dict__:
+                _patch(cls, name, _timed)
+    for cls, names in _ARITHMETIC:
+        for name in names:
+            _patch(cls, name, _counted)
+    for cls in _subclasses(HistoReview):
+        for name in _HISTOGRAM:
+            if name in cls.__dict__:
+                _patch(cls, name, _counted_bins)
+    _patch(base.Review, "__init__", _allocation)
+
+
+def disable():
+    """Remove instrumentation wrappers and restore the original methods.
+
+    Collected statistics are kept until :func:`reset` is called.
+    """
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+
+
+def is_enabled():
+    """Check instrumentation is enabled.
+
+    Returns:
+      True if wrappers are installed.
+    """
+    return bool(_originals)
+
+
+@contextlib.contextmanager
+def instrumented():
+    """Context manager enabling instrumentation in its block.
+
+    Yields:
+      a function returning :func:`snapshot`.
+    """
+    enable()
+    try:
+        yield snapshot
+    finally:
+        disable()
+
+
+def snapshot():
+    """Collected statistics.
+
+    Returns:
+      a dict of which keys are `calls`, `time`, `allocations`, and `bins`,
+      and values are dicts of the statistics. The returned dicts are copies
+      and are not updated afterward.
+    """
+    return {
+        "calls": dict(_calls),
+        "time": dict(_time),
+        "allocations": dict(_allocations),
+        "bins": dict(_bins),
+    }
+
+
+def reset():
+    """Clear collected statistics.
+    """
+    for counter in (_calls, _time, _allocations, _bins):
+        counter.clear()
+
+
+def _subclasses(cls):
+    """A class and all of its subclasses.
+
+    Returns:
+      a list of classes; each class appears once.
+    """
+    res = [cls]
+    for c in res:
+        for sub in c.__subclasses__():
+            if sub not in res:
+                res.append(sub)
+    return res
+
+
+def _patch(cls, name, wrap):
+    """Replace a method defined in a class with a wrapper.
+
+    Class methods are unwrapped, and the wrapper is made a class method.
+    """
+    original = cls.__dict__[name]
+    _originals.append((cls, name, original))
+    key = "{0}.{1}".format(cls.__name__, name)
+    if isinstance(original, classmethod):
+        setattr(cls, name, classmethod(wrap(original.__func__, key)))
+    else:
+        setattr(cls, name, wrap(original, key))
+
+
+def _timed(func, key):
+    """Wrap a method to count and time its calls.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Instrumented method."""
+        _calls[key] += 1
+        start = _clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _time[key] += _clock() - start
+    return wrapper
+
+
+def _counted(func, key):
+    """Wrap a method to count its calls.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Instrumented method."""
+        _calls[key] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _counted_bins(func, key):
+    """Wrap a histogram method to count its calls and bins.
+
+    The bins of a returned review are counted for arithmetic, and the bins of
+    the smaller operand are counted for inner products.
+    """
+    @functools.wraps(func)
+    def wrapper(self, other):
+        """Instrumented method."""
+        _calls[key] += 1
+        res = func(self, other)
+        if isinstance(res, HistoReview):
+            _bins[key] += _n_bins(res)
+        else:
+            _bins[key] += min(_n_bins(self), _n_bins(other))
+        return res
+    return wrapper
+
+
+def _allocation(func, _):
+    """Wrap the constructor of reviews to count created reviews.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        """Instrumented constructor."""
+        _allocations[type(self).__name__] += 1
+        return func(self, *args, **kwargs)
+    return wrapper
+
+
+def _n_bins(r):
+    """The number of bins of a histogram review.
+    """
+    if isinstance(r, DenseHistoReview):
+        return len(r.bins)
+    if isinstance(r, HistoReview):
+        return len(r.vector)
+    return 0
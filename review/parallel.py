@@ -0,0 +1,234 @@
+#
+# parallel.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Compute summaries of many groups of reviews in parallel.
+
+:func:`summarize_many` packs each group of reviews into flat numpy arrays,
+computes sums of the groups in a process pool, and builds summaries from
+the sums. Reviews themselves are never sent to worker processes.
+
+Packing runs serially in the parent process, and it reads every review
+object, so for groups of in-memory review objects it costs about as much
+as summarizing them, and `workers > 1` doesn't make :func:`summarize_many`
+faster. The pool pays off when groups are already columnar, i.e.
+:class:`review.scalar.ReviewArray` or arrays of scores which are sent as
+they are, or when the reduction dominates, e.g. with `summation="fsum"`.
+"""
+from __future__ import absolute_import
+import multiprocessing
+
+import numpy as np
+
+from review.base import Summary
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.scalar import AverageReview
+from review.scalar import ReviewArray
+from review.scalar import _sum
+from review.scalar import _to_array
+from review.summation import MODES
+from review.summation import NAIVE
+from review.summation import PAIRWISE
+from review.summation import group_totals
+
+
+def summarize_many(groups, summary_cls, workers=None, chunksize=1,
+                   summation=None):
+    """Compute summaries of groups of reviews.
+
+    The summary class is chosen by `review_class` of the given summary class;
+    groups for :class:`review.scalar.AverageSummary` are sent to workers as
+    float arrays of scores and groups for
+    :class:`review.histogram.HistoSummary` are sent as arrays of bins and
+    weights. Workers compute the sums of reviews, and summaries are created
+    from the numbers of reviews and the sums, so that they can be merged
+    later.
+
+    If `workers` is None or less than two, or a process pool is not
+    available on the platform, summaries are computed serially. Serial and
+    parallel executions compute the sums with the same function and give
+    the same results. Groups are packed in this process before they are
+    sent to workers; see the module documentation for when workers help.
+
+    With `summation="fsum"`, the sums are correctly rounded and the
+    summaries keep exact partial sums, so that merging summaries of shards
+    of a group gives bit for bit the same result as summarizing the whole
+    group, however the group is sharded.
+
+    Args:
+      groups: an iterable of groups, each of which is an iterable of reviews
+        or ratings, or a mapping from keys to such groups.
+      summary_cls: AverageSummary, HistoSummary, or their incremental
+        subclass; summaries which keep more than sums of reviews, e.g.
+        weighted, distribution, and sampled summaries, are not supported.
+      workers: the number of worker processes (default: None).
+      chunksize: the number of groups sent to a worker at once (default: 1).
+      summation: a summation mode defined in :mod:`review.summation`
+        (default: pairwise for scalar summaries and naive for histogram
+        summaries, as their constructors).
+
+    Returns:
+      a list of summaries in the same order as the groups, or a dict mapping
+      the keys to summaries if the groups are given as a mapping.
+
+    Raises:
+      TypeError: if the summary class doesn't define its own way to be
+        created from sums of reviews.
+    """
+    keys = None
+    if hasattr(groups, "keys"):
+        keys = list(groups.keys())
+        groups = [groups[k] for k in keys]
+
+    if not isinstance(summary_cls, type) or not issubclass(summary_cls, Summary):
+        raise TypeError("{0} is not a summary class.".format(summary_cls))
+    if "_from_sums" not in vars(summary_cls):
+        raise TypeError(
+            "{0} can't be created from sums of reviews.".format(summary_cls))
+    if summation is not None and summation not in MODES:
+        raise ValueError("unknown summation mode: {0}".format(summation))
+    review_cls = summary_cls.review_class()
+    if issubclass(review_cls, AverageReview):
+        summation = summation or PAIRWISE
+        packed = [((_pack_scores(g), summation), None) for g in groups]
+        func, build = _average, _average_total
+    elif issubclass(review_cls, HistoReview):
+        summation = summation or NAIVE
+        packed = [_pack_histograms(g, summation) for g in groups]
+        func, build = _histogram, _histogram_review
+    else:
+        raise TypeError(
+            "{0} is not a supported summary class.".format(summary_cls))
+
+    payloads = [p for p, _ in packed]
+    sums = None
+    if workers is not None and workers > 1 and len(payloads) > 1:
+        sums = _parallel_map(func, payloads, workers, chunksize)
+    if sums is None:
+        sums = [func(p) for p in payloads]
+
+    res = [
+        summary_cls._from_sums(n, *build(total, bins))
+        for (_, bins), (n, total) in zip(packed, sums)]
+    if keys is not None:
+        return dict(zip(keys, res))
+    return res
+
+
+def _parallel_map(func, payloads, workers, chunksize):
+    """Apply a function to packed groups in a process pool.
+
+    Returns:
+      a list of results, or None if a process pool is not available.
+    """
+    try:
+        pool = multiprocessing.Pool(workers)
+    except (ImportError, NotImplementedError, OSError):
+        return None
+    try:
+        return pool.map(func, payloads, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _pack_scores(group):
+    """Pack a group of scalar reviews into a float array.
+    """
+    if isinstance(group, ReviewArray):
+        return group.scores
+    return _to_array(group)
+
+
+def _average(packed):
+    """Number and sum of packed scores.
+
+    Returns:
+      a tuple of the number of scores and a tuple of the sum and its partial
+      sums.
+    """
+    scores, summation = packed
+    return len(scores), _sum(scores, summation)
+
+
+def _average_total(total, _):
+    """Sum of scores and its partial sums computed by _average.
+    """
+    return total
+
+
+def _pack_histograms(group, summation):
+    """Pack a group of histogram reviews into flat arrays.
+
+    Returns:
+      a tuple of a payload sent to workers and the Bins of dense reviews or
+      None. The payload is a tuple of an array of bins, an array of weights,
+      the number of reviews, and the summation mode.
+    """
+    keys, weights = [], []
+    n = 0
+    bins = None
+    for r in group:
+        if not isinstance(r, HistoReview):
+            r = HistoReview(r)
+        if n == 0 and isinstance(r, DenseHistoReview):
+            bins = r.bins
+        elif bins is not None and not (
+                isinstance(r, DenseHistoReview) and r.bins == bins):
+            bins = None
+        for k, v in r.vector.items():
+            keys.append(k)
+            weights.append(v)
+        n += 1
+    if not n:
+        raise ValueError("a group of histogram reviews must not be empty.")
+    return (
+        np.array(keys), np.array(weights, dtype=np.float64), n, summation
+    ), bins
+
+
+def _histogram(packed):
+    """Sum histogram of packed reviews.
+
+    Returns:
+      a tuple of the number of reviews and a tuple of an array of bins,
+      an array of summed weights, and partial sums of the bins or None.
+    """
+    keys, weights, n, summation = packed
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums, partials = group_totals(
+        inverse.ravel(), weights, len(unique), summation)
+    return n, (unique, sums, partials)
+
+
+def _histogram_review(total, bins):
+    """Create a review and partial sums from a sum computed by _histogram.
+    """
+    keys, weights, partials = total
+    keys = keys.tolist()
+    if partials is not None:
+        partials = dict(zip(keys, partials))
+    if bins is None:
+        return HistoReview._from_dict(
+            dict(zip(keys, weights.tolist()))), partials
+    a = np.zeros(len(bins))
+    for k, v in zip(keys, weights):
+        a[bins.index(k)] = v
+    return DenseHistoReview._from_array(bins, a), partials
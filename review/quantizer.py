@@ -0,0 +1,213 @@
+#
+# quantizer.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Quantizers of ratings for histogram reviews.
+
+A quantizer maps a rating to a bin of histograms. Quantizers defined in this
+module can be passed to :class:`review.histogram.HistoReview` and its bulk
+constructors instead of a function such as the builtin round.
+They quantize whole arrays at once with :meth:`Quantizer.quantize`, and
+report their domain of bins via :attr:`Quantizer.bins` if it is bounded,
+so that histograms built with them by
+:meth:`review.histogram.HistoReview.create` and the bulk constructors use
+the dense representation.
+"""
+from __future__ import absolute_import
+import math
+import numbers
+
+import numpy as np
+
+from review.histogram import Bins
+
+
+class Quantizer(object):
+    """Abstract class of quantizers.
+
+    Subclass must implement `quantize` method which quantizes an array of
+    ratings. Subclass having a bounded domain also overrides `bins` property.
+    """
+    __slots__ = ()
+
+    def __call__(self, v):
+        """Quantize a rating.
+
+        Args:
+          v: a rating.
+
+        Returns:
+          the quantized rating.
+        """
+        if not isinstance(v, numbers.Number):
+            raise TypeError("v ({0}) is not a scalar value.".format(type(v)))
+        return self.quantize(np.array([v], dtype=np.float64))[0].item()
+
+    def quantize(self, values):
+        """Quantize an array of ratings.
+
+        Args:
+          values: an array of ratings.
+
+        Returns:
+          an array of quantized ratings.
+        """
+        raise NotImplementedError
+
+    @property
+    def bins(self):
+        """Domain of quantized ratings, or None if it is not bounded."""
+        return None
+
+
+class RoundHalfUp(Quantizer):
+    """Round ratings to the nearest integers, rounding halves up.
+
+    Unlike the builtin round, which rounds halves to even numbers,
+    2.5 is quantized to 3.
+
+    Args:
+      low: the smallest quantized rating (default: None).
+      high: the largest quantized rating (default: None).
+        If both of low and high are given, the domain is bounded.
+    """
+    __slots__ = ("_bins")
+
+    def __init__(self, low=None, high=None):
+        self._bins = _integer_bins(low, high)
+
+    def quantize(self, values):
+        return np.floor(np.asarray(values, dtype=np.float64) + .5).astype(np.int64)
+
+    @property
+    def bins(self):
+        return self._bins
+
+
+class Floor(Quantizer):
+    """Round ratings down to integers.
+
+    Args:
+      low: the smallest quantized rating (default: None).
+      high: the largest quantized rating (default: None).
+        If both of low and high are given, the domain is bounded.
+    """
+    __slots__ = ("_bins")
+
+    def __init__(self, low=None, high=None):
+        self._bins = _integer_bins(low, high)
+
+    def quantize(self, values):
+        return np.floor(np.asarray(values, dtype=np.float64)).astype(np.int64)
+
+    @property
+    def bins(self):
+        return self._bins
+
+
+class FixedWidth(Quantizer):
+    """Quantize ratings into bins of a fixed width.
+
+    A rating v is quantized to the lower edge of its bin,
+    `low + width * floor((v - low) / width)`.
+
+    Args:
+      width: width of bins.
+      low: the lower edge of the first bin (default: 0).
+      high: the upper edge of the last bin (default: None). If given,
+        the domain is bounded and the last bin includes `high`.
+    """
+    __slots__ = ("_width", "_low", "_high", "_bins")
+
+    def __init__(self, width, low=0., high=None):
+        if width <= 0:
+            raise ValueError("width must be positive: {0}".format(width))
+        self._width = float(width)
+        self._low = float(low)
+        self._high = None
+        self._bins = None
+        if high is not None:
+            if high <= low:
+                raise ValueError("high must be greater than low.")
+            self._high = float(high)
+            n = int(math.ceil((self._high - self._low) / self._width))
+            self._bins = Bins(self._edges(np.arange(n)).tolist())
+
+    def _edges(self, index):
+        """Lower edges of bins of given indexes.
+        """
+        return self._low + self._width * index
+
+    def quantize(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        index = np.floor((values - self._low) / self._width)
+        if self._high is not None:
+            index[values == self._high] = len(self._bins) - 1
+        return self._edges(index)
+
+    @property
+    def bins(self):
+        return self._bins
+
+
+class BinEdges(Quantizer):
+    """Quantize ratings into bins given by their edges.
+
+    A rating v is in the i-th bin if `edges[i-1] <= v < edges[i]`, where
+    the 0-th bin is below `edges[0]` and the last bin is at or above
+    `edges[-1]`, i.e. there are `len(edges) + 1` bins as same as
+    :func:`numpy.digitize`.
+
+    Args:
+      edges: a monotonically increasing sequence of edges.
+      labels: quantized ratings of bins (default: indexes of bins).
+    """
+    __slots__ = ("_edges", "_labels", "_bins")
+
+    def __init__(self, edges, labels=None):
+        self._edges = np.asarray(edges, dtype=np.float64)
+        if self._edges.ndim != 1 or (np.diff(self._edges) <= 0).any():
+            raise ValueError("edges must be monotonically increasing.")
+        if labels is None:
+            labels = range(len(self._edges) + 1)
+        self._labels = np.asarray(list(labels))
+        if len(self._labels) != len(self._edges) + 1:
+            raise ValueError(
+                "the number of labels must be len(edges) + 1: {0} != {1}".format(
+                    len(self._labels), len(self._edges) + 1))
+        self._bins = Bins(self._labels.tolist())
+
+    def quantize(self, values):
+        return self._labels[np.digitize(
+            np.asarray(values, dtype=np.float64), self._edges)]
+
+    @property
+    def bins(self):
+        return self._bins
+
+
+def _integer_bins(low, high):
+    """Domain of integer ratings between low and high.
+
+    Returns:
+      an instance of Bins if both of low and high are given, otherwise None.
+    """
+    if low is None or high is None:
+        return None
+    return Bins(range(int(low), int(high) + 1))
@@ -21,11 +21,18 @@
 """Implementations of scalar review and summary classes.
 """
 from __future__ import absolute_import
+import datetime
+import math
 import numbers
 import numpy as np
 
 from review.base import Review
 from review.base import Summary
+from review.summation import FSUM
+from review.summation import PAIRWISE
+from review.summation import RunningSum
+from review.summation import add_partials
+from review.summation import subtract_partials
 
 
 class AverageReview(Review):
@@ -72,6 +79,37 @@ class AverageReview(Review):
                 "other is {0}, not numbers.Number".format(type(other)))
         return AverageReview(other * self.score)
 
+    @classmethod
+    def from_array(cls, values, dates=None):
+        """Create reviews from an array of scores at once.
+
+        Args:
+          values: an array or an iterable of float values.
+          dates: an array or an iterable of dates of the reviews (default: None).
+
+        Returns:
+          a ReviewArray of the reviews.
+
+        Raises:
+          TypeError: if some of the values are not numbers.
+        """
+        if not hasattr(values, "__len__"):
+            values = np.fromiter(
+                (_score(v) for v in values), dtype=np.float64)
+        elif not isinstance(values, ReviewArray):
+            values = np.asarray(values)
+            if values.dtype.kind not in "biuf":
+                raise TypeError("values must be an array of numbers.")
+        if dates is not None and not hasattr(dates, "__len__"):
+            dates = list(dates)
+        return ReviewArray(values, dates)
+
+    def __reduce__(self):
+        if type(self) is AverageReview:
+            return AverageReview, (self._v, self.date)
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
     def __str__(self):
         return str(self.score)
 
@@ -79,39 +117,322 @@ class AverageReview(Review):
         return hash(self.score)
 
 
+class ReviewArray(object):
+    """Column of scalar reviews.
+
+    ReviewArray stores review scores in a float64 array and, optionally,
+    dates in a datetime64 array so that a large number of reviews doesn't
+    need one :class:`AverageReview` object per review.
+    :class:`AverageSummary` accepts a ReviewArray directly and
+    :meth:`AverageSummary.difference` computes differences of all reviews
+    in a ReviewArray at once.
+
+    Indexing with an integer returns an :class:`AverageReview` and indexing
+    with a slice returns another ReviewArray sharing the same buffers.
+
+    Args:
+      scores: an iterable of float values representing review scores.
+      dates: an iterable of dates of the reviews, or None (default: None).
+        Dates are :class:`datetime.date`, :class:`numpy.datetime64`, or
+        ISO 8601 strings, and missing dates can be given as None; other
+        values, e.g. numbers, raise TypeError.
+    """
+    __slots__ = ("_scores", "_dates")
+
+    DATE_TYPE = "datetime64[us]"
+    """Data type of date columns."""
+
+    def __init__(self, scores, dates=None):
+        try:
+            scores = np.asarray(scores, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise TypeError("scores must be an iterable of scalar values.")
+        if scores.ndim != 1:
+            raise ValueError("scores must be one dimensional.")
+        self._scores = _read_only(scores)
+
+        self._dates = None
+        if dates is not None:
+            dates = _to_dates(dates)
+            if dates.shape != scores.shape:
+                raise ValueError(
+                    "dates must have the same length as scores: {0} != {1}".format(
+                        len(dates), len(scores)))
+            self._dates = _read_only(dates)
+
+    @classmethod
+    def from_reviews(cls, reviews):
+        """Create a ReviewArray from reviews.
+
+        Args:
+          reviews: an iterable of AverageReview.
+
+        Returns:
+          a ReviewArray consisting of the scores and dates of the given
+          reviews.
+        """
+        reviews = list(reviews)
+        for r in reviews:
+            if not isinstance(r, AverageReview):
+                raise TypeError("r is {0}, not AverageReview".format(type(r)))
+        dates = None
+        if any(r.date is not None for r in reviews):
+            dates = [r.date for r in reviews]
+        return cls([r.score for r in reviews], dates)
+
+    def to_reviews(self):
+        """Convert this array to a list of reviews.
+
+        Returns:
+          a list of AverageReview.
+        """
+        return list(self)
+
+    @property
+    def scores(self):
+        """Read-only float64 array of review scores."""
+        return self._scores
+
+    @property
+    def dates(self):
+        """Read-only datetime64 array of review dates or None."""
+        return self._dates
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __iter__(self):
+        if self._dates is None:
+            for v in self._scores:
+                yield AverageReview(v)
+        else:
+            for v, d in zip(self._scores, self._dates.astype(object)):
+                yield AverageReview(v, d)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            res = ReviewArray.__new__(ReviewArray)
+            res._scores = self._scores[key]
+            res._dates = self._dates[key] if self._dates is not None else None
+            return res
+        if self._dates is None:
+            return AverageReview(self._scores[key])
+        return AverageReview(self._scores[key], self._dates[key].astype(object))
+
+    def __eq__(self, other):
+        if not isinstance(other, ReviewArray):
+            return False
+        if not np.array_equal(self._scores, other.scores):
+            return False
+        if self._dates is None or other.dates is None:
+            return self._dates is None and other.dates is None
+        return np.array_equal(self._dates, other.dates)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
+    def __str__(self):
+        return str(self._scores)
+
+
+CHUNKSIZE = 1024
+"""Default number of values summed at once in streaming summaries."""
+
+
 class AverageSummary(Summary):
     """Scalar summary.
 
-    The summary is an average of given reviews.
+    The summary is an average of given reviews. It also keeps the number of
+    the reviews and the sum of their scores, so that summaries of disjoint
+    sets of reviews can be merged, and a summary of a subset can be
+    subtracted, without reading the reviews again.
+
+    With `summation="fsum"`, the summary also keeps the sum exactly as
+    partial sums, so that the score is the correctly rounded mean and
+    merging and subtracting such summaries are exact.
+
+    Args:
+      scores: an iterable of reviews or float values, a ReviewArray,
+        an array of scores, a single review, or a single float value.
+      summation: a summation mode defined in :mod:`review.summation`
+        (default: pairwise).
     """
-    __slots__ = ("_v")  # _v : an instance of AgerageReview
-
-    def __init__(self, scores):
-        if hasattr(scores, "__iter__"):
-            v = np.mean(list(scores))
-            if isinstance(v, AverageReview):
-                self._v = v
-            else:
-                self._v = AverageReview(v)
-        elif isinstance(scores, AverageReview):
-            self._v = scores
+    # _v : an instance of AgerageReview
+    # _n : the number of reviews, _total: the sum of their scores
+    # _partials: partial sums of the scores in fsum mode, otherwise None
+    __slots__ = ("_v", "_n", "_total", "_partials")
+
+    def __init__(self, scores, summation=PAIRWISE):
+        if isinstance(scores, ReviewArray):
+            self._assign(len(scores), *_sum(scores.scores, summation))
+        elif isinstance(scores, np.ndarray):
+            scores = _to_array(scores).ravel()
+            self._assign(len(scores), *_sum(scores, summation))
+        elif hasattr(scores, "__iter__"):
+            n, total = _stream(scores, summation=summation)
+            self._assign(n, total.value, total.partials)
         else:
-            self._v = AverageReview(scores)
+            v = _score(scores)
+            self._assign(1, *_sum(np.array([v], dtype=np.float64), summation))
+            if isinstance(scores, AverageReview):
+                self._v = scores
+
+    def _assign(self, n, total, partials=None):
+        """Set the number of reviews and the sum of their scores.
+        """
+        self._n, self._total, self._partials = n, total, partials
+        self._update()
+
+    @classmethod
+    def _from_sums(cls, n, total, partials=None):
+        """Create a summary from the number of reviews and the sum of scores.
+
+        Args:
+          n: the number of reviews.
+          total: the sum of their scores.
+          partials: exact partial sums of the scores, or None.
+        """
+        res = cls.__new__(cls)
+        res._assign(n, total, partials)
+        return res
+
+    @classmethod
+    def from_stream(cls, scores, chunksize=CHUNKSIZE, summation=PAIRWISE):
+        """Create a summary from a stream of reviews in one pass.
+
+        Reviews are read once and summed chunk by chunk, so that memory usage
+        doesn't depend on the length of the stream. Constructing a summary
+        from an iterable other than an array uses this method with the
+        default arguments.
+
+        With `summation="fsum"`, the score is the correctly rounded mean
+        and doesn't depend on the order of reviews or the chunk size.
+
+        Args:
+          scores: an iterable of reviews or float values. Elements can also
+            be ReviewArrays or arrays of scores, which are summed as chunks.
+          chunksize: the number of scores summed at once (default: 1024).
+          summation: a summation mode defined in :mod:`review.summation`
+            (default: pairwise).
+
+        Returns:
+          a new summary. Its score is NaN if the stream is empty.
+        """
+        n, total = _stream(scores, chunksize, summation)
+        return cls._from_sums(n, total.value, total.partials)
+
+    def _update(self):
+        """Update the summary score from the running sum.
+        """
+        if self._n:
+            self._v = AverageReview(self._total / self._n)
+        else:
+            self._v = AverageReview(float("nan"))
+
+    @property
+    def count(self):
+        """The number of reviews in this summary.
+
+        For weighted summaries, the sum of weights of the reviews.
+        """
+        return self._n
+
+    @property
+    def total(self):
+        """The sum of scores of the reviews in this summary."""
+        return self._total
+
+    def merge(self, other):
+        """Summary of the reviews of this summary and another summary.
+
+        The counts and the sums of scores are added, so that the result is
+        same as the summary of all the reviews up to rounding errors of the
+        sums; they are identical if ratings are integers. If both summaries
+        keep exact partial sums, i.e. they are built with `summation="fsum"`,
+        the partial sums are merged and the result is identical to the
+        summary of all the reviews in that mode.
+
+        Args:
+          other: an AverageSummary of reviews not in this summary.
+
+        Returns:
+          a new AverageSummary.
+        """
+        if not isinstance(other, AverageSummary):
+            raise TypeError(
+                "other is {0}, not AverageSummary".format(type(other)))
+        n = self._n + other._n
+        if self._partials is not None and other._partials is not None:
+            partials = add_partials(self._partials, other._partials)
+            return AverageSummary._from_sums(n, math.fsum(partials), partials)
+        return AverageSummary._from_sums(n, self._total + other._total)
+
+    def subtract(self, other):
+        """Summary of the reviews of this summary except another summary.
+
+        Args:
+          other: an AverageSummary of a subset of the reviews of this summary.
+
+        Returns:
+          a new AverageSummary. Its score is NaN if no reviews remain.
+
+        Raises:
+          ValueError: if the other summary has more reviews than this summary.
+        """
+        if not isinstance(other, AverageSummary):
+            raise TypeError(
+                "other is {0}, not AverageSummary".format(type(other)))
+        n = self._n - other._n
+        if n < 0:
+            raise ValueError(
+                "other summary has more reviews than this summary.")
+        if self._partials is not None and other._partials is not None:
+            partials = subtract_partials(self._partials, other._partials) \
+                if n else []
+            return AverageSummary._from_sums(n, math.fsum(partials), partials)
+        return AverageSummary._from_sums(
+            n, self._total - other._total if n else 0.)
 
     def difference(self, r):
         """Difference between this summary and a given review.
 
         Args:
-          r: a review.
+          r: a review or a ReviewArray.
 
         Returns:
           a non-negative float value or 0 representing the difference between
-          this summary and the given value.
+          this summary and the given value. If r is a ReviewArray, a float
+          array of the differences of all reviews in it.
         """
+        if isinstance(r, ReviewArray):
+            return self.differences(r)
         if not isinstance(r, AverageReview):
             raise TypeError("r is {0}, not AverageReview".format(type(r)))
         return abs(self._v.score - r.score)
 
+    def differences(self, reviews):
+        """Differences between this summary and given reviews.
+
+        Args:
+          reviews: a ReviewArray, an array of review scores, or an iterable
+            of reviews.
+
+        Returns:
+          a float array of the differences between this summary and each of
+          the given reviews.
+        """
+        if isinstance(reviews, ReviewArray):
+            scores = reviews.scores
+        else:
+            scores = _to_array(reviews)
+        return np.abs(self._v.score - scores)
+
     @property
     def score(self):
         """Float value representing this summary.
@@ -124,6 +445,10 @@ class AverageSummary(Summary):
         """
         return self._v.score
 
+    def __reduce__(self):
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
     def __str__(self):
         return str(self._v)
 
@@ -131,3 +456,400 @@ class AverageSummary(Summary):
     def review_class(cls):
         """A review class associated with this summary. """
         return AverageReview
+
+
+class IncrementalAverageSummary(AverageSummary):
+    """Scalar summary supporting addition and removal of single reviews.
+
+    The summary keeps the number of reviews and the sum of their scores
+    exactly as non-overlapping partial sums, see :mod:`review.summation`,
+    so that adding, removing, and updating a review takes constant time and
+    removing a review cancels its addition exactly. The score is the
+    correctly rounded mean, i.e. it is identical to the score of an
+    :class:`AverageSummary` built from the same reviews with
+    `summation="fsum"`, regardless of the order of additions and removals.
+
+    Args:
+      scores: an iterable of reviews or float values, a ReviewArray,
+        a single review, or a single float value (default: empty).
+    """
+    __slots__ = ()
+
+    def __init__(self, scores=()):
+        super(IncrementalAverageSummary, self).__init__(scores, FSUM)
+
+    @classmethod
+    def _from_sums(cls, n, total, partials=None):
+        """Create a summary from the number of reviews and the sum of scores.
+
+        If the partial sums are not given, the sum is taken as exact.
+        """
+        if partials is None:
+            partials = [total] if n else []
+        return super(IncrementalAverageSummary, cls)._from_sums(
+            n, math.fsum(partials), list(partials))
+
+    @classmethod
+    def from_stream(cls, scores, chunksize=CHUNKSIZE, summation=FSUM):
+        """Create a summary from a stream of reviews in one pass.
+
+        Args:
+          scores: an iterable of reviews or float values. Elements can also
+            be ReviewArrays or arrays of scores, which are summed as chunks.
+          chunksize: the number of scores summed at once (default: 1024).
+          summation: must be "fsum", since the summary keeps the exact sum.
+
+        Returns:
+          a new summary.
+        """
+        if summation != FSUM:
+            raise ValueError(
+                "IncrementalAverageSummary requires fsum: {0}".format(
+                    summation))
+        return super(IncrementalAverageSummary, cls).from_stream(
+            scores, chunksize, summation)
+
+    def _shift(self, n, partials):
+        """Add the number of reviews and partial sums of their scores.
+        """
+        self._n += n
+        if self._n:
+            self._partials = add_partials(self._partials, partials)
+        else:
+            self._partials = []
+        self._total = math.fsum(self._partials)
+        self._update()
+
+    def add(self, review):
+        """Add a review to this summary.
+
+        Args:
+          review: an AverageReview or a float value.
+        """
+        self._shift(1, [_score(review)])
+
+    def extend(self, scores):
+        """Add reviews to this summary at once.
+
+        Scores are summed as arrays, and the summary score is updated once.
+
+        Args:
+          scores: an iterable of AverageReview or float values, a ReviewArray,
+            or an array of scores.
+        """
+        if isinstance(scores, (ReviewArray, np.ndarray)):
+            scores = [scores]
+        n, total = _stream(scores, summation=FSUM)
+        self._shift(n, total.partials)
+
+    def remove(self, review):
+        """Remove a review from this summary.
+
+        Args:
+          review: an AverageReview or a float value which was added before.
+
+        Raises:
+          ValueError: if this summary is empty.
+        """
+        if not self._n:
+            raise ValueError("summary is empty.")
+        self._shift(-1, [-_score(review)])
+
+    def update(self, old, new):
+        """Replace a review in this summary with another one.
+
+        Args:
+          old: an AverageReview or a float value to be removed.
+          new: an AverageReview or a float value to be added.
+        """
+        if not self._n:
+            raise ValueError("summary is empty.")
+        self._shift(0, [_score(new), -_score(old)])
+
+
+class WeightedAverageSummary(AverageSummary):
+    """Scalar summary weighting reviews.
+
+    The summary is a weighted average of given reviews. Scores of the
+    reviews are packed into an array once, so that :meth:`reweight` updates
+    the summary with new weights as a single vectorized reduction.
+
+    Args:
+      scores: an iterable of reviews or float values, or a ReviewArray.
+      weights: an iterable of non-negative weights of the reviews.
+    """
+    __slots__ = ("_scores", "_weights")
+
+    def __init__(self, scores, weights):
+        if isinstance(scores, ReviewArray):
+            self._scores = scores.scores
+        else:
+            self._scores = _read_only(_to_array(scores))
+        self.reweight(weights)
+
+    @classmethod
+    def from_stream(cls, scores, chunksize=CHUNKSIZE, summation=PAIRWISE):
+        """Weighted summaries can't be created from a stream.
+
+        They keep all the scores to be reweighted, and need weights; use the
+        constructor instead.
+
+        Raises:
+          TypeError: always.
+        """
+        raise TypeError(
+            "{0} needs weights and can't be created from a stream.".format(
+                cls.__name__))
+
+    @property
+    def weights(self):
+        """Read-only float64 array of weights of the reviews."""
+        return self._weights
+
+    def reweight(self, weights):
+        """Update weights of the reviews.
+
+        Args:
+          weights: an iterable of non-negative weights of the reviews
+            in the same order as the reviews given to the constructor.
+        """
+        weights = _weights(weights, len(self._scores))
+        self._weights = _read_only(weights)
+        self._assign(
+            float(weights.sum()), float(np.dot(weights, self._scores)))
+
+
+class AverageAccumulator(object):
+    """Mutable accumulator of scalar reviews.
+
+    Reducing reviews with `+` and `*` creates a new review for each
+    operation. The accumulator instead keeps a running sum updated in place,
+    and creates one review when :meth:`finalize` is called.
+
+    Args:
+      initial: an AverageReview or a float value to start with (default: 0).
+    """
+    __slots__ = ("_total")
+
+    def __init__(self, initial=0.):
+        self._total = float(_score(initial))
+
+    def iadd(self, review):
+        """Add a review to the running sum.
+
+        Args:
+          review: an AverageReview or a float value.
+
+        Returns:
+          this accumulator.
+        """
+        self._total += _score(review)
+        return self
+
+    __iadd__ = iadd
+
+    def axpy(self, alpha, review):
+        """Add a review multiplied by a scalar to the running sum.
+
+        Args:
+          alpha: a number.
+          review: an AverageReview or a float value.
+
+        Returns:
+          this accumulator.
+        """
+        if not isinstance(alpha, numbers.Number):
+            raise TypeError(
+                "alpha is {0}, not numbers.Number".format(type(alpha)))
+        self._total += alpha * _score(review)
+        return self
+
+    def finalize(self):
+        """Create a review of the running sum.
+
+        The accumulator can be used after this method is called.
+
+        Returns:
+          an AverageReview.
+        """
+        return AverageReview(self._total)
+
+    def __str__(self):
+        return str(self._total)
+
+
+_DATE_TYPES = (datetime.date, np.datetime64, str, type(u""))
+"""Types of dates of reviews."""
+
+
+def _to_array(scores):
+    """Pack review scores into a float64 array.
+
+    Scores are read in one pass, so the given iterable can be a generator.
+
+    Args:
+      scores: an iterable of AverageReview or float values.
+
+    Returns:
+      a float64 array of the scores.
+    """
+    if isinstance(scores, np.ndarray) and scores.dtype.kind in "biuf":
+        return scores.astype(np.float64, copy=False)
+    return np.fromiter((_score(v) for v in scores), dtype=np.float64)
+
+
+def _stream(scores, chunksize=CHUNKSIZE, summation=PAIRWISE):
+    """Count and sum scores in one pass.
+
+    Args:
+      scores: an iterable of AverageReview, float values, ReviewArrays,
+        or arrays of scores.
+      chunksize: the size of the buffer.
+      summation: a summation mode defined in :mod:`review.summation`.
+
+    Returns:
+      a tuple of the number of scores and a RunningSum of them.
+    """
+    n, total = 0, RunningSum(summation)
+    for chunk in _chunks(scores, chunksize):
+        n += len(chunk)
+        total.add(chunk)
+    return n, total
+
+
+def _sum(scores, summation=PAIRWISE):
+    """Sum an array of scores.
+
+    Args:
+      scores: a float64 array of scores.
+      summation: a summation mode defined in :mod:`review.summation`.
+
+    Returns:
+      a tuple of the sum and a list of exact partial sums in fsum mode or
+      None in the other modes.
+    """
+    if summation == PAIRWISE:
+        return float(np.sum(scores)), None
+    total = RunningSum(summation).add(scores)
+    return total.value, total.partials
+
+
+def _chunks(scores, chunksize=CHUNKSIZE):
+    """Read scores in chunks.
+
+    Scores are copied into a buffer of `chunksize` elements and the buffer is
+    yielded when it is full. ReviewArrays and arrays in the stream are
+    yielded as they are. The buffer is reused, so callers must not keep the
+    yielded arrays.
+
+    Args:
+      scores: an iterable of AverageReview, float values, ReviewArrays,
+        or arrays of scores.
+      chunksize: the size of the buffer.
+
+    Yields:
+      float64 arrays of scores.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive: {0}".format(chunksize))
+    buf = np.empty(chunksize)
+    i = 0
+    for v in scores:
+        if isinstance(v, ReviewArray):
+            yield v.scores
+            continue
+        if isinstance(v, np.ndarray):
+            yield _to_array(v).ravel()
+            continue
+        buf[i] = _score(v)
+        i += 1
+        if i == chunksize:
+            yield buf
+            i = 0
+    if i:
+        yield buf[:i]
+
+
+def _weights(weights, n):
+    """Validate weights of reviews.
+
+    Args:
+      weights: an iterable of weights.
+      n: the number of reviews.
+
+    Returns:
+      a float64 array of the weights.
+
+    Raises:
+      ValueError: if the number of weights is not n, some weights are
+        negative, or the weights sum to zero.
+    """
+    weights = np.asarray(
+        weights if hasattr(weights, "__len__") else list(weights),
+        dtype=np.float64)
+    if weights.shape != (n,):
+        raise ValueError(
+            "weights must have one value per review: {0} != {1}".format(
+                weights.shape, (n,)))
+    if (weights < 0).any():
+        raise ValueError("weights must be non-negative.")
+    if not weights.sum() > 0:
+        raise ValueError("weights must have a positive sum.")
+    return weights
+
+
+def _score(v):
+    """Score of a review or a scalar value.
+
+    Args:
+      v: an AverageReview or a float value.
+
+    Returns:
+      the score of the given value.
+    """
+    if isinstance(v, AverageReview):
+        return v.score
+    if not isinstance(v, numbers.Number):
+        raise TypeError("v ({0}) is not a scalar value.".format(type(v)))
+    return v
+
+
+def _to_dates(dates):
+    """Convert dates of reviews to a datetime64 array.
+
+    Args:
+      dates: an iterable of dates; each date is a :class:`datetime.date`,
+        a :class:`numpy.datetime64`, an ISO 8601 string, or None for
+        a missing date.
+
+    Returns:
+      an array of which type is :attr:`ReviewArray.DATE_TYPE`.
+
+    Raises:
+      TypeError: if some of the dates are other objects, e.g. numbers,
+        which numpy would read as offsets from the epoch.
+    """
+    if not isinstance(dates, np.ndarray):
+        dates = np.array(list(dates), dtype=object)
+    if dates.dtype.kind == "O":
+        for d in dates.ravel():
+            if d is not None and not isinstance(d, _DATE_TYPES):
+                raise TypeError(
+                    "{0} ({1}) is not a date.".format(d, type(d)))
+    elif dates.dtype.kind not in "MUS":
+        raise TypeError("dates of type {0} are not dates.".format(dates.dtype))
+    return dates.astype(ReviewArray.DATE_TYPE)
+
+
+def _read_only(array):
+    """Return a read-only view of a given array.
+
+    Args:
+      array: a numpy array.
+
+    Returns:
+      a view of the array which cannot be modified.
+    """
+    res = array.view()
+    res.flags.writeable = False
+    return res
@@ -0,0 +1,357 @@
+#
+# serialize.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Compact binary format of reviews and summaries.
+
+The format consists of a header and packed arrays. The header has a magic
+number, a format version, and a kind of the stored object. Each array has
+a one byte type code, the number of elements, and the raw little endian
+data. Batches of scalar reviews are stored as an array of scores and an
+array of dates, and batches of histogram reviews are stored as offsets of
+reviews, bins, weights, dates, and the domain of bins of dense reviews.
+Summaries are stored as the sum of their reviews followed by an array of
+the number of the reviews; exact partial sums of summaries built with
+`summation="fsum"` are not stored.
+
+Dates in batches are stored as datetime64 values with microsecond
+precision and restored as :class:`datetime.datetime`. Review arrays and
+summaries use this format for pickling unless their bins are not numbers.
+Single reviews are pickled as their values and dates, which is smaller and
+faster than a packed batch of one review.
+"""
+from __future__ import absolute_import
+import numbers
+import struct
+
+try:
+    import copyreg
+except ImportError:  # pragma: no cover
+    import copy_reg as copyreg
+
+import numpy as np
+
+from review.histogram import Bins
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+from review.scalar import _to_dates
+
+
+MAGIC = b"RGMR"
+"""Magic number of the format."""
+
+VERSION = 2
+"""Current version of the format.
+
+Version 2 stores the number of reviews and the sum of them in summaries,
+instead of the mean. Data of version 1 can be still loaded as summaries of
+a single review.
+"""
+
+AVERAGE_ARRAY = 1
+AVERAGE_LIST = 2
+AVERAGE_REVIEW = 3
+AVERAGE_SUMMARY = 4
+HISTO_LIST = 5
+HISTO_REVIEW = 6
+HISTO_SUMMARY = 7
+
+_HEADER = struct.Struct("<4sBB")
+_ARRAY_HEADER = struct.Struct("<cQ")
+
+_DTYPES = {
+    b"f": np.dtype("<f8"),
+    b"i": np.dtype("<i8"),
+    b"M": np.dtype("<M8[us]"),
+}
+_NONE = b"n"
+
+
+def dumps(obj):
+    """Serialize reviews or a summary.
+
+    Args:
+      obj: a ReviewArray, a list of AverageReview, a list of HistoReview,
+        a single review, an AverageSummary, or a HistoSummary.
+
+    Returns:
+      a bytes object.
+    """
+    return _encode(obj, True)
+
+
+def loads(data):
+    """Deserialize reviews or a summary.
+
+    Args:
+      data: a bytes object created by :func:`dumps`.
+
+    Returns:
+      the deserialized object.
+    """
+    magic, version, kind = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("data is not a serialized review object.")
+    if version > VERSION:
+        raise ValueError("unsupported format version: {0}".format(version))
+    arrays = _unpack_arrays(data, _HEADER.size)
+
+    count = None
+    if kind in (AVERAGE_SUMMARY, HISTO_SUMMARY) and version > 1:
+        count = arrays.pop()[0]
+
+    if kind in (AVERAGE_ARRAY, AVERAGE_LIST, AVERAGE_REVIEW, AVERAGE_SUMMARY):
+        scores, dates = arrays
+        reviews = ReviewArray(scores, dates)
+        if kind == AVERAGE_ARRAY:
+            return reviews
+        if kind == AVERAGE_LIST:
+            return reviews.to_reviews()
+        if kind == AVERAGE_REVIEW:
+            return reviews[0]
+        if count is None:
+            return AverageSummary(reviews[0])
+        return AverageSummary._from_sums(_count(count), float(scores[0]))
+
+    if kind in (HISTO_LIST, HISTO_REVIEW, HISTO_SUMMARY):
+        reviews = _decode_histograms(*arrays)
+        if kind == HISTO_LIST:
+            return reviews
+        if kind == HISTO_REVIEW:
+            return reviews[0]
+        if count is None:
+            return HistoSummary(reviews[0])
+        return HistoSummary._from_sums(_count(count), reviews[0])
+    raise ValueError("unknown kind of object: {0}".format(kind))
+
+
+def dump(obj, fp):
+    """Serialize reviews or a summary to a file.
+
+    Args:
+      obj: an object supported by :func:`dumps`.
+      fp: a writable binary file object.
+    """
+    fp.write(dumps(obj))
+
+
+def load(fp):
+    """Deserialize reviews or a summary from a file.
+
+    Args:
+      fp: a readable binary file object.
+
+    Returns:
+      the deserialized object.
+    """
+    return loads(fp.read())
+
+
+def reduce_review(obj):
+    """Implementation of __reduce__ of review arrays and summaries.
+
+    Objects of subclasses which are not supported by the format, summaries
+    keeping exact partial sums, and summaries of which bins are not numbers
+    are reduced to their slots as the default pickle protocol does.
+
+    Args:
+      obj: an object to be pickled.
+
+    Returns:
+      a tuple to be returned by __reduce__.
+    """
+    if type(obj) is ReviewArray or type(obj) in (
+            AverageSummary, HistoSummary) and obj._partials is None:
+        try:
+            return loads, (_encode(obj, True),)
+        except TypeError:
+            pass
+    return copyreg.__newobj__, (type(obj),), (None, _slot_state(obj))
+
+
+def _slot_state(obj):
+    """Values of slots of an object.
+    """
+    state = {}
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if hasattr(obj, name):
+                state[name] = getattr(obj, name)
+    return state
+
+
+def _encode(obj, with_dates):
+    """Encode an object.
+
+    Args:
+      obj: an object supported by :func:`dumps`.
+      with_dates: if False, dates of reviews are not stored.
+    """
+    if isinstance(obj, ReviewArray):
+        return _pack(AVERAGE_ARRAY, obj.scores, obj.dates if with_dates else None)
+    if isinstance(obj, AverageReview):
+        return _encode_averages(AVERAGE_REVIEW, [obj], with_dates)
+    if isinstance(obj, HistoReview):
+        return _encode_histograms(HISTO_REVIEW, [obj], with_dates)
+    if type(obj) is AverageSummary:
+        return _pack(
+            AVERAGE_SUMMARY, np.array([obj.total], dtype=np.float64), None,
+            np.array([obj.count], dtype=np.float64))
+    if type(obj) is HistoSummary:
+        return _encode_histograms(
+            HISTO_SUMMARY, [obj.total], False) + _pack_array(
+                np.array([obj.count], dtype=np.float64))
+    if isinstance(obj, (list, tuple)):
+        if obj and all(isinstance(r, HistoReview) for r in obj):
+            return _encode_histograms(HISTO_LIST, obj, with_dates)
+        if all(isinstance(r, AverageReview) for r in obj):
+            return _encode_averages(AVERAGE_LIST, obj, with_dates)
+    raise TypeError("{0} is not supported.".format(type(obj)))
+
+
+def _encode_averages(kind, reviews, with_dates):
+    """Encode a list of scalar reviews.
+    """
+    scores = np.array([r.score for r in reviews], dtype=np.float64)
+    return _pack(kind, scores, _dates(reviews) if with_dates else None)
+
+
+def _encode_histograms(kind, reviews, with_dates):
+    """Encode a list of histogram reviews.
+    """
+    bins = None
+    if isinstance(reviews[0], DenseHistoReview):
+        bins = reviews[0].bins
+        if not all(
+                isinstance(r, DenseHistoReview) and r.bins == bins
+                for r in reviews):
+            bins = None
+
+    offsets = np.zeros(len(reviews) + 1, dtype=np.int64)
+    keys, weights = [], []
+    for i, r in enumerate(reviews):
+        vector = r.vector
+        keys.extend(vector.keys())
+        weights.extend(vector.values())
+        offsets[i + 1] = len(keys)
+    return _pack(
+        kind, offsets, _number_array(keys),
+        np.array(weights, dtype=np.float64),
+        _dates(reviews) if with_dates else None,
+        _number_array(bins.keys) if bins is not None else None)
+
+
+def _decode_histograms(offsets, keys, weights, dates, bins):
+    """Decode a list of histogram reviews.
+    """
+    keys = keys.tolist()
+    weights = weights.tolist()
+    if dates is not None:
+        dates = dates.astype(object)
+    if bins is not None:
+        bins = Bins(bins.tolist())
+
+    res = []
+    for i in range(len(offsets) - 1):
+        start, end = offsets[i], offsets[i + 1]
+        date = dates[i] if dates is not None else None
+        vector = dict(zip(keys[start:end], weights[start:end]))
+        if bins is None:
+            res.append(HistoReview._from_dict(vector, date))
+        else:
+            a = np.zeros(len(bins))
+            for k, v in vector.items():
+                a[bins.index(k)] = v
+            res.append(DenseHistoReview._from_array(bins, a, date))
+    return res
+
+
+def _count(value):
+    """Restore the number of reviews of a summary.
+
+    Counts are stored as floats since weighted summaries count sums of
+    weights.
+    """
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _dates(reviews):
+    """Dates of reviews as a datetime64 array, or None if no reviews have dates.
+    """
+    if all(r.date is None for r in reviews):
+        return None
+    return _to_dates([r.date for r in reviews])
+
+
+def _number_array(values):
+    """Convert quantized ratings to an integer array if possible.
+
+    Raises:
+      TypeError: if some of the ratings are not numbers.
+    """
+    values = list(values)
+    if all(isinstance(v, (int, np.integer)) for v in values):
+        return np.array(values, dtype=np.int64)
+    if not all(isinstance(v, numbers.Real) for v in values):
+        raise TypeError("quantized ratings must be numbers.")
+    return np.array(values, dtype=np.float64)
+
+
+def _pack(kind, *arrays):
+    """Pack arrays with a header.
+    """
+    chunks = [_HEADER.pack(MAGIC, VERSION, kind)]
+    chunks.extend(_pack_array(a) for a in arrays)
+    return b"".join(chunks)
+
+
+def _pack_array(a):
+    """Pack an array with a header.
+    """
+    if a is None:
+        return _ARRAY_HEADER.pack(_NONE, 0)
+    for code, dtype in _DTYPES.items():
+        if a.dtype.kind == dtype.kind:
+            a = np.ascontiguousarray(a, dtype=dtype)
+            return _ARRAY_HEADER.pack(code, len(a)) + a.tobytes()
+    raise TypeError("unsupported array type: {0}".format(a.dtype))
+
+
+def _unpack_arrays(data, offset):
+    """Unpack arrays packed by _pack.
+    """
+    res = []
+    while offset < len(data):
+        code, n = _ARRAY_HEADER.unpack_from(data, offset)
+        offset += _ARRAY_HEADER.size
+        if code == _NONE:
+            res.append(None)
+            continue
+        dtype = _DTYPES[code]
+        res.append(np.frombuffer(data, dtype=dtype, count=n, offset=offset))
+        offset += n * dtype.itemsize
+    return res
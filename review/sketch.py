@@ -0,0 +1,549 @@
+#
+# sketch.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""One-pass statistics of review scores.
+
+:class:`Moments` keeps the count, the mean, and the sum of squared
+deviations of scores with Welford's algorithm, and :class:`KLLSketch` keeps
+a quantile sketch of Karnin, Lang, and Liberty of which size is
+proportional to the accuracy parameter `k`, not to the number of scores.
+Both are updated in one pass over chunks of scores and merged across
+shards.
+
+:class:`DistributionSummary` is a scalar summary keeping both of them, so
+that the variance and quantiles of the scores are available next to the
+mean.
+"""
+from __future__ import absolute_import
+import math
+
+import numpy as np
+
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import CHUNKSIZE
+from review.scalar import ReviewArray
+from review.scalar import _chunks
+from review.scalar import _score
+from review.scalar import _to_array
+from review.summation import PAIRWISE
+from review.summation import RunningSum
+
+
+class Moments(object):
+    """Running count, mean, and variance of scores.
+
+    Chunks of scores are combined with the pairwise update of Chan et al.,
+    which is also used to merge moments of different shards.
+    """
+    __slots__ = ("_n", "_mean", "_m2", "_min", "_max")
+
+    def __init__(self):
+        self._n = 0
+        self._mean = 0.
+        self._m2 = 0.
+        self._min = float("inf")
+        self._max = float("-inf")
+
+    def add(self, score):
+        """Add a score.
+
+        Args:
+          score: an AverageReview or a float value.
+
+        Returns:
+          this object.
+        """
+        v = float(_score(score))
+        self._n += 1
+        delta = v - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (v - self._mean)
+        self._min = min(self._min, v)
+        self._max = max(self._max, v)
+        return self
+
+    def extend(self, scores):
+        """Add an array of scores.
+
+        Args:
+          scores: an array of scores.
+
+        Returns:
+          this object.
+        """
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        if not len(scores):
+            return self
+        mean = float(scores.mean())
+        deviations = scores - mean
+        return self._combine(
+            len(scores), mean, float(np.dot(deviations, deviations)),
+            float(scores.min()), float(scores.max()))
+
+    def merge(self, other):
+        """Add moments of other scores.
+
+        Args:
+          other: a Moments.
+
+        Returns:
+          this object.
+        """
+        if not other._n:
+            return self
+        return self._combine(
+            other._n, other._mean, other._m2, other._min, other._max)
+
+    def _combine(self, n, mean, m2, low, high):
+        """Combine moments of other scores with this object.
+        """
+        if not self._n:
+            self._n, self._mean, self._m2 = n, mean, m2
+            self._min, self._max = low, high
+            return self
+        total = self._n + n
+        delta = mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += m2 + delta * delta * self._n * n / total
+        self._n = total
+        self._min = min(self._min, low)
+        self._max = max(self._max, high)
+        return self
+
+    def copy(self):
+        """A copy of this object."""
+        res = Moments()
+        return res._combine(
+            self._n, self._mean, self._m2, self._min, self._max)
+
+    @property
+    def count(self):
+        """The number of scores."""
+        return self._n
+
+    @property
+    def mean(self):
+        """Mean of the scores, or NaN if no scores are added."""
+        return self._mean if self._n else float("nan")
+
+    def variance(self, ddof=0):
+        """Variance of the scores.
+
+        Args:
+          ddof: delta degrees of freedom; 0 gives the population variance
+            and 1 gives the sample variance (default: 0).
+
+        Returns:
+          the variance, or NaN if not more than `ddof` scores are added.
+        """
+        if self._n <= ddof:
+            return float("nan")
+        return max(self._m2, 0.) / (self._n - ddof)
+
+    @property
+    def min(self):
+        """The minimum score, or NaN if no scores are added."""
+        return self._min if self._n else float("nan")
+
+    @property
+    def max(self):
+        """The maximum score, or NaN if no scores are added."""
+        return self._max if self._n else float("nan")
+
+    def __reduce__(self):
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
+    def __str__(self):
+        return "n={0}, mean={1}, variance={2}".format(
+            self._n, self.mean, self.variance())
+
+
+class KLLSketch(object):
+    """Mergeable quantile sketch.
+
+    Scores are kept in compactors of levels; an item of level `h` represents
+    :math:`2^h` scores. When the sketch is full, the lowest compactor over
+    its capacity is sorted, and every other item of it is promoted to the
+    next level. Ranks estimated by the sketch have additive errors of about
+    :math:`1.7 / k` of the number of scores with high probability, and the
+    sketch keeps :math:`O(k \\log(n / k))` items.
+
+    Args:
+      k: accuracy parameter; the capacity of the top compactor (default: 200).
+      seed: a seed of the random choices of compactions (default: None).
+    """
+    __slots__ = ("_k", "_levels", "_n", "_random", "_cache")
+
+    C = 2. / 3.
+    """Ratio of capacities of adjacent compactors."""
+
+    def __init__(self, k=200, seed=None):
+        if k < 2:
+            raise ValueError("k must be at least 2: {0}".format(k))
+        self._k = k
+        self._levels = [np.empty(0)]
+        self._n = 0
+        self._random = np.random.RandomState(seed)
+        self._cache = None
+
+    @property
+    def k(self):
+        """Accuracy parameter."""
+        return self._k
+
+    @property
+    def count(self):
+        """The number of scores added to this sketch."""
+        return self._n
+
+    def __len__(self):
+        return sum(len(level) for level in self._levels)
+
+    def _capacity(self, h):
+        """Capacity of the compactor of a level.
+        """
+        depth = len(self._levels) - h - 1
+        return int(math.ceil(self._k * self.C ** depth)) + 1
+
+    def add(self, score):
+        """Add a score.
+
+        Args:
+          score: an AverageReview or a float value.
+
+        Returns:
+          this sketch.
+        """
+        return self.extend([float(_score(score))])
+
+    def extend(self, scores):
+        """Add an array of scores.
+
+        Args:
+          scores: an array of scores.
+
+        Returns:
+          this sketch.
+        """
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        if not len(scores):
+            return self
+        self._levels[0] = np.concatenate((self._levels[0], scores))
+        self._n += len(scores)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Add scores summarized in another sketch.
+
+        Args:
+          other: a KLLSketch with the same `k`.
+
+        Returns:
+          this sketch.
+        """
+        if other.k != self._k:
+            raise ValueError(
+                "sketches of different k can't be merged: {0} != {1}".format(
+                    self._k, other.k))
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate((self._levels[h], items))
+        self._n += other._n
+        self._compress()
+        return self
+
+    def _compress(self):
+        """Compact compactors until the sketch fits in its capacity.
+        """
+        self._cache = None
+        while True:
+            for h, items in enumerate(self._levels):
+                if len(items) >= self._capacity(h):
+                    break
+            else:
+                return
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            odd = len(items) % 2
+            promoted = items[odd + self._random.randint(2)::2]
+            self._levels[h] = items[:odd]
+            self._levels[h + 1] = np.concatenate(
+                (self._levels[h + 1], promoted))
+
+    def copy(self):
+        """A copy of this sketch.
+
+        The copy continues the random choices of this sketch independently.
+        """
+        res = KLLSketch(self._k)
+        res._levels = list(self._levels)
+        res._n = self._n
+        res._random.set_state(self._random.get_state())
+        return res
+
+    def _sorted(self):
+        """Sorted items and cumulative weights of them.
+        """
+        if self._cache is None:
+            items = np.concatenate(self._levels)
+            weights = np.concatenate([
+                np.full(len(items), 2. ** h)
+                for h, items in enumerate(self._levels)])
+            order = np.argsort(items, kind="mergesort")
+            self._cache = items[order], np.cumsum(weights[order])
+        return self._cache
+
+    def quantile(self, q):
+        """Estimate a quantile of the scores.
+
+        Args:
+          q: a float value or an array of float values in [0, 1].
+
+        Returns:
+          the smallest item of which estimated rank is at least `q`, or an
+          array of them. NaN if the sketch is empty.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("q must be in [0, 1]: {0}".format(q))
+        if not self._n:
+            return np.full(q.shape, np.nan)[()]
+        items, weights = self._sorted()
+        i = np.searchsorted(weights, q * weights[-1], "left")
+        return items[np.minimum(i, len(items) - 1)][()]
+
+    def rank(self, score):
+        """Estimate the fraction of scores less than or equal to a score.
+
+        Args:
+          score: a float value or an array of float values.
+
+        Returns:
+          the estimated fraction, or an array of them. NaN if the sketch is
+          empty.
+        """
+        score = np.asarray(score, dtype=np.float64)
+        if not self._n:
+            return np.full(score.shape, np.nan)[()]
+        items, weights = self._sorted()
+        i = np.searchsorted(items, score, "right")
+        return (np.concatenate(([0.], weights))[i] / weights[-1])[()]
+
+    def __reduce__(self):
+        from review.serialize import reduce_review  # avoid a circular import
+        return reduce_review(self)
+
+    def __str__(self):
+        return "KLLSketch(k={0}, n={1}, items={2})".format(
+            self._k, self._n, len(self))
+
+
+class DistributionSummary(AverageSummary):
+    """Scalar summary keeping the distribution of scores.
+
+    The summary score is the mean of the reviews, as :class:`AverageSummary`.
+    Scores are read once in chunks, and the summary keeps their
+    :class:`Moments` and a :class:`KLLSketch`, so that the variance takes
+    constant time and a quantile takes time logarithmic in the size of the
+    sketch. Summaries of disjoint sets of reviews can be merged with
+    :meth:`merge` or `+`.
+
+    Args:
+      scores: an iterable of reviews or float values, a ReviewArray,
+        an array of scores, a single review, or a single float value.
+      k: accuracy parameter of the quantile sketch (default: 200).
+      seed: a seed of the quantile sketch (default: None).
+      chunksize: the number of scores read at once (default: 1024).
+      summation: a summation mode of the sum of scores defined in
+        :mod:`review.summation` (default: pairwise).
+    """
+    __slots__ = ("_moments", "_sketch")
+
+    def __init__(self, scores, k=200, seed=None, chunksize=CHUNKSIZE,
+                 summation=PAIRWISE):
+        if isinstance(scores, ReviewArray):
+            chunks = [scores.scores]
+        elif isinstance(scores, np.ndarray):
+            chunks = [_to_array(scores).ravel()]
+        elif hasattr(scores, "__iter__"):
+            chunks = _chunks(scores, chunksize)
+        else:
+            chunks = [np.array([float(_score(scores))])]
+        self._moments = Moments()
+        self._sketch = KLLSketch(k, seed)
+        total = RunningSum(summation)
+        for chunk in chunks:
+            self._moments.extend(chunk)
+            self._sketch.extend(chunk)
+            total.add(chunk)
+        self._assign(self._moments.count, total.value, total.partials)
+
+    @classmethod
+    def from_stream(cls, scores, chunksize=CHUNKSIZE, summation=PAIRWISE):
+        """Create a summary from a stream of reviews in one pass.
+
+        Args:
+          scores: an iterable of reviews or float values. Elements can also
+            be ReviewArrays or arrays of scores, which are read as chunks.
+          chunksize: the number of scores read at once (default: 1024).
+          summation: a summation mode defined in :mod:`review.summation`
+            (default: pairwise).
+
+        Returns:
+          a new summary with the default sketch parameters.
+        """
+        return cls(iter(scores), chunksize=chunksize, summation=summation)
+
+    @classmethod
+    def _from_parts(cls, moments, sketch, total, partials=None):
+        """Create a summary from moments, a sketch, and the sum of scores.
+        """
+        res = cls.__new__(cls)
+        res._moments, res._sketch = moments, sketch
+        res._assign(moments.count, total, partials)
+        return res
+
+    @property
+    def moments(self):
+        """:class:`Moments` of the scores.
+
+        The returned object must not be modified.
+        """
+        return self._moments
+
+    @property
+    def sketch(self):
+        """:class:`KLLSketch` of the scores.
+
+        The returned object must not be modified.
+        """
+        return self._sketch
+
+    @property
+    def variance(self):
+        """Population variance of the scores."""
+        return self._moments.variance()
+
+    @property
+    def std(self):
+        """Population standard deviation of the scores."""
+        return math.sqrt(self.variance)
+
+    def quantile(self, q):
+        """Estimate a quantile of the scores.
+
+        Args:
+          q: a float value or an array of float values in [0, 1].
+
+        Returns:
+          the estimated quantile, or an array of them.
+        """
+        return self._sketch.quantile(q)
+
+    @property
+    def median(self):
+        """Estimated median of the scores."""
+        return float(self.quantile(.5))
+
+    def merge(self, other):
+        """Summary of the reviews of this summary and another summary.
+
+        Args:
+          other: an AverageSummary of reviews not in this summary.
+
+        Returns:
+          a new DistributionSummary if the other summary is also
+          a DistributionSummary, otherwise an AverageSummary.
+        """
+        if not isinstance(other, DistributionSummary):
+            return super(DistributionSummary, self).merge(other)
+        total = super(DistributionSummary, self).merge(other)
+        return DistributionSummary._from_parts(
+            self._moments.copy().merge(other._moments),
+            self._sketch.copy().merge(other._sketch),
+            total.total, total._partials)
+
+    def subtract(self, other):
+        """Summary of the reviews of this summary except another summary.
+
+        Quantile sketches can't be subtracted, so the result is an
+        :class:`AverageSummary`.
+
+        Args:
+          other: an AverageSummary of a subset of the reviews of this summary.
+
+        Returns:
+          a new AverageSummary.
+        """
+        return super(DistributionSummary, self).subtract(other)
+
+    def difference(self, r, zscore=False):
+        """Difference between this summary and a given review.
+
+        Args:
+          r: a review or a ReviewArray.
+          zscore: if True, the difference is divided by the standard
+            deviation of the scores (default: False).
+
+        Returns:
+          a non-negative float value, or a float array if r is a ReviewArray.
+          If `zscore` is True and the standard deviation is zero, the
+          difference is 0 for the mean and infinity otherwise.
+        """
+        if isinstance(r, ReviewArray):
+            return self.differences(r, zscore)
+        if not isinstance(r, AverageReview):
+            raise TypeError("r is {0}, not AverageReview".format(type(r)))
+        res = super(DistributionSummary, self).difference(r)
+        if zscore:
+            res = float(_standardize(res, self.std))
+        return res
+
+    def differences(self, reviews, zscore=False):
+        """Differences between this summary and given reviews.
+
+        Args:
+          reviews: a ReviewArray, an array of review scores, or an iterable
+            of reviews.
+          zscore: if True, the differences are divided by the standard
+            deviation of the scores (default: False).
+
+        Returns:
+          a float array of the differences.
+        """
+        res = super(DistributionSummary, self).differences(reviews)
+        if zscore:
+            res = _standardize(res, self.std)
+        return res
+
+
+def _standardize(differences, std):
+    """Divide differences by a standard deviation.
+
+    Zero differences stay zero even if the standard deviation is zero.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            differences == 0, 0., np.asarray(differences) / std)
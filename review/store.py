@@ -0,0 +1,334 @@
+#
+# store.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""On-disk review store opened through memory maps.
+
+A store is a directory consisting of flat binary columns and a JSON file of
+metadata. Columns are:
+
+- `score`: float64 scores of reviews,
+- `date`: datetime64 dates of reviews (only if some reviews have dates),
+- `offset`: int64 positions of the first review of each product,
+- `entry`: int64 positions of the first histogram entry of each review,
+- `bin`: float64 quantized ratings of histogram entries,
+- `weight`: float64 weights of histogram entries.
+
+Histogram columns exist only if the store has histogram reviews.
+Product IDs are kept in the metadata file, so they must be strings or
+integers; other IDs, e.g. tuples, wouldn't be the same after a round trip
+through JSON.
+:class:`ReviewStore` opens the columns with :class:`numpy.memmap`, so
+reviews of a product are zero-copy slices of the files and summaries are
+computed product by product with bounded resident memory.
+"""
+from __future__ import absolute_import
+import json
+import numbers
+import os
+
+import numpy as np
+
+from review.histogram import Bins
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import _to_dense
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+
+
+VERSION = 1
+"""Current version of the store layout."""
+
+META = "meta.json"
+"""Name of the metadata file."""
+
+_COLUMNS = {
+    "score": np.dtype("<f8"),
+    "date": np.dtype("<M8[us]"),
+    "offset": np.dtype("<i8"),
+    "entry": np.dtype("<i8"),
+    "bin": np.dtype("<f8"),
+    "weight": np.dtype("<f8"),
+}
+
+
+class ReviewStore(object):
+    """Memory-mapped review store.
+
+    Use :meth:`write` to create a store and the constructor to open it.
+
+    Args:
+      path: path to the directory of a store.
+    """
+    __slots__ = ("_path", "_products", "_index", "_columns", "_integer_bins")
+
+    def __init__(self, path):
+        with open(os.path.join(path, META)) as fp:
+            meta = json.load(fp)
+        if meta["version"] > VERSION:
+            raise ValueError(
+                "unsupported store version: {0}".format(meta["version"]))
+        self._path = path
+        self._products = meta["products"]
+        self._index = {p: i for i, p in enumerate(self._products)}
+        self._integer_bins = meta["integer_bins"]
+        self._columns = {}
+        for name, length in meta["columns"].items():
+            self._columns[name] = _open(
+                os.path.join(path, name), _COLUMNS[name], length)
+
+    @classmethod
+    def write(cls, path, groups):
+        """Write reviews to a new store.
+
+        Reviews are written product by product, so that only reviews of one
+        product are kept in memory at a time.
+
+        Args:
+          path: path to a directory of the store; it is created if not exist.
+          groups: a mapping from product IDs to iterables of reviews, or an
+            iterable of pairs of a product ID and an iterable of reviews.
+            Product IDs must be strings or integers.
+
+        Returns:
+          the created store opened as a ReviewStore.
+
+        Raises:
+          TypeError: if a product ID is neither a string nor an integer.
+        """
+        if hasattr(groups, "items"):
+            groups = groups.items()
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        products = []
+        lengths = dict.fromkeys(_COLUMNS, 0)
+        has_dates = has_histograms = False
+        integer_bins = True
+        files = {
+            name: open(os.path.join(path, name), "wb")
+            for name in ("score", "date", "offset", "entry", "bin", "weight")}
+        try:
+            _append(files, lengths, "offset", [0])
+            _append(files, lengths, "entry", [0])
+            n_reviews = n_entries = 0
+            for product, reviews in groups:
+                scores, dates, entries, keys, weights = [], [], [], [], []
+                for r in reviews:
+                    if not isinstance(r, (AverageReview, HistoReview)):
+                        r = AverageReview(r)
+                    scores.append(r.score)
+                    dates.append(r.date)
+                    if isinstance(r, HistoReview):
+                        vector = r.vector
+                        keys.extend(vector.keys())
+                        weights.extend(vector.values())
+                    entries.append(n_entries + len(keys))
+                products.append(_product_id(product))
+                n_reviews += len(scores)
+                n_entries += len(keys)
+
+                has_dates = has_dates or any(d is not None for d in dates)
+                has_histograms = has_histograms or bool(keys)
+                integer_bins = integer_bins and all(
+                    float(k).is_integer() for k in keys)
+                _append(files, lengths, "score", scores)
+                _append(files, lengths, "date", dates)
+                _append(files, lengths, "offset", [n_reviews])
+                _append(files, lengths, "entry", entries)
+                _append(files, lengths, "bin", keys)
+                _append(files, lengths, "weight", weights)
+        finally:
+            for fp in files.values():
+                fp.close()
+
+        if not has_dates:
+            del lengths["date"]
+        if not has_histograms:
+            for name in ("entry", "bin", "weight"):
+                del lengths[name]
+        for name in set(_COLUMNS) - set(lengths):
+            os.remove(os.path.join(path, name))
+        with open(os.path.join(path, META), "w") as fp:
+            json.dump({
+                "version": VERSION,
+                "products": products,
+                "columns": lengths,
+                "integer_bins": integer_bins,
+            }, fp)
+        return cls(path)
+
+    @property
+    def products(self):
+        """List of product IDs in the order they were written."""
+        return self._products
+
+    def __len__(self):
+        return len(self._products)
+
+    def __contains__(self, product):
+        return product in self._index
+
+    def __iter__(self):
+        return iter(self._products)
+
+    def _range(self, product):
+        """Positions of the first review and the one after the last review.
+        """
+        i = self._index[product]
+        offsets = self._columns["offset"]
+        return int(offsets[i]), int(offsets[i + 1])
+
+    def reviews(self, product):
+        """Scalar reviews of a product.
+
+        Args:
+          product: a product ID.
+
+        Returns:
+          a ReviewArray of which buffers are slices of the memory maps.
+        """
+        start, end = self._range(product)
+        dates = self._columns.get("date")
+        return ReviewArray(
+            self._columns["score"][start:end],
+            dates[start:end] if dates is not None else None)
+
+    def histo_reviews(self, product):
+        """Histogram reviews of a product.
+
+        Args:
+          product: a product ID.
+
+        Returns:
+          a list of HistoReview.
+        """
+        start, end = self._range(product)
+        entries = self._columns["entry"][start:end + 1]
+        keys = self._bins(self._columns["bin"][entries[0]:entries[-1]]).tolist()
+        weights = self._columns["weight"][entries[0]:entries[-1]].tolist()
+        dates = self._columns.get("date")
+        res = []
+        for i in range(end - start):
+            lo, hi = entries[i] - entries[0], entries[i + 1] - entries[0]
+            date = dates[start + i].astype(object) if dates is not None else None
+            res.append(HistoReview._from_dict(
+                dict(zip(keys[lo:hi], weights[lo:hi])), date))
+        return res
+
+    def average_summary(self, product):
+        """Scalar summary of a product.
+
+        Args:
+          product: a product ID.
+
+        Returns:
+          an AverageSummary of the reviews of the product.
+        """
+        return AverageSummary(self.reviews(product))
+
+    def histo_summary(self, product, bins=None):
+        """Histogram summary of a product.
+
+        Args:
+          product: a product ID.
+          bins: an instance of :class:`review.histogram.Bins` or an iterable
+            of quantized ratings to make a dense summary (default: None).
+
+        Returns:
+          a HistoSummary of the reviews of the product.
+        """
+        if "bin" not in self._columns:
+            raise ValueError("this store doesn't have histogram reviews.")
+        start, end = self._range(product)
+        if start == end:
+            raise ValueError("{0} has no reviews.".format(product))
+        entries = self._columns["entry"]
+        lo, hi = entries[start], entries[end]
+        keys, inverse = np.unique(
+            self._bins(self._columns["bin"][lo:hi]), return_inverse=True)
+        sums = np.bincount(
+            inverse.ravel(), weights=self._columns["weight"][lo:hi],
+            minlength=len(keys))
+        total = HistoReview._from_dict(dict(zip(keys.tolist(), sums.tolist())))
+        if bins is not None:
+            if not isinstance(bins, Bins):
+                bins = Bins(bins)
+            total = _to_dense(total, bins)
+        return HistoSummary._from_sums(end - start, total)
+
+    def average_summaries(self):
+        """Scalar summaries of all products.
+
+        Yields:
+          pairs of a product ID and its AverageSummary, computed lazily.
+        """
+        for product in self._products:
+            yield product, self.average_summary(product)
+
+    def histo_summaries(self, bins=None):
+        """Histogram summaries of all products having reviews.
+
+        Args:
+          bins: an instance of :class:`review.histogram.Bins` or an iterable
+            of quantized ratings to make dense summaries (default: None).
+
+        Yields:
+          pairs of a product ID and its HistoSummary, computed lazily.
+        """
+        for product in self._products:
+            start, end = self._range(product)
+            if start != end:
+                yield product, self.histo_summary(product, bins)
+
+    def _bins(self, keys):
+        """Convert stored ratings to integers if all of them are integers.
+        """
+        if self._integer_bins:
+            return keys.astype(np.int64)
+        return keys
+
+
+def _product_id(product):
+    """Check a product ID can be stored in the metadata file.
+    """
+    if isinstance(product, (str, type(u""))):
+        return product
+    if isinstance(product, numbers.Integral) and not isinstance(product, bool):
+        return int(product)
+    raise TypeError(
+        "product IDs must be strings or integers: {0!r}".format(product))
+
+
+def _append(files, lengths, name, values):
+    """Append values to a column file.
+    """
+    a = np.asarray(values, dtype=_COLUMNS[name])
+    a.tofile(files[name])
+    lengths[name] += len(a)
+
+
+def _open(path, dtype, length):
+    """Open a column file as a read-only memory map.
+    """
+    if not length:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,))
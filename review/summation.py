@@ -0,0 +1,302 @@
+#
+# summation.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Summation modes of running sums of scores and histograms.
+
+Summaries built from streams add values chunk by chunk. The following
+modes choose how values are added:
+
+- `naive`: values in a chunk are added one by one from left to right, and
+  the sum of a chunk is added to the running sum,
+- `pairwise`: each chunk is summed by pairwise summation, as
+  :func:`numpy.sum` does, and added to the running sum,
+- `kahan`: values are added one by one with Neumaier's variant of Kahan
+  summation, which keeps a compensation of rounding errors,
+- `fsum`: the running sum is kept exactly as a list of non-overlapping
+  partial sums and rounded once, as :func:`math.fsum` does.
+
+Results of `naive` and `pairwise` depend on the order of values and on how
+they are split into chunks, `kahan` reduces but doesn't remove the
+dependency, and `fsum` gives the correctly rounded sum regardless of order,
+chunking, and merging of running sums computed in parallel.
+The price is speed: `naive` and `pairwise` are vectorized, `kahan` loops over
+values, and `fsum` scans each chunk a few times.
+"""
+from __future__ import absolute_import
+import math
+
+import numpy as np
+
+
+NAIVE = "naive"
+PAIRWISE = "pairwise"
+KAHAN = "kahan"
+FSUM = "fsum"
+
+MODES = (NAIVE, PAIRWISE, KAHAN, FSUM)
+"""Supported summation modes."""
+
+
+class RunningSum(object):
+    """Running sum of float values or of float vectors.
+
+    Args:
+      mode: a summation mode (default: pairwise).
+      size: the length of vectors to be summed, or None to sum scalar values
+        (default: None).
+    """
+    __slots__ = ("_mode", "_size", "_total", "_comp", "_partials")
+
+    def __init__(self, mode=PAIRWISE, size=None):
+        if mode not in MODES:
+            raise ValueError("unknown summation mode: {0}".format(mode))
+        self._mode = mode
+        self._size = size
+        k = 1 if size is None else size
+        self._total = np.zeros(k)
+        self._comp = np.zeros(k) if mode == KAHAN else None
+        self._partials = [[] for _ in range(k)] if mode == FSUM else None
+
+    @property
+    def mode(self):
+        """Summation mode of this sum."""
+        return self._mode
+
+    def add(self, values):
+        """Add values to this sum.
+
+        Args:
+          values: a float value or an array of float values if this sum is
+            scalar, otherwise a vector or a two dimensional array of which
+            rows are vectors.
+
+        Returns:
+          this running sum.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        k = len(self._total)
+        if self._size is None:
+            values = values.reshape(-1, 1)
+        elif values.ndim == 1:
+            values = values.reshape(1, -1)
+        if values.shape[1] != k:
+            raise ValueError(
+                "values must have {0} columns: {1}".format(k, values.shape))
+        if not len(values):
+            return self
+
+        if self._mode == NAIVE:
+            self._total += np.cumsum(values, axis=0)[-1]
+        elif self._mode == PAIRWISE:
+            self._total += np.ascontiguousarray(values.T).sum(axis=1)
+        elif self._mode == KAHAN:
+            if k == 1:
+                total, comp = _neumaier(
+                    values[:, 0].tolist(), self._total[0], self._comp[0])
+                self._total[0], self._comp[0] = total, comp
+            else:
+                for row in values:
+                    self._add_compensated(row)
+        else:
+            for j in range(k):
+                self._partials[j] = _exact(
+                    self._partials[j] + values[:, j].tolist())
+        return self
+
+    def _add_compensated(self, row):
+        """Add a vector with Neumaier summation.
+        """
+        total = self._total + row
+        large = np.abs(self._total) >= np.abs(row)
+        self._comp += np.where(
+            large, (self._total - total) + row, (row - total) + self._total)
+        self._total = total
+
+    def merge(self, other):
+        """Add another running sum to this sum.
+
+        Args:
+          other: a RunningSum of the same mode and size.
+
+        Returns:
+          this running sum.
+        """
+        if other.mode != self._mode or other._size != self._size:
+            raise ValueError("running sums of different modes can't be merged.")
+        if self._mode == FSUM:
+            for j, p in enumerate(other._partials):
+                self._partials[j] = _exact(self._partials[j] + p)
+        elif self._mode == KAHAN:
+            if len(self._total) == 1:
+                total, comp = _neumaier(
+                    [other._total[0], other._comp[0]],
+                    self._total[0], self._comp[0])
+                self._total[0], self._comp[0] = total, comp
+            else:
+                self._add_compensated(other._total)
+                self._comp += other._comp
+        else:
+            self._total += other._total
+        return self
+
+    @property
+    def partials(self):
+        """Exact state of an fsum running sum, or None in other modes.
+
+        A list of non-overlapping partial sums of which exact sum is the sum
+        of the values, or a list of such lists for vectors.
+        """
+        if self._mode != FSUM:
+            return None
+        if self._size is None:
+            return list(self._partials[0])
+        return [list(p) for p in self._partials]
+
+    @property
+    def value(self):
+        """The sum; a float value or a float64 array."""
+        if self._mode == FSUM:
+            res = np.array([math.fsum(p) for p in self._partials])
+        elif self._mode == KAHAN:
+            res = self._total + self._comp
+        else:
+            res = self._total.copy()
+        if self._size is None:
+            return float(res[0])
+        return res
+
+    def __str__(self):
+        return str(self.value)
+
+
+def total(values, mode=PAIRWISE):
+    """Sum of values with a summation mode.
+
+    Args:
+      values: an array of float values.
+      mode: a summation mode (default: pairwise).
+
+    Returns:
+      the sum of the values.
+    """
+    return RunningSum(mode).add(values).value
+
+
+def group_totals(groups, values, n_groups, mode=NAIVE):
+    """Sums of values of groups with a summation mode.
+
+    In naive mode, sums are computed by :func:`numpy.bincount`. In the other
+    modes, values are sorted by groups keeping their order, and each group is
+    summed by a RunningSum.
+
+    Args:
+      groups: an integer array of group indexes of values.
+      values: a float array of values.
+      n_groups: the number of groups.
+      mode: a summation mode (default: naive).
+
+    Returns:
+      a tuple of a float64 array of the sums of groups, and a list of
+      partial sums of groups in fsum mode or None in the other modes.
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if mode not in MODES:
+        raise ValueError("unknown summation mode: {0}".format(mode))
+    if mode == NAIVE:
+        return np.bincount(groups, weights=values, minlength=n_groups), None
+    if not n_groups:
+        return np.zeros(0), [] if mode == FSUM else None
+    order = np.argsort(groups, kind="mergesort")
+    ends = np.cumsum(np.bincount(groups, minlength=n_groups))
+    sums = np.zeros(n_groups)
+    partials = [] if mode == FSUM else None
+    for i, chunk in enumerate(np.split(values[order], ends[:-1])):
+        s = RunningSum(mode).add(chunk)
+        sums[i] = s.value
+        if partials is not None:
+            partials.append(s.partials)
+    return sums, partials
+
+
+def add_partials(x, y):
+    """Exact sum of two sums given as partial sums.
+
+    Args:
+      x: a list of partial sums, e.g. :attr:`RunningSum.partials`.
+      y: a list of partial sums.
+
+    Returns:
+      a list of non-overlapping partial sums; :func:`math.fsum` of it is
+      the correctly rounded sum of both.
+    """
+    return _exact(list(x) + list(y))
+
+
+def subtract_partials(x, y):
+    """Exact difference of two sums given as partial sums.
+
+    Args:
+      x: a list of partial sums.
+      y: a list of partial sums to be subtracted.
+
+    Returns:
+      a list of non-overlapping partial sums.
+    """
+    return _exact(list(x) + [-v for v in y])
+
+
+def _neumaier(values, total, comp):
+    """Add float values to a compensated sum.
+
+    Returns:
+      a tuple of the new sum and the new compensation.
+    """
+    for v in values:
+        t = total + v
+        if abs(total) >= abs(v):
+            comp += (total - t) + v
+        else:
+            comp += (v - t) + total
+        total = t
+    return total, comp
+
+
+def _exact(values):
+    """Non-overlapping partial sums of which exact sum is the sum of values.
+
+    Each partial is the correctly rounded remainder of the previous ones,
+    so the list is short, and :func:`math.fsum` of it gives the correctly
+    rounded sum of the values.
+
+    Args:
+      values: a list of float values.
+
+    Returns:
+      a list of float values.
+    """
+    res = []
+    while True:
+        s = math.fsum(values + [-p for p in res])
+        if s == 0:
+            return res
+        res.append(s)
+        if math.isinf(s) or math.isnan(s):
+            return res
@@ -0,0 +1,280 @@
+#
+# timeline.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Time-windowed summaries of dated reviews.
+
+:class:`AverageTimeline` and :class:`HistoTimeline` index reviews by their
+dates and keep prefix sums of review vectors, so that summaries as of a
+given time, over a given period, and exponentially decayed summaries are
+computed with binary searches instead of scanning all reviews.
+"""
+from __future__ import absolute_import
+import numbers
+
+import numpy as np
+
+from review.histogram import Bins
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+from review.scalar import _to_dates
+
+
+class _Timeline(object):
+    """Base class of timelines.
+
+    Subclasses give dates and a matrix of which rows are review vectors to
+    the constructor and implement _summary method.
+
+    Args:
+      dates: a datetime64 array of review dates.
+      values: a two dimensional float array of which rows are reviews.
+    """
+    __slots__ = ("_dates", "_values", "_prefix", "_decayed")
+
+    def __init__(self, dates, values):
+        # NaT is the minimum of int64; np.isnat needs numpy 1.13
+        if (dates.view(np.int64) == np.iinfo(np.int64).min).any():
+            raise ValueError("all reviews must have dates.")
+        order = np.argsort(dates, kind="mergesort")
+        self._dates = dates[order]
+        self._values = values[order]
+        self._prefix = np.zeros((len(dates) + 1, values.shape[1]))
+        np.cumsum(self._values, axis=0, out=self._prefix[1:])
+        self._decayed = {}
+
+    def _summary(self, n, vector):
+        """Create a summary from the number of reviews and the sum of them.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        return len(self._dates)
+
+    @property
+    def dates(self):
+        """Sorted datetime64 array of review dates."""
+        return self._dates
+
+    def _range(self, start, end):
+        """Indexes of the first review and the one after the last review.
+
+        Args:
+          start: the beginning of the range, inclusive, or None.
+          end: the end of the range, inclusive, or None.
+        """
+        lo = 0 if start is None else int(
+            np.searchsorted(self._dates, _to_datetime(start), "left"))
+        hi = len(self._dates) if end is None else int(
+            np.searchsorted(self._dates, _to_datetime(end), "right"))
+        return lo, max(lo, hi)
+
+    def count(self, start=None, end=None):
+        """Number of reviews posted in a period.
+
+        Args:
+          start: the beginning of the period, inclusive (default: None).
+          end: the end of the period, inclusive (default: None).
+
+        Returns:
+          the number of reviews.
+        """
+        lo, hi = self._range(start, end)
+        return hi - lo
+
+    def window(self, start=None, end=None):
+        """Summary of reviews posted in a period.
+
+        Args:
+          start: the beginning of the period, inclusive (default: None).
+          end: the end of the period, inclusive (default: None).
+
+        Returns:
+          a summary of the reviews.
+
+        Raises:
+          ValueError: if no reviews were posted in the period.
+        """
+        lo, hi = self._range(start, end)
+        if lo == hi:
+            raise ValueError(
+                "no reviews are posted between {0} and {1}".format(start, end))
+        return self._summary(hi - lo, self._prefix[hi] - self._prefix[lo])
+
+    def at(self, t):
+        """Summary of reviews posted until a given time.
+
+        Args:
+          t: a date.
+
+        Returns:
+          a summary of the reviews posted at or before the given time.
+        """
+        return self.window(None, t)
+
+    def last(self, period, now=None):
+        """Summary of reviews posted in a trailing window.
+
+        Args:
+          period: length of the window given as a timedelta or a number of
+            days.
+          now: the end of the window (default: the date of the latest review).
+
+        Returns:
+          a summary of the reviews posted after `now - period` and at or
+          before `now`.
+        """
+        now = self._dates[-1] if now is None else _to_datetime(now)
+        lo = int(np.searchsorted(
+            self._dates, now - _to_timedelta(period), "right"))
+        hi = int(np.searchsorted(self._dates, now, "right"))
+        if lo >= hi:
+            raise ValueError("no reviews are posted in the window.")
+        return self._summary(hi - lo, self._prefix[hi] - self._prefix[lo])
+
+    def decayed(self, t, half_life):
+        """Exponentially decayed summary as of a given time.
+
+        Each review posted at or before `t` is weighted by
+        :math:`2^{-(t - date) / half\\_life}`.
+        Decayed sums for a half life are computed once, in linear time, at
+        the first query with the half life, and later queries take
+        logarithmic time.
+
+        Args:
+          t: a date.
+          half_life: half life of the weights given as a timedelta or
+            a number of days.
+
+        Returns:
+          a summary of the weighted mean of reviews.
+        """
+        half_life = _to_timedelta(half_life)
+        if half_life not in self._decayed:
+            self._decayed[half_life] = self._decayed_sums(half_life)
+        sums, weights = self._decayed[half_life]
+        k = int(np.searchsorted(self._dates, _to_datetime(t), "right"))
+        if k == 0:
+            raise ValueError("no reviews are posted before {0}".format(t))
+        # Decay from the k-th review to t cancels between sums and weights.
+        return self._summary(float(weights[k - 1]), sums[k - 1])
+
+    def _decayed_sums(self, half_life):
+        """Decayed prefix sums of review vectors and weights.
+
+        Args:
+          half_life: a timedelta64.
+
+        Returns:
+          a tuple of decayed sums and decayed weights as of each review date.
+        """
+        factors = np.exp2(-np.diff(self._dates) / half_life)
+        sums = np.empty_like(self._values)
+        weights = np.empty(len(self._dates))
+        if not len(self._dates):
+            return sums, weights
+        sums[0] = self._values[0]
+        weights[0] = 1.
+        for i, f in enumerate(factors, 1):
+            sums[i] = f * sums[i - 1] + self._values[i]
+            weights[i] = f * weights[i - 1] + 1.
+        return sums, weights
+
+
+class AverageTimeline(_Timeline):
+    """Date-indexed scalar reviews.
+
+    Args:
+      reviews: an iterable of AverageReview or a ReviewArray. Every review
+        must have a date.
+    """
+    __slots__ = ()
+
+    def __init__(self, reviews):
+        if not isinstance(reviews, ReviewArray):
+            reviews = ReviewArray.from_reviews(reviews)
+        if reviews.dates is None:
+            raise ValueError("all reviews must have dates.")
+        super(AverageTimeline, self).__init__(
+            reviews.dates, reviews.scores.reshape(-1, 1))
+
+    def _summary(self, n, vector):
+        return AverageSummary._from_sums(n, float(vector[0]))
+
+
+class HistoTimeline(_Timeline):
+    """Date-indexed histogram reviews.
+
+    Summaries given by this timeline are dense :class:`HistoSummary`.
+
+    Args:
+      reviews: an iterable of HistoReview. Every review must have a date.
+      bins: an instance of :class:`Bins` or an iterable of quantized ratings
+        (default: all ratings appearing in the reviews).
+    """
+    __slots__ = ("_bins")
+
+    def __init__(self, reviews, bins=None):
+        reviews = list(reviews)
+        for r in reviews:
+            if not isinstance(r, HistoReview):
+                raise TypeError("r must be an HistoReview: {0}".format(type(r)))
+        if bins is None:
+            bins = Bins(k for r in reviews for k in r)
+        elif not isinstance(bins, Bins):
+            bins = Bins(bins)
+        self._bins = bins
+
+        values = np.zeros((len(reviews), len(bins)))
+        for i, r in enumerate(reviews):
+            for k, v in r.vector.items():
+                if k not in bins:
+                    raise ValueError("{0} is not in the bins {1}".format(k, bins))
+                values[i, bins.index(k)] = v
+        dates = _to_dates([r.date for r in reviews])
+        super(HistoTimeline, self).__init__(dates, values)
+
+    @property
+    def bins(self):
+        """Domain of histograms."""
+        return self._bins
+
+    def _summary(self, n, vector):
+        return HistoSummary._from_sums(
+            n, DenseHistoReview._from_array(self._bins, vector))
+
+
+def _to_datetime(t):
+    """Convert a date to a datetime64 value.
+    """
+    return np.datetime64(t).astype(ReviewArray.DATE_TYPE)
+
+
+def _to_timedelta(period):
+    """Convert a period to a timedelta64 value.
+
+    Args:
+      period: a timedelta, a timedelta64, or a number of days.
+    """
+    if isinstance(period, numbers.Number):
+        return np.timedelta64(int(round(period * 86400 * 10**6)), "us")
+    return np.timedelta64(period).astype("timedelta64[us]")
@@ -0,0 +1,204 @@
+#
+# aio_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.aio module.
+"""
+import asyncio
+import random
+import unittest
+
+import numpy as np
+
+from review.aio import SummaryUpdater
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import IncrementalHistoSummary
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import IncrementalAverageSummary
+
+
+class Feed(object):
+    """Async iterator over events, yielding to the loop between events.
+    """
+
+    def __init__(self, events):
+        self.events = iter(events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        try:
+            return next(self.events)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestSummaryUpdater(unittest.TestCase):
+    """Test case for SummaryUpdater class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.events = [
+            (random.choice("abc"), random.randint(1, 5)) for _ in range(500)]
+
+    def tearDown(self):
+        """Close the loop.
+        """
+        self.loop.close()
+
+    def expect(self, product):
+        """Ratings of a product in the events.
+        """
+        return [v for p, v in self.events if p == product]
+
+    def test_average(self):
+        """Test updating scalar summaries from a feed.
+        """
+        async def main():
+            async with SummaryUpdater(batch_size=64) as updater:
+                n = await updater.consume(
+                    Feed((p, AverageReview(v)) for p, v in self.events))
+                return n, await updater.snapshot()
+
+        n, res = self.loop.run_until_complete(main())
+        self.assertEqual(n, len(self.events))
+        self.assertEqual(set(res), set("abc"))
+        for p, s in res.items():
+            self.assertIs(type(s), AverageSummary)
+            self.assertEqual(s.count, len(self.expect(p)))
+            self.assertAlmostEqual(s.score, np.mean(self.expect(p)))
+
+    def test_histogram(self):
+        """Test updating histogram summaries and taking snapshots.
+        """
+        async def main():
+            updater = SummaryUpdater(
+                IncrementalHistoSummary, window=0.001, bins=range(1, 6))
+            await updater.start()
+            for p, v in self.events[:200]:
+                await updater.put(p, v)
+            first = await updater.snapshot(["a", "x"])
+            for p, v in self.events[200:]:
+                updater.put_nowait(p, HistoReview(v))
+            second = await updater.snapshot()
+            await updater.close()
+            return first, second
+
+        first, second = self.loop.run_until_complete(main())
+        self.assertEqual(list(first), ["a"])
+        self.assertEqual(
+            first["a"].count, len([p for p, _ in self.events[:200] if p == "a"]))
+        for p, s in second.items():
+            self.assertIs(type(s), HistoSummary)
+            self.assertIsInstance(s._histo, DenseHistoReview)
+            self.assertEqual(
+                s._histo, HistoSummary(self.expect(p), bins=range(1, 6))._histo)
+
+    def test_backpressure(self):
+        """Test producers wait while the buffer is full.
+        """
+        async def main():
+            async with SummaryUpdater(
+                    IncrementalAverageSummary, batch_size=2, maxsize=4) as u:
+                sizes = []
+                for i in range(20):
+                    await u.put("p", i)
+                    sizes.append(u.pending)
+                n = 20
+                with self.assertRaises(asyncio.QueueFull):
+                    for i in range(10):
+                        u.put_nowait("p", i)
+                        n += 1
+                res = await u.snapshot()
+            return sizes, n, res["p"]
+
+        sizes, n, s = self.loop.run_until_complete(main())
+        self.assertLessEqual(max(sizes), 4)
+        self.assertEqual(s.count, n)
+
+    def test_error(self):
+        """Test errors in batches are raised to producers.
+        """
+        async def main():
+            updater = SummaryUpdater()
+            with self.assertRaises(TypeError):
+                async with updater:
+                    task = updater._task
+                    await updater.put("p", "bad")
+                    with self.assertRaises(TypeError):
+                        await updater.flush()
+                    with self.assertRaises(TypeError):
+                        await updater.put("p", 1)
+            return updater, task
+
+        updater, task = self.loop.run_until_complete(main())
+        self.assertIsNone(updater._task)
+        self.assertTrue(task.done())
+        with self.assertRaises(TypeError):
+            SummaryUpdater(AverageSummary)
+        with self.assertRaises(ValueError):
+            SummaryUpdater(bins=range(1, 6))
+        with self.assertRaises(RuntimeError):
+            SummaryUpdater().put_nowait("p", 1)
+
+    def test_stop_after_error(self):
+        """Test events after a failed batch are drained without applying.
+        """
+        async def main():
+            updater = SummaryUpdater(window=0, batch_size=1)
+            await updater.start()
+            for event in (("p", 1), ("p", "bad"), ("p", 2), ("q", 3)):
+                updater.put_nowait(*event)
+            try:
+                await updater.flush()
+            except TypeError as e:
+                error = e
+            else:
+                self.fail("flush didn't raise the error of the batch.")
+            summaries = dict(updater._summaries)
+            try:
+                await updater.close()
+            except TypeError as e:
+                self.assertIs(e, error)
+            else:
+                self.fail("close didn't raise the error of the batch.")
+            return error, summaries
+
+        error, summaries = self.loop.run_until_complete(main())
+        self.assertEqual(summaries["p"].count, 1)
+        self.assertNotIn("q", summaries)
+        names = []
+        tb = error.__traceback__
+        while tb is not None:
+            names.append(tb.tb_frame.f_code.co_name)
+            tb = tb.tb_next
+        self.assertIn("_apply", names)
+        self.assertNotIn("_run", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
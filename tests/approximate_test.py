@@ -0,0 +1,215 @@
+#
+# approximate_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.approximate module.
+"""
+import pickle
+import unittest
+
+import numpy as np
+
+from review.approximate import Reservoir
+from review.approximate import SampledAverageSummary
+from review.approximate import SampledHistoSummary
+from review.approximate import approximate
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import IncrementalHistoSummary
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+
+
+class TestReservoir(unittest.TestCase):
+    """Test case for Reservoir class.
+    """
+
+    def test_extend(self):
+        """Test the sample is bounded and uniform.
+        """
+        r = Reservoir(10, seed=0).extend(list(range(5)))
+        self.assertEqual(r.sample, list(range(5)))
+        r.extend(np.arange(5, 1000))
+        r.add(1000)
+        self.assertEqual(len(r), 10)
+        self.assertEqual(r.count, 1001)
+        self.assertEqual(len(set(r.sample)), 10)
+
+        hits = np.zeros(100)
+        for seed in range(500):
+            for v in Reservoir(10, seed).extend(list(range(100))).sample:
+                hits[v] += 1
+        self.assertLess(abs(hits[:50].sum() / hits.sum() - .5), .05)
+        with self.assertRaises(ValueError):
+            Reservoir(0)
+
+    def test_merge(self):
+        """Test merging reservoirs.
+        """
+        r = Reservoir(10, seed=0).extend(list(range(4)))
+        r.merge(Reservoir(10, seed=1).extend(list(range(4, 8))))
+        self.assertEqual(sorted(r.sample), list(range(8)))
+
+        ratio = 0.
+        for seed in range(200):
+            r = Reservoir(20, seed).extend(list(range(1000)))
+            r.merge(Reservoir(20, seed + 1).extend(list(range(1000, 4000))))
+            self.assertEqual((len(r), r.count), (20, 4000))
+            ratio += np.mean(np.array(r.sample) >= 1000) / 200
+        self.assertLess(abs(ratio - .75), .05)
+
+
+class TestSampledSummary(unittest.TestCase):
+    """Test case for sampled summaries.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = np.random.RandomState(0).randint(1, 6, 100000).astype(
+            float)
+
+    def test_average(self):
+        """Test estimating a scalar summary.
+        """
+        expect = np.mean(self.scores)
+        for scores in (
+                self.scores, ReviewArray(self.scores),
+                iter(self.scores.tolist())):
+            s = SampledAverageSummary(scores, size=2000, seed=1)
+            self.assertEqual((s.count, s.sample_size), (len(self.scores), 2000))
+            self.assertFalse(s.exact)
+            self.assertGreater(s.stderr, 0)
+            self.assertLess(abs(s.score - expect), 5 * s.stderr)
+            self.assertGreater(s.error_bound(.99), s.error_bound(.9))
+            self.assertAlmostEqual(s.error_bound(.95), 1.96 * s.stderr, 2)
+        self.assertAlmostEqual(s.total, s.score * len(self.scores))
+        self.assertEqual(
+            SampledAverageSummary(self.scores, seed=3).score,
+            SampledAverageSummary(self.scores, seed=3).score)
+
+        s = SampledAverageSummary([AverageReview(v) for v in self.scores[:10]])
+        self.assertTrue(s.exact)
+        self.assertEqual(s.stderr, 0)
+        self.assertAlmostEqual(s.score, np.mean(self.scores[:10]))
+        self.assertEqual(pickle.loads(pickle.dumps(s)).stderr, 0)
+        with self.assertRaises(ValueError):
+            s.error_bound(1)
+
+    def test_histogram(self):
+        """Test estimating a histogram summary.
+        """
+        expect = HistoSummary(self.scores)
+        reviews = [HistoReview(v) for v in self.scores[:20000]]
+        s = SampledHistoSummary(reviews, size=2000, seed=1)
+        self.assertEqual((s.count, s.sample_size), (20000, 2000))
+        self.assertNotIsInstance(s._histo, DenseHistoReview)
+        bound = s.error_bound()
+        for k in expect._histo:
+            self.assertLess(abs(s._histo[k] - expect._histo[k]), 2 * bound[k])
+            self.assertAlmostEqual(s.total[k], s._histo[k] * 20000)
+
+        s = SampledHistoSummary(iter(self.scores), seed=1, bins=range(1, 6))
+        self.assertIsInstance(s._histo, DenseHistoReview)
+        self.assertIsInstance(s.stderr, DenseHistoReview)
+        s = SampledHistoSummary(self.scores[:5], bins=range(1, 6))
+        self.assertTrue(s.exact)
+        self.assertEqual(
+            s._histo, HistoSummary(self.scores[:5], range(1, 6))._histo)
+        self.assertEqual(s.stderr.norm(), 0)
+
+    def test_stderr(self):
+        """Test standard errors include the finite population correction.
+        """
+        s = SampledAverageSummary._from_sample([1., 2., 3., 4.], 10)
+        self.assertAlmostEqual(s.stderr, .5)
+        s = SampledHistoSummary._from_sample([1, 1, 2, 2], 10)
+        self.assertAlmostEqual(s.stderr[1], np.sqrt(.05))
+        self.assertAlmostEqual(s.stderr[2], np.sqrt(.05))
+
+    def test_from_stream(self):
+        """Test from_stream methods sample streams with reservoirs.
+        """
+        s = SampledAverageSummary.from_stream(
+            self.scores.tolist(), size=2000, seed=1)
+        self.assertIsInstance(s, SampledAverageSummary)
+        self.assertEqual((s.count, s.sample_size), (len(self.scores), 2000))
+        self.assertGreater(s.stderr, 0)
+        self.assertEqual(
+            s.score, SampledAverageSummary(
+                iter(self.scores.tolist()), size=2000, seed=1).score)
+
+        s = SampledHistoSummary.from_stream(
+            iter(self.scores), size=500, seed=1, bins=range(1, 6))
+        self.assertIsInstance(s, SampledHistoSummary)
+        self.assertEqual((s.count, s.sample_size), (len(self.scores), 500))
+        self.assertIsInstance(s.stderr, DenseHistoReview)
+        self.assertGreater(s.stderr.norm(), 0)
+
+
+class TestApproximate(unittest.TestCase):
+    """Test case for approximate function.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = np.random.RandomState(0).randint(1, 6, 5000).astype(float)
+
+    def test_threshold(self):
+        """Test switching exact and sampled summaries.
+        """
+        small = self.scores[:1000]
+        for reviews in (small, small.tolist(), iter(small.tolist())):
+            s = approximate(reviews, threshold=1000, size=100, seed=0)
+            self.assertIs(type(s), AverageSummary)
+            self.assertAlmostEqual(s.score, np.mean(small))
+        for reviews in (self.scores, iter(self.scores.tolist())):
+            s = approximate(reviews, threshold=1000, size=100, seed=0)
+            self.assertIsInstance(s, SampledAverageSummary)
+            self.assertEqual((s.count, s.sample_size), (len(self.scores), 100))
+
+        merged = s + approximate(small, threshold=1000)
+        self.assertEqual(merged.count, len(self.scores) + len(small))
+        s = approximate(small, threshold=10, size=100)
+        self.assertEqual(s.sample_size, 10)
+
+    def test_histogram(self):
+        """Test approximate histogram summaries.
+        """
+        reviews = [HistoReview(v) for v in self.scores]
+        s = approximate(reviews[:100], HistoSummary, threshold=100)
+        self.assertIs(type(s), HistoSummary)
+        s = approximate(
+            iter(reviews[:100]), IncrementalHistoSummary, threshold=100,
+            bins=range(1, 6))
+        self.assertIs(type(s), IncrementalHistoSummary)
+        self.assertEqual(s.count, 100)
+        s = approximate(
+            iter(reviews), HistoSummary, threshold=1000, size=500, seed=0)
+        self.assertIsInstance(s, SampledHistoSummary)
+        self.assertEqual((s.count, s.sample_size), (len(reviews), 500))
+        with self.assertRaises(TypeError):
+            approximate(reviews, object)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#
+# grouped_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.grouped module.
+"""
+from collections import defaultdict
+import datetime
+import random
+import unittest
+
+import numpy as np
+
+from review import grouped
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import WeightedHistoSummary
+from review.quantizer import RoundHalfUp
+from review.scalar import AverageSummary
+from review.scalar import WeightedAverageSummary
+
+
+class TestGrouped(unittest.TestCase):
+    """Test case for average_summaries and histo_summaries.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        n = 200
+        self.products = [random.choice("abcde") for _ in range(n)]
+        self.scores = [random.randint(1, 5) for _ in range(n)]
+        self.weights = [random.random() for _ in range(n)]
+        self.dates = [
+            datetime.datetime(2017, 1, 1) + datetime.timedelta(days=i)
+            for i in range(n)]
+        self.groups = defaultdict(list)
+        for i, p in enumerate(self.products):
+            self.groups[p].append(i)
+
+    def test_average_summaries(self):
+        """Test average_summaries gives same summaries as AverageSummary.
+        """
+        res = grouped.average_summaries(self.products, self.scores)
+        self.assertEqual(sorted(res), sorted(self.groups))
+        self.assertEqual(len(res), len(self.groups))
+        for p, rows in self.groups.items():
+            self.assertIsInstance(res[p], AverageSummary)
+            self.assertIs(res[p], res[p])
+            self.assertAlmostEqual(
+                res[p].score, AverageSummary([self.scores[i] for i in rows]).score)
+            self.assertEqual(res.counts[res.products.index(p)], len(rows))
+        self.assertNotIn("z", res)
+        with self.assertRaises(KeyError):
+            _ = res["z"]
+
+        res = grouped.average_summaries(self.products, self.scores, self.weights)
+        for p, rows in self.groups.items():
+            expect = WeightedAverageSummary(
+                [self.scores[i] for i in rows], [self.weights[i] for i in rows])
+            self.assertAlmostEqual(res[p].score, expect.score)
+
+    def test_dates(self):
+        """Test selecting reviews by dates.
+        """
+        since, until = self.dates[50], self.dates[99]
+        res = grouped.average_summaries(
+            self.products, self.scores, dates=self.dates, since=since,
+            until=until)
+        self.assertEqual(sum(res.counts), 50)
+        for p, rows in self.groups.items():
+            rows = [i for i in rows if 50 <= i <= 99]
+            if rows:
+                self.assertAlmostEqual(
+                    res[p].score,
+                    AverageSummary([self.scores[i] for i in rows]).score)
+            else:
+                self.assertNotIn(p, res)
+        with self.assertRaises(ValueError):
+            grouped.average_summaries(self.products, self.scores, since=since)
+
+    def test_histo_summaries(self):
+        """Test histo_summaries gives same summaries as HistoSummary.
+        """
+        res = grouped.histo_summaries(self.products, self.scores)
+        for p, rows in self.groups.items():
+            self.assertIsInstance(res[p], HistoSummary)
+            expect = HistoSummary([self.scores[i] for i in rows])
+            self.assertAlmostEqual(res[p].score, expect.score)
+            for k in expect._histo:
+                self.assertAlmostEqual(res[p]._histo[k], expect._histo[k])
+
+        res = grouped.histo_summaries(
+            self.products, self.scores, self.weights,
+            quantizer=RoundHalfUp(1, 5))
+        self.assertEqual(res.means.shape, (len(self.groups), 5))
+        for p, rows in self.groups.items():
+            expect = WeightedHistoSummary(
+                [HistoReview(self.scores[i]) for i in rows],
+                [self.weights[i] for i in rows], bins=range(1, 6))
+            self.assertAlmostEqual(res[p].score, expect.score)
+            self.assertIsInstance(res[p]._histo, DenseHistoReview)
+
+    def test_invalid(self):
+        """Test invalid arguments raise errors.
+        """
+        with self.assertRaises(ValueError):
+            grouped.average_summaries(self.products[1:], self.scores)
+        with self.assertRaises(ValueError):
+            grouped.average_summaries(
+                self.products, self.scores, [-1] * len(self.scores))
+        with self.assertRaises(ValueError):
+            grouped.histo_summaries(self.products, self.scores, bins=[1, 2])
+        with self.assertRaises(TypeError):
+            grouped.histo_summaries(self.products, ["v"] * len(self.products))
+        self.assertTrue(np.isnan(grouped.average_summaries(
+            ["a"], [1], [0]).means[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
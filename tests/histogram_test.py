@@ -20,13 +20,25 @@
 #
 """Unit tests for review.scalar module.
 """
+import datetime
+import io
+import pickle
 import random
 import unittest
 
 import numpy as np
 
+from review import histogram
+from review.histogram import Bins
+from review.histogram import DenseHistoReview
+from review.histogram import HistoAccumulator
+from review.histogram import HistoMatrix
 from review.histogram import HistoReview as Review
 from review.histogram import HistoSummary as Summary
+from review.histogram import IncrementalHistoSummary
+from review.histogram import OneHotHistoReview
+from review.histogram import WeightedHistoSummary
+from review.quantizer import RoundHalfUp
 
 
 class TestReview(unittest.TestCase):
@@ -143,6 +155,47 @@ class TestReview(unittest.TestCase):
         with self.assertRaises(TypeError):
             _ = r / "self.b"
 
+    def test_from_array(self):
+        """Test from_array method.
+        """
+        l = [random.random() * 5 for _ in range(10)]
+        res = Review.from_array(l)
+        self.assertEqual(res, [Review(v) for v in l])
+        self.assertEqual(Review.from_array(iter(l)), res)
+        self.assertEqual(Review.from_array(l, quantizer=int), [Review(v, int) for v in l])
+
+        dates = [datetime.datetime(2017, 1, i + 1) for i in range(10)]
+        for r, d in zip(Review.from_array(l, dates), dates):
+            self.assertEqual(r.date, d)
+        res = Review.from_array(l, [d.isoformat() for d in dates])
+        self.assertEqual([r.date for r in res], dates)
+        for cls in (DenseHistoReview, OneHotHistoReview):
+            res = cls.from_array(l, dates)
+            self.assertEqual(res, [Review(v) for v in l])
+            self.assertEqual([r.date for r in res], dates)
+        with self.assertRaises(ValueError):
+            _ = Review.from_array(l, dates[1:])
+        with self.assertRaises(TypeError):
+            _ = Review.from_array(["v"])
+
+    def test_from_csv(self):
+        """Test from_csv method parses dates as AverageReview does.
+        """
+        fp = io.StringIO(u"rating,date\n1,2017-01-02\n5,\n")
+        res = Review.from_csv(fp, column=0, date_column=1, header=True)
+        self.assertEqual(res, [Review(1), Review(5)])
+        self.assertEqual(res[0].date, datetime.datetime(2017, 1, 2))
+        self.assertIsNone(res[1].date)
+
+    def test_from_array_with_bins(self):
+        """Test from_array method with bins.
+        """
+        l = [random.randint(1, 5) for _ in range(10)]
+        res = Review.from_array(l, bins=range(1, 6))
+        self.assertEqual(res, [DenseHistoReview(v, bins=range(1, 6)) for v in l])
+        for r in res:
+            self.assertIsInstance(r, DenseHistoReview)
+
     def test_eq(self):
         """Test __eq__ method.
         """
@@ -159,6 +212,19 @@ class TestReview(unittest.TestCase):
         self.assertNotEqual(Review(self.a), self.a)
         self.assertNotEqual(Review(self.a), "self.a")
 
+    def test_cache(self):
+        """Test cached score, norm, and keys are consistent.
+        """
+        x = Review({self.a: 1, self.b: 2})
+        y = Review({self.b: 3})
+        for r in (x, y, x + y, x - y, 2 * x, x / 2.):
+            self.assertEqual(r.keys(), tuple(sorted(r.vector)))
+            self.assertAlmostEqual(
+                r.score, sum(k * v for k, v in r.vector.items()))
+            self.assertAlmostEqual(r.norm(), sum(r.vector.values()))
+            self.assertIs(r.keys(), r.keys())
+            self.assertEqual(r.score, r.score)
+
     def test_inner_product(self):
         """Test inner_product method.
         """
@@ -190,6 +256,9 @@ class TestSummary(unittest.TestCase):
         summary = Summary(Review(v))
         self.assertEqual(summary.score, round(v))
 
+        r = Review({1: 1, 3: 2})
+        self.assertEqual(Summary(r).score, r.score)
+
     def test_create_with_list(self):
         """Test __init__method with a list.
         """
@@ -249,11 +318,601 @@ class TestSummary(unittest.TestCase):
         with self.assertRaises(TypeError):
             _ = s.difference("b")
 
+    def test_differences(self):
+        """Test differences method.
+        """
+        s = Summary([random.random() * 5 for _ in range(10)])
+        l = [
+            Review({random.random() * 5: 1, random.random() * 5: 2})
+            for _ in range(10)]
+        ans = [s.difference(r) for r in l]
+        np.testing.assert_allclose(s.differences(l), ans)
+        np.testing.assert_allclose(s.differences(iter(l)), ans)
+        with self.assertRaises(TypeError):
+            _ = s.differences(["b"])
+        with self.assertRaises(ValueError):
+            _ = s.differences(np.zeros((10, 5)))
+
+    def test_from_stream(self):
+        """Test from_stream method.
+        """
+        ratings = [random.randint(1, 5) for _ in range(100)]
+        expect = Summary([Review(v) for v in ratings])
+        for s in (
+                Summary.from_stream(iter(ratings), chunksize=7),
+                Summary.from_stream(Review(v) for v in ratings),
+                Summary.from_stream(
+                    [np.array(ratings[:50])] + ratings[50:], chunksize=3)):
+            self.assertAlmostEqual(s.score, expect.score)
+            self.assertEqual(sorted(s._histo.keys()), sorted(expect._histo.keys()))
+
+        dense = Summary.from_stream(iter(ratings), bins=range(1, 6))
+        self.assertIsInstance(dense._histo, DenseHistoReview)
+        self.assertAlmostEqual(dense.score, expect.score)
+        s = IncrementalHistoSummary.from_stream(iter(ratings), bins=range(1, 6))
+        self.assertEqual(s.count, len(ratings))
+        self.assertAlmostEqual(s.score, expect.score)
+        with self.assertRaises(ValueError):
+            Summary.from_stream([])
+        with self.assertRaises(ValueError):
+            Summary.from_stream([7], bins=range(1, 6))
+
+    def test_create_with_mixed_reviews(self):
+        """Test __init__ method with dense and sparse reviews.
+        """
+        reviews = [DenseHistoReview(2, bins=range(1, 4)), Review(5), Review(2)]
+        s = Summary(iter(reviews))
+        self.assertNotIsInstance(s._histo, DenseHistoReview)
+        self.assertEqual(s._histo, Review({2: 2. / 3, 5: 1. / 3}))
+
+    def test_merge(self):
+        """Test merge and subtract methods.
+        """
+        ratings = [random.randint(1, 5) for _ in range(100)]
+        left, right = Summary(ratings[:30]), Summary(ratings[30:])
+        merged = left + right
+        self.assertIs(type(merged), Summary)
+        self.assertEqual(merged.count, len(ratings))
+        self.assertEqual(merged.total, Summary(ratings).total)
+        self.assertEqual(merged._histo, Summary(ratings)._histo)
+        self.assertEqual(left.merge(Summary(Review(2))).count, 31)
+
+        rest = merged - left
+        self.assertEqual(rest.count, len(ratings) - 30)
+        self.assertEqual(set(rest.total), set(ratings[30:]))
+        self.assertEqual(rest._histo, right._histo)
+        empty = left - left
+        self.assertEqual(empty.count, 0)
+        self.assertEqual(list(empty._histo), [])
+        with self.assertRaises(ValueError):
+            _ = left - merged
+        with self.assertRaises(TypeError):
+            _ = left + 3
+
+    def test_merge_dense(self):
+        """Test merging dense and incremental summaries.
+        """
+        ratings = [random.randint(1, 5) for _ in range(50)]
+        left = Summary(ratings[:20], bins=range(1, 6))
+        right = Summary(ratings[20:], bins=range(1, 6))
+        merged = left + right
+        self.assertIsInstance(merged._histo, DenseHistoReview)
+        self.assertEqual(
+            merged._histo, Summary(ratings, bins=range(1, 6))._histo)
+        self.assertIsInstance((merged - left)._histo, DenseHistoReview)
+        empty = merged - merged
+        self.assertEqual(empty.count, 0)
+        self.assertEqual(empty.score, 0)
+
+        incremental = IncrementalHistoSummary(ratings[:20])
+        res = incremental + Summary(ratings[20:])
+        self.assertEqual(res.count, len(ratings))
+        self.assertAlmostEqual(res.score, Summary(ratings).score)
+        self.assertNotIsInstance((merged + incremental)._histo, DenseHistoReview)
+
     def test_review_class(self):
         """Test review_class method.
         """
         self.assertEqual(Summary.review_class(), Review)
 
 
+class TestDenseHistoReview(unittest.TestCase):
+    """Test case for DenseHistoReview class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.bins = Bins(range(1, 6))
+        self.a = random.randint(1, 5)
+        self.b = random.randint(1, 5)
+        while self.a == self.b:
+            self.b = random.randint(1, 5)
+
+    def dense(self, v):
+        """Create a dense review defined on the bins.
+        """
+        return DenseHistoReview(v, bins=self.bins)
+
+    def test_create(self):
+        """Test creating a dense review.
+        """
+        r = self.dense(self.a)
+        self.assertEqual(r[self.a], 1)
+        self.assertEqual(r[self.b], 0)
+        self.assertEqual(len(r.array), len(self.bins))
+        self.assertEqual(r, Review(self.a))
+        self.assertEqual(r.vector, Review(self.a).vector)
+
+        r2 = self.dense({self.a: 1, self.b: 2})
+        self.assertEqual(r2[self.a], 1)
+        self.assertEqual(r2[self.b], 2)
+
+    def test_create_out_of_bins(self):
+        """Test creating a dense review with a rating out of the bins.
+        """
+        with self.assertRaises(ValueError):
+            _ = self.dense(10)
+        with self.assertRaises(ValueError):
+            _ = DenseHistoReview(self.a)
+
+    def test_arithmetic(self):
+        """Test arithmetic operators give same results as sparse reviews.
+        """
+        x, y = self.dense(self.a), self.dense(self.b)
+        rx, ry = Review(self.a), Review(self.b)
+        self.assertIsInstance(x + y, DenseHistoReview)
+        self.assertEqual((x + y).score, (rx + ry).score)
+        self.assertEqual((x - y).score, (rx - ry).score)
+        self.assertEqual((2.5 * x).score, (2.5 * rx).score)
+        self.assertAlmostEqual((x / 3.).score, (rx / 3.).score)
+        self.assertEqual((x + x).norm(), 2.)
+        self.assertEqual((x + ry).score, (rx + ry).score)
+
+    def test_inner_product(self):
+        """Test inner_product method.
+        """
+        x = self.dense({self.a: 1, self.b: 2})
+        self.assertEqual(x.inner_product(x), 5)
+        self.assertEqual(x.inner_product(self.dense(self.b)), 2)
+        self.assertEqual(x.inner_product(Review(self.a)), 1)
+        self.assertEqual(Review(self.a).inner_product(x), 1)
+
+    def test_iter(self):
+        """Test iteration yields non-zero bins.
+        """
+        x = self.dense({self.a: 1, self.b: 2})
+        self.assertEqual(sorted(x), sorted([self.a, self.b]))
+        self.assertIn(self.a, x)
+        self.assertNotIn(10, x)
+
+
+class TestDenseHistoSummary(unittest.TestCase):
+    """Test case for HistoSummary class with dense reviews.
+    """
+
+    def test_create_with_dense_reviews(self):
+        """Test __init__method with dense reviews.
+        """
+        l = [random.randint(1, 5) for _ in range(10)]
+        bins = Bins(range(1, 6))
+        summary = Summary([DenseHistoReview(v, bins=bins) for v in l])
+        self.assertAlmostEqual(summary.score, np.mean(l))
+        self.assertAlmostEqual(summary.score, Summary(l).score)
+
+    def test_create_with_bins(self):
+        """Test __init__method with bins.
+        """
+        l = [random.randint(1, 5) for _ in range(10)]
+        summary = Summary(l, bins=range(1, 6))
+        self.assertAlmostEqual(summary.score, np.mean(l))
+
+        r = Review(l[0])
+        s = Summary(random.randint(1, 5), bins=range(1, 6))
+        self.assertEqual(s.difference(r), Summary(s.score).difference(r))
+
+    def test_differences(self):
+        """Test differences method with dense reviews and a matrix.
+        """
+        bins = Bins(range(1, 6))
+        s = Summary([random.randint(1, 5) for _ in range(10)], bins=bins)
+        l = [
+            DenseHistoReview(
+                {random.randint(1, 5): 1, random.randint(1, 5): 2}, bins=bins)
+            for _ in range(10)]
+        ans = [s.difference(r) for r in l]
+        np.testing.assert_allclose(s.differences(l), ans)
+        np.testing.assert_allclose(
+            s.differences(np.stack([r.array for r in l])), ans)
+        np.testing.assert_allclose(
+            s.differences([Review(r.vector) for r in l]), ans)
+        with self.assertRaises(ValueError):
+            _ = s.differences(np.zeros((10, 3)))
+
+
+class TestOneHotHistoReview(unittest.TestCase):
+    """Test case for OneHotHistoReview class and interned reviews.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        Review.clear_interned()
+
+    def tearDown(self):
+        """Clean up for tests.
+        """
+        Review.clear_interned()
+
+    def test_interned(self):
+        """Test interned method returns shared instances.
+        """
+        r = Review.interned(4)
+        self.assertIsInstance(r, OneHotHistoReview)
+        self.assertIs(Review.interned(4.2), r)
+        self.assertIs(Review.interned({4: 1}), r)
+        self.assertIsNone(r.date)
+        self.assertEqual(r, Review(4))
+        self.assertEqual(r.vector, {4: 1.})
+        self.assertEqual(r.score, 4.)
+
+        v = Review.interned({1: 2, 3: .5})
+        self.assertIs(Review.interned({3: .5, 1: 2.}), v)
+        self.assertEqual(v, Review({1: 2, 3: .5}))
+
+        dense = Review.interned(2, RoundHalfUp(1, 5))
+        self.assertIsInstance(dense, DenseHistoReview)
+        self.assertIs(Review.interned(2.2, RoundHalfUp(1, 5)), dense)
+
+        Review.clear_interned()
+        self.assertIsNot(Review.interned(4), r)
+        self.assertEqual(Review.interned(4), r)
+
+    def test_interned_vectors_bounded(self):
+        """Test interned vectors are evicted in least recently used order.
+        """
+        Review.clear_interned()
+        first = Review.interned({1: .5, 2: .5})
+        for i in range(histogram._INTERNED_VECTORS_SIZE - 1):
+            Review.interned({1: random.random(), 2: i})
+        self.assertIs(Review.interned({1: .5, 2: .5}), first)
+        second = Review.interned({1: 1.5, 2: .5})
+        self.assertIs(Review.interned({1: .5, 2: .5}), first)
+        self.assertEqual(
+            len(histogram._INTERNED_VECTORS),
+            histogram._INTERNED_VECTORS_SIZE)
+        for i in range(histogram._INTERNED_VECTORS_SIZE):
+            Review.interned({3: random.random(), 4: i})
+        self.assertIsNot(Review.interned({1: 1.5, 2: .5}), second)
+        Review.clear_interned()
+
+    def test_from_array(self):
+        """Test from_array method returns interned one-hot reviews.
+        """
+        res = Review.from_array([1, 2, 1, 5])
+        self.assertIs(res[0], res[2])
+        self.assertIs(res[0], Review.interned(1))
+        self.assertEqual(res, [Review(v) for v in (1, 2, 1, 5)])
+        self.assertNotIsInstance(
+            Review.from_array([1], ["2017-01-01"])[0], OneHotHistoReview)
+
+    def test_operations(self):
+        """Test operations give same results as plain reviews.
+        """
+        a, b = Review.interned(3), Review.interned(2)
+        plain = Review({2: .5, 3: 2})
+        self.assertEqual(a.inner_product(a), 1.)
+        self.assertEqual(a.inner_product(b), 0.)
+        self.assertEqual(a.inner_product(plain), 2.)
+        self.assertEqual(plain.inner_product(a), 2.)
+        self.assertEqual(
+            a.inner_product(DenseHistoReview(3, bins=range(5))), 1.)
+        self.assertNotEqual(a, b)
+        self.assertEqual(a + b, Review(3) + Review(2))
+        self.assertEqual(2 * a, 2 * Review(3))
+        self.assertEqual(a - a, Review({3: 0}))
+        self.assertEqual(a.norm(), 1.)
+        self.assertIn(3, a)
+        self.assertNotIn(2, a)
+        self.assertEqual(list(a), [3])
+        with self.assertRaises(KeyError):
+            _ = a[2]
+        self.assertEqual(
+            Summary([a, b, a]).score, Summary([Review(v) for v in (3, 2, 3)]).score)
+
+    def test_pickle(self):
+        """Test pickled interned reviews are restored as interned reviews.
+        """
+        r = Review.interned(5)
+        self.assertIs(pickle.loads(pickle.dumps(r)), r)
+        dated = OneHotHistoReview(5, date=3)
+        res = pickle.loads(pickle.dumps(dated))
+        self.assertEqual(res, dated)
+        self.assertEqual(res.date, 3)
+
+
+class TestIncrementalHistoSummary(unittest.TestCase):
+    """Test case for IncrementalHistoSummary class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            Review({
+                random.randint(1, 5): random.random(),
+                random.randint(1, 5): random.random() * 2})
+            for _ in range(20)]
+        self.target = Review(random.randint(1, 5))
+
+    def assertSameSummary(self, s, reviews, bins=None):
+        """Assert an incremental summary is same as a rebuilt summary.
+        """
+        expect = Summary(reviews, bins=bins, summation="fsum")
+        self.assertEqual(s._current(), expect._histo)
+        self.assertEqual(s.score, expect.score)
+        self.assertEqual(
+            s.difference(self.target), expect.difference(self.target))
+
+    def test_add(self):
+        """Test add method.
+        """
+        s = IncrementalHistoSummary()
+        for i, r in enumerate(self.reviews):
+            s.add(r)
+            self.assertSameSummary(s, self.reviews[:i + 1])
+        self.assertEqual(s.count, len(self.reviews))
+
+    def test_add_dense(self):
+        """Test add method of a dense summary.
+        """
+        s = IncrementalHistoSummary(bins=range(1, 6))
+        for i, r in enumerate(self.reviews):
+            s.add(r)
+            self.assertSameSummary(s, self.reviews[:i + 1], range(1, 6))
+
+    def test_remove(self):
+        """Test remove method.
+        """
+        for bins in (None, range(1, 6)):
+            s = IncrementalHistoSummary(self.reviews, bins=bins)
+            for i, r in enumerate(self.reviews[:-1]):
+                s.remove(r)
+                self.assertSameSummary(s, self.reviews[i + 1:], bins)
+            s.remove(self.reviews[-1])
+            self.assertEqual(s.count, 0)
+            self.assertEqual(s.score, 0)
+            with self.assertRaises(ValueError):
+                s.remove(self.reviews[0])
+
+    def test_update(self):
+        """Test update method.
+        """
+        for bins in (None, range(1, 6)):
+            s = IncrementalHistoSummary(self.reviews, bins=bins)
+            reviews = list(self.reviews)
+            for i in range(len(reviews)):
+                new = Review({random.randint(1, 5): random.random()})
+                s.update(reviews[i], new)
+                reviews[i] = new
+                self.assertSameSummary(s, reviews, bins)
+
+    def test_extend(self):
+        """Test extend method.
+        """
+        for bins in (None, range(1, 6)):
+            s = IncrementalHistoSummary(self.reviews[:5], bins=bins)
+            s.extend(self.reviews[5:])
+            s.extend([])
+            self.assertEqual(s.count, len(self.reviews))
+            self.assertSameSummary(s, self.reviews, bins)
+            for r in self.reviews:
+                s.remove(r)
+            self.assertEqual(s.score, 0)
+            s.extend([2, 3.2])
+            self.assertSameSummary(s, [2, 3], bins)
+
+
+    def test_merge(self):
+        """Test merged incremental summaries are exact.
+        """
+        for bins in (None, range(1, 6)):
+            left = IncrementalHistoSummary(self.reviews[:7], bins=bins)
+            right = IncrementalHistoSummary(self.reviews[7:], bins=bins)
+            merged = left + right
+            expect = Summary(self.reviews, bins=bins, summation="fsum")
+            self.assertEqual(merged._histo, expect._histo)
+            self.assertEqual(merged.score, expect.score)
+
+
+class TestWeightedHistoSummary(unittest.TestCase):
+    """Test case for WeightedHistoSummary class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            Review({random.randint(1, 5): 1, random.randint(1, 5): 2})
+            for _ in range(20)]
+        self.weights = [random.random() + .1 for _ in range(20)]
+
+    def expect(self, weights):
+        """Weighted mean computed by review arithmetic.
+        """
+        total = sum(
+            (w * r for w, r in zip(weights[1:], self.reviews[1:])),
+            weights[0] * self.reviews[0])
+        return total / sum(weights)
+
+    def assertSameHistogram(self, s, expect):
+        """Assert the histogram of a summary is same as a given review.
+        """
+        self.assertEqual(sorted(s._histo.keys()), sorted(expect.keys()))
+        for k in expect:
+            self.assertAlmostEqual(s._histo[k], expect[k])
+
+    def test_create(self):
+        """Test __init__ method computes a weighted mean.
+        """
+        s = WeightedHistoSummary(self.reviews, self.weights)
+        self.assertSameHistogram(s, self.expect(self.weights))
+        self.assertAlmostEqual(s.score, self.expect(self.weights).score)
+        s = WeightedHistoSummary(self.reviews, [1] * 20)
+        self.assertAlmostEqual(s.score, Summary(self.reviews).score)
+
+        s = WeightedHistoSummary(self.reviews, self.weights, bins=range(1, 7))
+        self.assertIsInstance(s._histo, DenseHistoReview)
+        self.assertAlmostEqual(s.score, self.expect(self.weights).score)
+        dense = [DenseHistoReview(r.vector, bins=range(1, 6)) for r in self.reviews]
+        s = WeightedHistoSummary(dense, self.weights)
+        self.assertIsInstance(s._histo, DenseHistoReview)
+        self.assertAlmostEqual(s.score, self.expect(self.weights).score)
+
+    def test_reweight(self):
+        """Test reweight method.
+        """
+        s = WeightedHistoSummary(self.reviews, self.weights)
+        weights = [random.random() for _ in range(20)]
+        s.reweight(weights)
+        self.assertSameHistogram(s, self.expect(weights))
+        target = Review(3)
+        self.assertAlmostEqual(
+            s.difference(target),
+            abs(1 - self.expect(weights).inner_product(target)))
+        with self.assertRaises(ValueError):
+            s.reweight(weights[1:])
+
+    def test_from_stream(self):
+        """Test weighted summaries can't be created from a stream.
+        """
+        with self.assertRaises(TypeError):
+            _ = WeightedHistoSummary.from_stream(iter([1, 2, 3]))
+
+
+class TestHistoAccumulator(unittest.TestCase):
+    """Test case for HistoAccumulator class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            Review({random.randint(1, 5): 1, random.randint(1, 5): 2})
+            for _ in range(20)]
+        self.expect = sum(self.reviews[1:], self.reviews[0])
+
+    def test_accumulate(self):
+        """Test iadd and axpy methods give same results as arithmetic.
+        """
+        acc = HistoAccumulator()
+        for r in self.reviews:
+            acc.iadd(r)
+        self.assertEqual(acc.finalize(), self.expect)
+        acc.axpy(-2, self.reviews[0])
+        acc += 3
+        self.assertEqual(
+            acc.finalize(), self.expect - 2 * self.reviews[0] + Review(3))
+
+    def test_dense(self):
+        """Test accumulating dense reviews.
+        """
+        bins = Bins(range(1, 6))
+        acc = HistoAccumulator(bins)
+        for r in self.reviews:
+            acc.iadd(DenseHistoReview(r.vector, bins=bins))
+        res = acc.finalize()
+        self.assertIsInstance(res, DenseHistoReview)
+        self.assertEqual(res, self.expect)
+
+        acc.axpy(.5, DenseHistoReview(2, bins=bins)).axpy(.5, 2)
+        self.assertEqual(acc.finalize(), self.expect + Review(2))
+        self.assertEqual(res, self.expect)
+        with self.assertRaises(ValueError):
+            acc.iadd(7)
+        with self.assertRaises(TypeError):
+            acc.axpy("a", 1)
+
+
+class TestHistoMatrix(unittest.TestCase):
+    """Test case for HistoMatrix class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            Review({random.randint(1, 5): 1, random.randint(1, 5): 2})
+            for _ in range(30)]
+        self.groups = np.array([random.randint(0, 3) for _ in self.reviews])
+        self.groups[:4] = range(4)
+
+    def test_from_reviews(self):
+        """Test from_reviews method and __getitem__ method.
+        """
+        m = HistoMatrix.from_reviews(self.reviews)
+        self.assertEqual(len(m), len(self.reviews))
+        for i, r in enumerate(self.reviews):
+            self.assertEqual(m[i], r)
+        self.assertEqual(m[-1], self.reviews[-1])
+        self.assertEqual(m[-len(m)], self.reviews[0])
+        for i in (len(m), -len(m) - 1):
+            with self.assertRaises(IndexError):
+                _ = m[i]
+        with self.assertRaises(TypeError):
+            _ = HistoMatrix.from_reviews([1, 2])
+
+    def test_from_triples(self):
+        """Test from_triples method.
+        """
+        m = HistoMatrix.from_triples(
+            [0, 0, 0, 2], [1.2, 4.6, 1.4, 3.], [1, 2, 3, 4], n_rows=4)
+        self.assertEqual(m.shape, (4, 3))
+        self.assertEqual(m[0], Review({1: 4, 5: 2}))
+        self.assertEqual(m[1], Review({}))
+        self.assertEqual(m[2], Review({3: 4}))
+        np.testing.assert_array_equal(
+            m.toarray(), [[4, 0, 2], [0, 0, 0], [0, 4, 0], [0, 0, 0]])
+        with self.assertRaises(ValueError):
+            _ = HistoMatrix.from_triples([0], [10], bins=range(1, 6))
+
+    def test_summaries(self):
+        """Test summaries and differences methods.
+        """
+        m = HistoMatrix.from_reviews(self.reviews, bins=range(1, 6))
+        means = m.means(self.groups)
+        summaries = m.summaries(self.groups)
+        self.assertEqual(len(summaries), 4)
+        for g, s in enumerate(summaries):
+            expect = Summary(
+                [r for r, i in zip(self.reviews, self.groups) if i == g])
+            self.assertAlmostEqual(s.score, expect.score)
+
+        res = m.differences(means, self.groups)
+        for r, g, d in zip(self.reviews, self.groups, res):
+            self.assertAlmostEqual(d, summaries[g].difference(r))
+
+    def test_merge_summaries(self):
+        """Test summaries of groups keep their counts when merged.
+        """
+        m = HistoMatrix.from_reviews(
+            [Review(1), Review(1), Review(1), Review(5)], bins=range(1, 6))
+        s0, s1 = m.summaries([0, 0, 0, 1])
+        self.assertEqual(s0.count, 3)
+        self.assertEqual(s1.count, 1)
+        merged = s0 + s1
+        self.assertEqual(merged.count, 4)
+        self.assertEqual(merged._histo, Review({1: 0.75, 5: 0.25}))
+        self.assertEqual(m.summaries([0, 0, 0, 2])[1], None)
+
+    def test_summary_differences(self):
+        """Test HistoSummary.differences with a matrix.
+        """
+        m = HistoMatrix.from_reviews(self.reviews)
+        s = Summary([random.randint(1, 5) for _ in range(10)])
+        np.testing.assert_allclose(
+            s.differences(m), [s.difference(r) for r in self.reviews])
+
+
 if __name__ == "__main__":
     unittest.main()
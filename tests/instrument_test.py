@@ -0,0 +1,132 @@
+#
+# instrument_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.instrument module.
+"""
+import unittest
+
+from review import instrument
+from review.approximate import SampledAverageSummary
+from review.base import Review
+from review.grouped import average_summaries
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import OneHotHistoReview
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import WeightedAverageSummary
+from review.sketch import DistributionSummary
+
+
+class TestInstrument(unittest.TestCase):
+    """Test case for instrumentation of reviews and summaries.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        instrument.reset()
+
+    def tearDown(self):
+        """Clean up for tests.
+        """
+        instrument.disable()
+        instrument.reset()
+
+    def test_disabled(self):
+        """Test methods are not replaced while instrumentation is disabled.
+        """
+        init = Review.__dict__["__init__"]
+        difference = AverageSummary.__dict__["difference"]
+        instrument.enable()
+        self.assertTrue(instrument.is_enabled())
+        self.assertIsNot(Review.__dict__["__init__"], init)
+        instrument.disable()
+        self.assertFalse(instrument.is_enabled())
+        self.assertIs(Review.__dict__["__init__"], init)
+        self.assertIs(AverageSummary.__dict__["difference"], difference)
+
+        AverageSummary([1, 2, 3]).difference(AverageReview(1))
+        self.assertEqual(instrument.snapshot(), {
+            "calls": {}, "time": {}, "allocations": {}, "bins": {}})
+
+    def test_summaries(self):
+        """Test counting summary constructions and differences.
+        """
+        with instrument.instrumented() as snapshot:
+            summary = AverageSummary([AverageReview(v) for v in (1, 2, 3)])
+            summary.difference(AverageReview(1))
+            summary.difference(AverageReview(2))
+            HistoSummary([HistoReview(v) for v in (1, 2, 2)])
+            res = snapshot()
+
+        self.assertEqual(res["calls"]["AverageSummary.__init__"], 1)
+        self.assertEqual(res["calls"]["AverageSummary.difference"], 2)
+        self.assertEqual(res["calls"]["HistoSummary.__init__"], 1)
+        self.assertGreaterEqual(res["time"]["AverageSummary.__init__"], 0)
+        self.assertGreaterEqual(res["allocations"]["AverageReview"], 6)
+        self.assertGreaterEqual(res["allocations"]["HistoReview"], 3)
+
+    def test_subclasses(self):
+        """Test summaries created from sums and subclasses are counted.
+        """
+        s = AverageSummary([1, 2])
+        with instrument.instrumented() as snapshot:
+            _ = s + s
+            average_summaries(["a", "b", "a"], [1, 2, 3])["a"]
+            WeightedAverageSummary([1, 2], [1, 1])
+            DistributionSummary([1, 2, 3])
+            SampledAverageSummary([1, 2, 3], 2)
+            OneHotHistoReview(1).inner_product(HistoReview({1: 1., 2: 1.}))
+            res = snapshot()
+
+        self.assertEqual(res["calls"]["AverageSummary._from_sums"], 2)
+        self.assertEqual(res["calls"]["WeightedAverageSummary.__init__"], 1)
+        self.assertEqual(res["calls"]["DistributionSummary.__init__"], 1)
+        self.assertEqual(res["calls"]["SampledAverageSummary.__init__"], 1)
+        self.assertEqual(res["calls"]["OneHotHistoReview.inner_product"], 1)
+        self.assertEqual(res["bins"]["OneHotHistoReview.inner_product"], 1)
+        self.assertIsInstance(
+            AverageSummary.__dict__["_from_sums"], classmethod)
+
+    def test_arithmetic(self):
+        """Test counting arithmetic and bins of histogram reviews.
+        """
+        a = HistoReview({1: 1., 2: 1.})
+        b = HistoReview({2: 1., 3: 1., 4: 1.})
+        with instrument.instrumented():
+            self.assertEqual(a - b, HistoReview({1: 1., 2: 0., 3: -1., 4: -1.}))
+            a.inner_product(b)
+            AverageReview(4) / 2
+        res = instrument.snapshot()
+
+        self.assertEqual(res["calls"]["_ImmutableAdditiveGroup.__sub__"], 1)
+        self.assertEqual(res["calls"]["HistoReview.__add__"], 1)
+        self.assertEqual(res["bins"]["HistoReview.__add__"], 4)
+        self.assertEqual(res["bins"]["HistoReview.inner_product"], 2)
+        self.assertEqual(
+            res["calls"]["_MultipliableImmutableAdditiveGroup.__truediv__"], 1)
+
+        instrument.reset()
+        self.assertEqual(instrument.snapshot()["calls"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+#
+# parallel_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.parallel module.
+"""
+import random
+import unittest
+
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.approximate import SampledAverageSummary
+from review.histogram import HistoSummary
+from review.histogram import IncrementalHistoSummary
+from review.histogram import WeightedHistoSummary
+from review.parallel import summarize_many
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import IncrementalAverageSummary
+from review.scalar import ReviewArray
+from review.scalar import WeightedAverageSummary
+from review.sketch import DistributionSummary
+
+
+class TestSummarizeMany(unittest.TestCase):
+    """Test case for summarize_many function.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.groups = [
+            [random.randint(1, 5) for _ in range(random.randint(1, 20))]
+            for _ in range(10)]
+
+    def test_average(self):
+        """Test computing average summaries.
+        """
+        groups = [[AverageReview(v) for v in g] for g in self.groups]
+        groups[0] = ReviewArray(self.groups[0])
+        for workers in (None, 2):
+            res = summarize_many(groups, AverageSummary, workers=workers)
+            self.assertEqual(len(res), len(groups))
+            for s, g in zip(res, self.groups):
+                self.assertIsInstance(s, AverageSummary)
+                self.assertAlmostEqual(s.score, AverageSummary(g).score)
+
+    def test_histogram(self):
+        """Test computing histogram summaries.
+        """
+        groups = [[HistoReview(v) for v in g] for g in self.groups]
+        groups[0] = [DenseHistoReview(v, bins=range(1, 6)) for v in self.groups[0]]
+        target = HistoReview(3)
+        serial = summarize_many(groups, HistoSummary)
+        parallel = summarize_many(groups, HistoSummary, workers=2)
+        for s, p, g in zip(serial, parallel, self.groups):
+            expect = HistoSummary(g)
+            self.assertAlmostEqual(s.score, expect.score)
+            self.assertAlmostEqual(s.difference(target), expect.difference(target))
+            self.assertEqual(s.score, p.score)
+        self.assertIsInstance(serial[0]._histo, DenseHistoReview)
+
+    def test_mapping(self):
+        """Test groups given as a mapping.
+        """
+        groups = {"p{0}".format(i): g for i, g in enumerate(self.groups)}
+        res = summarize_many(groups, AverageSummary, workers=2)
+        self.assertEqual(set(res), set(groups))
+        for k, g in groups.items():
+            self.assertAlmostEqual(res[k].score, AverageSummary(g).score)
+
+    def test_unsupported_summary(self):
+        """Test an unsupported summary class.
+        """
+        with self.assertRaises(TypeError):
+            _ = summarize_many(self.groups, object)
+        for cls in (WeightedAverageSummary, DistributionSummary,
+                    WeightedHistoSummary, SampledAverageSummary):
+            with self.assertRaises(TypeError):
+                _ = summarize_many(self.groups, cls)
+
+    def test_incremental_summary(self):
+        """Test incremental summaries can be created.
+        """
+        res = summarize_many(self.groups, IncrementalAverageSummary)
+        for g, s in zip(self.groups, res):
+            self.assertIsInstance(s, IncrementalAverageSummary)
+            s.add(3)
+            self.assertEqual(s.score, AverageSummary(g + [3], "fsum").score)
+        res = summarize_many(self.groups, IncrementalHistoSummary)
+        for g, s in zip(self.groups, res):
+            self.assertIsInstance(s, IncrementalHistoSummary)
+            self.assertEqual(s.count, len(g))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#
+# quantizer_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.quantizer module.
+"""
+import unittest
+
+import numpy as np
+
+from review.histogram import DenseHistoReview
+from review.histogram import HistoMatrix
+from review.histogram import HistoReview
+from review.quantizer import BinEdges
+from review.quantizer import FixedWidth
+from review.quantizer import Floor
+from review.quantizer import RoundHalfUp
+
+
+class TestRoundHalfUp(unittest.TestCase):
+    """Test case for RoundHalfUp class.
+    """
+
+    def test_quantize(self):
+        """Test quantize method rounds halves up.
+        """
+        q = RoundHalfUp()
+        np.testing.assert_array_equal(
+            q.quantize([0.4, 0.5, 1.5, 2.5, 2.6]), [0, 1, 2, 3, 3])
+        self.assertEqual(q(2.5), 3)
+        self.assertIsNone(q.bins)
+        with self.assertRaises(TypeError):
+            _ = q("2.5")
+
+    def test_dense_review(self):
+        """Test reviews with a bounded quantizer are dense.
+        """
+        q = RoundHalfUp(1, 5)
+        self.assertEqual(q.bins.keys, (1, 2, 3, 4, 5))
+        r = HistoReview.create(2.5, q, date=1)
+        self.assertIsInstance(r, DenseHistoReview)
+        self.assertEqual(r, HistoReview(3))
+        self.assertEqual(r.date, 1)
+        self.assertNotIsInstance(
+            HistoReview.create(2.5, RoundHalfUp()), DenseHistoReview)
+        self.assertNotIsInstance(HistoReview(2.5, q), DenseHistoReview)
+
+        res = HistoReview.from_array([1.2, 2.5, 4.5], quantizer=q)
+        self.assertEqual(res, [HistoReview(1), HistoReview(3), HistoReview(5)])
+        for r in res:
+            self.assertIsInstance(r, DenseHistoReview)
+
+
+class TestFloor(unittest.TestCase):
+    """Test case for Floor class.
+    """
+
+    def test_quantize(self):
+        """Test quantize method.
+        """
+        q = Floor(1, 5)
+        np.testing.assert_array_equal(q.quantize([1.9, 2., 4.99]), [1, 2, 4])
+        self.assertEqual(len(q.bins), 5)
+
+
+class TestFixedWidth(unittest.TestCase):
+    """Test case for FixedWidth class.
+    """
+
+    def test_quantize(self):
+        """Test quantize method.
+        """
+        q = FixedWidth(.5, 1, 5)
+        np.testing.assert_array_equal(
+            q.quantize([1., 1.2, 1.5, 4.9, 5.]), [1., 1., 1.5, 4.5, 4.5])
+        self.assertEqual(q.bins.keys, (1., 1.5, 2., 2.5, 3., 3.5, 4., 4.5))
+
+    def test_arithmetic(self):
+        """Test arithmetic keeps fractional bins.
+        """
+        r = HistoReview(2.7, FixedWidth(.5))
+        self.assertEqual((r + r).vector, {2.5: 2.})
+        self.assertEqual((3 * r).vector, {2.5: 3.})
+
+    def test_invalid(self):
+        """Test invalid arguments.
+        """
+        with self.assertRaises(ValueError):
+            _ = FixedWidth(0)
+        with self.assertRaises(ValueError):
+            _ = FixedWidth(1, 5, 1)
+
+
+class TestBinEdges(unittest.TestCase):
+    """Test case for BinEdges class.
+    """
+
+    def test_quantize(self):
+        """Test quantize method.
+        """
+        q = BinEdges([2, 4])
+        np.testing.assert_array_equal(q.quantize([1, 2, 3.9, 4, 10]), [0, 1, 1, 2, 2])
+        self.assertEqual(q.bins.keys, (0, 1, 2))
+
+    def test_labels(self):
+        """Test quantize method with labels.
+        """
+        q = BinEdges([2, 4], labels=[1, 3, 5])
+        self.assertEqual(q(3.), 3)
+        m = HistoMatrix.from_triples([0, 0, 1], [1, 3, 4.5], quantizer=q)
+        self.assertEqual(m.bins, q.bins)
+        self.assertEqual(m[0], HistoReview({1: 1, 3: 1}))
+
+    def test_invalid(self):
+        """Test invalid arguments.
+        """
+        with self.assertRaises(ValueError):
+            _ = BinEdges([2, 1])
+        with self.assertRaises(ValueError):
+            _ = BinEdges([1, 2], labels=[1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
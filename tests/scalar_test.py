@@ -20,13 +20,19 @@
 #
 """Unit tests for review.scalar module.
 """
+import datetime
+import io
 import random
 import unittest
 
 import numpy as np
 
+from review.scalar import AverageAccumulator
 from review.scalar import AverageReview
 from review.scalar import AverageSummary
+from review.scalar import IncrementalAverageSummary
+from review.scalar import ReviewArray
+from review.scalar import WeightedAverageSummary
 
 
 class TestAverageReview(unittest.TestCase):
@@ -123,6 +129,29 @@ class TestAverageReview(unittest.TestCase):
         with self.assertRaises(TypeError):
             _ = r / "self.b"
 
+    def test_from_array(self):
+        """Test from_array method.
+        """
+        l = [random.random() for _ in range(10)]
+        res = AverageReview.from_array(l)
+        self.assertIsInstance(res, ReviewArray)
+        self.assertEqual(res.to_reviews(), [AverageReview(v) for v in l])
+        self.assertEqual(AverageReview.from_array(iter(l)), res)
+        with self.assertRaises(TypeError):
+            _ = AverageReview.from_array(["v"])
+        with self.assertRaises(TypeError):
+            _ = AverageReview.from_array(iter(["v"]))
+        with self.assertRaises(TypeError):
+            _ = AverageReview.from_array(["3", "4"])
+
+    def test_from_csv(self):
+        """Test from_csv method.
+        """
+        fp = io.StringIO(u"score,date\n1.5,2017-01-02\n2.5,2017-01-03\n")
+        res = AverageReview.from_csv(fp, column=0, date_column=1, header=True)
+        self.assertEqual(res.to_reviews(), [AverageReview(1.5), AverageReview(2.5)])
+        self.assertEqual(res[1].date, datetime.datetime(2017, 1, 3))
+
     def test_eq(self):
         """Test __eq__ method.
         """
@@ -170,7 +199,7 @@ class TestAverageSummary(unittest.TestCase):
         """
         l = [AverageReview(random.random()) for _ in range(10)]
         summary = AverageSummary(l)
-        self.assertEqual(summary.score, np.mean(l).score)
+        self.assertAlmostEqual(summary.score, np.mean(l).score)
 
     def test_create_with_iterator(self):
         """Test __init__method with an iterator.
@@ -184,7 +213,21 @@ class TestAverageSummary(unittest.TestCase):
         """
         l = [AverageReview(random.random()) for _ in range(10)]
         summary = AverageSummary(iter(l))
-        self.assertEqual(summary.score, np.mean(l).score)
+        self.assertAlmostEqual(summary.score, np.mean(l).score)
+
+    def test_create_with_generator(self):
+        """Test __init__method with a generator of reviews.
+        """
+        l = [random.random() for _ in range(10)]
+        summary = AverageSummary(AverageReview(v) for v in l)
+        self.assertAlmostEqual(summary.score, np.mean(l))
+
+    def test_create_with_array(self):
+        """Test __init__method with a numpy array.
+        """
+        l = np.random.randint(1, 6, size=10)
+        summary = AverageSummary(l)
+        self.assertAlmostEqual(summary.score, np.mean(l))
 
     def test_create_with_wrong_single_value(self):
         """Test __init__method with a non number.
@@ -213,11 +256,351 @@ class TestAverageSummary(unittest.TestCase):
         with self.assertRaises(TypeError):
             _ = s.difference("b")
 
+    def test_create_with_review_array(self):
+        """Test __init__method with a review array.
+        """
+        l = [random.random() for _ in range(10)]
+        summary = AverageSummary(ReviewArray(l))
+        self.assertAlmostEqual(summary.score, np.mean(l))
+
+    def test_difference_with_review_array(self):
+        """Test difference method with a review array.
+        """
+        l = [random.random() for _ in range(10)]
+        s = AverageSummary(random.random())
+        res = s.difference(ReviewArray(l))
+        self.assertEqual(len(res), len(l))
+        for v, d in zip(l, res):
+            self.assertAlmostEqual(d, abs(s.score - v))
+
+    def test_differences(self):
+        """Test differences method.
+        """
+        l = [AverageReview(random.random()) for _ in range(10)]
+        s = AverageSummary(random.random())
+        ans = [s.difference(r) for r in l]
+        np.testing.assert_allclose(s.differences(l), ans)
+        np.testing.assert_allclose(s.differences(iter(l)), ans)
+        np.testing.assert_allclose(
+            s.differences(np.array([r.score for r in l])), ans)
+        with self.assertRaises(TypeError):
+            _ = s.differences(["b"])
+
+    def test_from_stream(self):
+        """Test from_stream method.
+        """
+        scores = [random.randint(1, 5) for _ in range(100)]
+        expect = np.mean(scores)
+        self.assertEqual(
+            AverageSummary.from_stream(iter(scores), chunksize=7).score, expect)
+        self.assertEqual(
+            AverageSummary.from_stream(
+                AverageReview(v) for v in scores).score, expect)
+        chunks = [ReviewArray(scores[:40]), np.array(scores[40:90])] + scores[90:]
+        self.assertEqual(AverageSummary.from_stream(chunks).score, expect)
+        self.assertTrue(np.isnan(AverageSummary.from_stream([]).score))
+
+        s = IncrementalAverageSummary.from_stream(iter(scores), chunksize=3)
+        self.assertEqual(s.count, len(scores))
+        self.assertEqual(s.score, expect)
+        with self.assertRaises(TypeError):
+            AverageSummary.from_stream(["v"])
+        with self.assertRaises(ValueError):
+            AverageSummary.from_stream(scores, chunksize=0)
+
+    def test_merge(self):
+        """Test merge and subtract methods.
+        """
+        scores = [random.randint(1, 5) for _ in range(100)]
+        left = AverageSummary(scores[:30])
+        right = AverageSummary(ReviewArray(scores[30:]))
+        merged = left + right
+        self.assertIs(type(merged), AverageSummary)
+        self.assertEqual(merged.count, len(scores))
+        self.assertEqual(merged.total, sum(scores))
+        self.assertEqual(merged.score, AverageSummary(scores).score)
+        self.assertEqual(left.merge(AverageSummary(4)).count, 31)
+
+        self.assertEqual((merged - right).score, left.score)
+        self.assertEqual(merged.subtract(left).count, len(scores) - 30)
+        empty = left - left
+        self.assertEqual(empty.count, 0)
+        self.assertTrue(np.isnan(empty.score))
+        self.assertEqual((empty + right).score, right.score)
+        with self.assertRaises(ValueError):
+            _ = left - merged
+        with self.assertRaises(TypeError):
+            _ = left + 3
+
+        incremental = IncrementalAverageSummary(scores[:30])
+        self.assertEqual((incremental + right).score, merged.score)
+
     def test_review_class(self):
         """Test review_class method.
         """
         self.assertEqual(AverageSummary.review_class(), AverageReview)
 
 
+class TestIncrementalAverageSummary(unittest.TestCase):
+    """Test case for IncrementalAverageSummary class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            AverageReview(random.uniform(1, 5)) for _ in range(20)]
+
+    def expect(self, reviews):
+        """Summary rebuilt from reviews with exact summation.
+        """
+        return AverageSummary(reviews, "fsum")
+
+    def test_create(self):
+        """Test __init__ method gives same results as a rebuild.
+        """
+        s = IncrementalAverageSummary(self.reviews)
+        self.assertEqual(s.count, len(self.reviews))
+        self.assertEqual(s.score, self.expect(self.reviews).score)
+        self.assertEqual(IncrementalAverageSummary(3.).score, 3.)
+        self.assertTrue(np.isnan(IncrementalAverageSummary().score))
+
+    def test_add(self):
+        """Test add method.
+        """
+        s = IncrementalAverageSummary()
+        for i, r in enumerate(self.reviews):
+            s.add(r)
+            expect = self.expect(self.reviews[:i + 1])
+            self.assertEqual(s.score, expect.score)
+            self.assertEqual(
+                s.difference(self.reviews[0]),
+                expect.difference(self.reviews[0]))
+        with self.assertRaises(TypeError):
+            s.add("r")
+
+    def test_remove(self):
+        """Test remove method.
+        """
+        s = IncrementalAverageSummary(self.reviews)
+        for i, r in enumerate(self.reviews[:-1]):
+            s.remove(r)
+            self.assertEqual(s.score, self.expect(self.reviews[i + 1:]).score)
+        s.remove(self.reviews[-1])
+        self.assertEqual(s.count, 0)
+        self.assertTrue(np.isnan(s.score))
+        with self.assertRaises(ValueError):
+            s.remove(self.reviews[0])
+
+    def test_cancellation(self):
+        """Test removing a large score restores the previous score exactly.
+        """
+        s = IncrementalAverageSummary([0.1, 0.2, 0.3])
+        s.add(1e20)
+        s.remove(1e20)
+        self.assertEqual(s.score, self.expect([0.1, 0.2, 0.3]).score)
+
+    def test_update(self):
+        """Test update method.
+        """
+        s = IncrementalAverageSummary(self.reviews)
+        reviews = list(self.reviews)
+        for i in range(len(reviews)):
+            new = AverageReview(random.random())
+            s.update(reviews[i], new)
+            reviews[i] = new
+            self.assertEqual(s.score, self.expect(reviews).score)
+
+    def test_extend(self):
+        """Test extend method.
+        """
+        s = IncrementalAverageSummary(self.reviews[:5])
+        s.extend(self.reviews[5:10])
+        s.extend(ReviewArray.from_reviews(self.reviews[10:]))
+        s.extend([])
+        self.assertEqual(s.count, len(self.reviews))
+        self.assertEqual(s.score, self.expect(self.reviews).score)
+        s.extend(np.array([1., 2.]))
+        self.assertEqual(s.count, len(self.reviews) + 2)
+        with self.assertRaises(TypeError):
+            s.extend(["r"])
+        self.assertEqual(s.count, len(self.reviews) + 2)
+
+    def test_from_sums(self):
+        """Test summaries created from sums keep exact sums.
+        """
+        s = IncrementalAverageSummary._from_sums(2, 0.3)
+        s.add(0.1)
+        self.assertEqual(s.score, self.expect([0.3, 0.1, 0.]).score)
+        m = IncrementalAverageSummary(self.reviews[:7]) + \
+            IncrementalAverageSummary(self.reviews[7:])
+        self.assertEqual(m.score, self.expect(self.reviews).score)
+        with self.assertRaises(ValueError):
+            IncrementalAverageSummary.from_stream(self.reviews, summation="naive")
+
+
+class TestWeightedAverageSummary(unittest.TestCase):
+    """Test case for WeightedAverageSummary class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = [random.randint(1, 5) for _ in range(20)]
+        self.weights = [random.random() + .1 for _ in range(20)]
+
+    def test_create(self):
+        """Test __init__ method computes a weighted mean.
+        """
+        expect = np.average(self.scores, weights=self.weights)
+        s = WeightedAverageSummary(
+            [AverageReview(v) for v in self.scores], self.weights)
+        self.assertAlmostEqual(s.score, expect)
+        s = WeightedAverageSummary(ReviewArray(self.scores), iter(self.weights))
+        self.assertAlmostEqual(s.score, expect)
+        self.assertEqual(
+            WeightedAverageSummary(self.scores, [1] * 20).score,
+            AverageSummary(self.scores).score)
+        self.assertEqual(s.difference(AverageReview(3)), abs(s.score - 3))
+
+    def test_reweight(self):
+        """Test reweight method.
+        """
+        s = WeightedAverageSummary(self.scores, self.weights)
+        weights = [0] * 20
+        weights[3] = 2
+        s.reweight(weights)
+        self.assertEqual(s.score, self.scores[3])
+        self.assertEqual(list(s.weights), weights)
+
+    def test_invalid_weights(self):
+        """Test invalid weights raise ValueError.
+        """
+        for weights in (self.weights[1:], [0] * 20, [-1] + self.weights[1:]):
+            with self.assertRaises(ValueError):
+                WeightedAverageSummary(self.scores, weights)
+
+    def test_from_stream(self):
+        """Test weighted summaries can't be created from a stream.
+        """
+        with self.assertRaises(TypeError):
+            _ = WeightedAverageSummary.from_stream(iter([1, 2, 3]))
+
+
+class TestAverageAccumulator(unittest.TestCase):
+    """Test case for AverageAccumulator class.
+    """
+
+    def test_accumulate(self):
+        """Test iadd, axpy, and finalize methods.
+        """
+        reviews = [AverageReview(random.random()) for _ in range(10)]
+        acc = AverageAccumulator()
+        for r in reviews:
+            acc.iadd(r)
+        self.assertAlmostEqual(acc.finalize(), sum(reviews[1:], reviews[0]))
+        acc += 2
+        acc.axpy(3, reviews[0]).axpy(-1, 1.5)
+        self.assertAlmostEqual(
+            acc.finalize().score,
+            sum(r.score for r in reviews) + .5 + 3 * reviews[0].score)
+        self.assertEqual(AverageAccumulator(reviews[0]).finalize(), reviews[0])
+
+    def test_invalid(self):
+        """Test invalid arguments raise TypeError.
+        """
+        acc = AverageAccumulator()
+        with self.assertRaises(TypeError):
+            acc.iadd("r")
+        with self.assertRaises(TypeError):
+            acc.axpy("a", 1)
+
+
+class TestReviewArray(unittest.TestCase):
+    """Test case for ReviewArray class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = [random.random() for _ in range(10)]
+        self.dates = [datetime.datetime(2017, 1, i + 1) for i in range(10)]
+
+    def test_create(self):
+        """Test __init__ method.
+        """
+        a = ReviewArray(self.scores, self.dates)
+        self.assertEqual(len(a), len(self.scores))
+        self.assertEqual(a.scores.dtype, np.float64)
+        self.assertEqual(a.dates.dtype, np.dtype(ReviewArray.DATE_TYPE))
+        self.assertIsNone(ReviewArray(self.scores).dates)
+
+    def test_create_with_non_number(self):
+        """Test __init__ method with non numbers.
+        """
+        with self.assertRaises(TypeError):
+            _ = ReviewArray(["v" for _ in range(10)])
+
+    def test_create_with_wrong_dates(self):
+        """Test __init__ method with dates of a different length.
+        """
+        with self.assertRaises(ValueError):
+            _ = ReviewArray(self.scores, self.dates[1:])
+
+    def test_create_with_non_dates(self):
+        """Test __init__ method with dates which are not dates.
+        """
+        with self.assertRaises(TypeError):
+            _ = ReviewArray(self.scores, range(10))
+        with self.assertRaises(TypeError):
+            _ = ReviewArray(self.scores, np.arange(10))
+        with self.assertRaises(TypeError):
+            _ = ReviewArray.from_reviews([AverageReview(1, 5)])
+        a = ReviewArray([1, 2, 3], [
+            "2017-01-02", np.datetime64("2017-01-03"), None])
+        self.assertEqual(
+            a.dates.astype(object).tolist(),
+            [datetime.datetime(2017, 1, 2), datetime.datetime(2017, 1, 3),
+             None])
+
+    def test_immutable(self):
+        """Test scores cannot be modified.
+        """
+        a = ReviewArray(self.scores)
+        with self.assertRaises(ValueError):
+            a.scores[0] = 1.
+
+    def test_from_reviews(self):
+        """Test converting from and to a list of reviews.
+        """
+        reviews = [
+            AverageReview(v, d) for v, d in zip(self.scores, self.dates)]
+        a = ReviewArray.from_reviews(reviews)
+        self.assertEqual(a.to_reviews(), reviews)
+        for r, res in zip(reviews, a):
+            self.assertEqual(res.date, r.date)
+
+        b = ReviewArray.from_reviews(AverageReview(v) for v in self.scores)
+        self.assertIsNone(b.dates)
+        self.assertEqual(b.to_reviews(), [AverageReview(v) for v in self.scores])
+
+    def test_from_reviews_with_non_review(self):
+        """Test from_reviews method with non review values.
+        """
+        with self.assertRaises(TypeError):
+            _ = ReviewArray.from_reviews(self.scores)
+
+    def test_getitem(self):
+        """Test __getitem__ method.
+        """
+        a = ReviewArray(self.scores, self.dates)
+        self.assertEqual(a[3], AverageReview(self.scores[3]))
+        self.assertEqual(a[3].date, self.dates[3])
+
+        b = a[2:5]
+        self.assertIsInstance(b, ReviewArray)
+        self.assertEqual(b, ReviewArray(self.scores[2:5], self.dates[2:5]))
+
+
 if __name__ == "__main__":
     unittest.main()
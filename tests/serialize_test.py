@@ -0,0 +1,223 @@
+#
+# serialize_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.serialize module.
+"""
+import datetime
+import io
+import pickle
+import random
+import struct
+import unittest
+
+from review import serialize
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.histogram import IncrementalHistoSummary
+from review.quantizer import FixedWidth
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import IncrementalAverageSummary
+from review.scalar import ReviewArray
+
+
+class TestSerialize(unittest.TestCase):
+    """Test case for dumps and loads functions.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = [random.random() * 5 for _ in range(20)]
+        self.dates = [
+            datetime.datetime(2017, 1, 1) + datetime.timedelta(hours=i)
+            for i in range(20)]
+
+    def test_average_reviews(self):
+        """Test serializing scalar reviews.
+        """
+        reviews = [AverageReview(v, d) for v, d in zip(self.scores, self.dates)]
+        res = serialize.loads(serialize.dumps(reviews))
+        self.assertEqual(res, reviews)
+        self.assertEqual([r.date for r in res], self.dates)
+
+        array = ReviewArray(self.scores, self.dates)
+        self.assertEqual(serialize.loads(serialize.dumps(array)), array)
+        self.assertEqual(serialize.loads(serialize.dumps([])), [])
+
+    def test_histo_reviews(self):
+        """Test serializing histogram reviews.
+        """
+        reviews = [HistoReview({v: 1, v + 1: 2}) for v in self.scores]
+        reviews[0] = HistoReview(2.7, FixedWidth(.5))
+        res = serialize.loads(serialize.dumps(reviews))
+        self.assertEqual(res, reviews)
+
+        dense = [
+            DenseHistoReview(v, bins=range(6), date=d)
+            for v, d in zip(self.scores, self.dates)]
+        res = serialize.loads(serialize.dumps(dense))
+        self.assertEqual(res, dense)
+        for r, d in zip(res, self.dates):
+            self.assertIsInstance(r, DenseHistoReview)
+            self.assertEqual(r.date, d)
+
+    def test_summaries(self):
+        """Test serializing summaries.
+        """
+        s = AverageSummary(self.scores)
+        self.assertEqual(serialize.loads(serialize.dumps(s)).score, s.score)
+        h = HistoSummary(self.scores)
+        res = serialize.loads(serialize.dumps(h))
+        self.assertEqual(res.score, h.score)
+        self.assertEqual(res.difference(HistoReview(3)), h.difference(HistoReview(3)))
+
+    def test_summary_counts(self):
+        """Test serialized summaries keep the numbers of reviews.
+        """
+        s = serialize.loads(serialize.dumps(AverageSummary(self.scores)))
+        self.assertEqual(s.count, len(self.scores))
+        self.assertEqual((s + s).score, s.score)
+        h = serialize.loads(serialize.dumps(
+            HistoSummary(self.scores, bins=range(6))))
+        self.assertEqual(h.count, len(self.scores))
+        self.assertIsInstance(h._histo, DenseHistoReview)
+        self.assertEqual((h + h)._histo, h._histo)
+
+    def test_version1(self):
+        """Test loading summaries stored in the version 1 format.
+        """
+        data = b"RGMR\x01\x04f" + struct.pack("<Qd", 1, 3.5) + b"n" + \
+            struct.pack("<Q", 0)
+        s = serialize.loads(data)
+        self.assertEqual(s.score, 3.5)
+        self.assertEqual(s.count, 1)
+
+    def test_file(self):
+        """Test dump and load functions.
+        """
+        fp = io.BytesIO()
+        serialize.dump(ReviewArray(self.scores), fp)
+        fp.seek(0)
+        self.assertEqual(serialize.load(fp), ReviewArray(self.scores))
+
+    def test_invalid(self):
+        """Test unsupported objects and broken data.
+        """
+        with self.assertRaises(TypeError):
+            _ = serialize.dumps("review")
+        with self.assertRaises(ValueError):
+            _ = serialize.loads(b"NONE\x01\x01")
+
+    def test_size(self):
+        """Test the format is more compact than the default pickle.
+        """
+        reviews = [AverageReview(v) for v in self.scores]
+        self.assertLess(
+            len(serialize.dumps(reviews)),
+            len(pickle.dumps([r.score for r in reviews], 2)))
+
+
+class TestPickle(unittest.TestCase):
+    """Test case for pickling reviews and summaries.
+    """
+
+    def assertPickle(self, obj):
+        """Assert an object survives pickling and return the restored one.
+        """
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            res = pickle.loads(pickle.dumps(obj, protocol))
+            self.assertIs(type(res), type(obj))
+        return res
+
+    def test_reviews(self):
+        """Test pickling reviews.
+        """
+        date = datetime.date(2017, 1, 1)
+        r = AverageReview(3.5, date)
+        res = self.assertPickle(r)
+        self.assertEqual(res, r)
+        self.assertEqual(res.date, date)
+
+        h = HistoReview({1: 2, 3: 4}, date=date)
+        res = self.assertPickle(h)
+        self.assertEqual(res, h)
+        self.assertEqual(res.date, date)
+
+        d = DenseHistoReview(3, bins=range(1, 6))
+        self.assertEqual(self.assertPickle(d), d)
+
+        d = DenseHistoReview(3, bins=range(1, 6), date=date)
+        res = self.assertPickle(d)
+        self.assertEqual(res.bins, d.bins)
+        self.assertEqual(res.date, date)
+
+        a = ReviewArray([1, 2, 3])
+        self.assertEqual(self.assertPickle(a), a)
+
+    def test_non_numeric_bins(self):
+        """Test pickling reviews and summaries of which bins are not numbers.
+        """
+        r = HistoReview("x", quantizer=str)
+        self.assertEqual(self.assertPickle(r), r)
+        s = HistoSummary([r, HistoReview("y", quantizer=str)])
+        self.assertEqual(self.assertPickle(s)._histo, s._histo)
+        with self.assertRaises(TypeError):
+            _ = serialize.dumps([r])
+
+    def test_single_reviews(self):
+        """Test single reviews are pickled as their values, not packed.
+        """
+        for r in (AverageReview(3.5), HistoReview({1: 2, 3: 4}),
+                  DenseHistoReview(3, bins=range(1, 6))):
+            self.assertNotIn(serialize.MAGIC, pickle.dumps(r, 2))
+        self.assertIn(serialize.MAGIC, pickle.dumps(ReviewArray([1, 2]), 2))
+
+    def test_summaries(self):
+        """Test pickling summaries.
+        """
+        s = AverageSummary([1, 2, 3])
+        self.assertEqual(self.assertPickle(s).score, s.score)
+        h = HistoSummary([1, 2, 3])
+        self.assertEqual(self.assertPickle(h).score, h.score)
+
+        s = AverageSummary([.1, .2, .3], "fsum")
+        res = self.assertPickle(s)
+        self.assertEqual(res._partials, s._partials)
+        self.assertEqual(
+            (res + s).score, AverageSummary([.1, .2, .3] * 2, "fsum").score)
+
+    def test_incremental_summaries(self):
+        """Test pickling summaries of which state is not in the format.
+        """
+        s = IncrementalAverageSummary([1, 2, 3])
+        res = self.assertPickle(s)
+        res.add(4)
+        self.assertEqual(res.score, 2.5)
+
+        h = IncrementalHistoSummary([1, 2, 3], bins=range(1, 6))
+        res = self.assertPickle(h)
+        res.add(4)
+        self.assertEqual(res.score, 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+#
+# sketch_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.sketch module.
+"""
+import math
+import pickle
+import unittest
+
+import numpy as np
+
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+from review.sketch import DistributionSummary
+from review.sketch import KLLSketch
+from review.sketch import Moments
+
+
+class TestMoments(unittest.TestCase):
+    """Test case for Moments class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = np.random.RandomState(0).rand(1000) * 5
+
+    def test_extend(self):
+        """Test adding scores one by one and in chunks.
+        """
+        one = Moments()
+        for v in self.scores:
+            one.add(v)
+        chunks = Moments()
+        for i in range(0, len(self.scores), 64):
+            chunks.extend(self.scores[i:i + 64])
+        for m in (one, chunks):
+            self.assertEqual(m.count, len(self.scores))
+            self.assertAlmostEqual(m.mean, np.mean(self.scores))
+            self.assertAlmostEqual(m.variance(), np.var(self.scores))
+            self.assertAlmostEqual(m.variance(1), np.var(self.scores, ddof=1))
+            self.assertEqual(m.min, self.scores.min())
+            self.assertEqual(m.max, self.scores.max())
+
+        m = Moments()
+        self.assertTrue(math.isnan(m.mean))
+        self.assertTrue(math.isnan(m.variance()))
+        self.assertTrue(math.isnan(m.add(3).variance(1)))
+        self.assertEqual(m.variance(), 0)
+
+    def test_merge(self):
+        """Test merging moments.
+        """
+        left = Moments().extend(self.scores[:300])
+        right = Moments().extend(self.scores[300:])
+        copied = left.copy()
+        left.merge(right).merge(Moments())
+        self.assertEqual(left.count, len(self.scores))
+        self.assertAlmostEqual(left.variance(), np.var(self.scores))
+        self.assertEqual(copied.count, 300)
+
+
+class TestKLLSketch(unittest.TestCase):
+    """Test case for KLLSketch class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = np.random.RandomState(1).randn(20000)
+
+    def assertRankError(self, sketch, scores):
+        """Check ranks of quantiles estimated by a sketch.
+        """
+        for q in (.01, .1, .25, .5, .75, .9, .99):
+            rank = np.mean(scores <= sketch.quantile(q))
+            self.assertLess(abs(rank - q), 0.02)
+
+    def test_quantile(self):
+        """Test quantiles estimated from a bounded sketch.
+        """
+        sketch = KLLSketch(seed=0).extend(self.scores)
+        self.assertEqual(sketch.count, len(self.scores))
+        self.assertLess(len(sketch), 1000)
+        self.assertRankError(sketch, self.scores)
+        np.testing.assert_array_equal(
+            sketch.quantile([.1, .5]), [sketch.quantile(.1), sketch.quantile(.5)])
+        self.assertLess(abs(sketch.rank(0.) - np.mean(self.scores <= 0)), 0.02)
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+        sketch = KLLSketch(seed=0)
+        self.assertTrue(math.isnan(sketch.quantile(.5)))
+        for v in self.scores[:3000]:
+            sketch.add(v)
+        self.assertRankError(sketch, self.scores[:3000])
+
+    def test_merge(self):
+        """Test merging sketches.
+        """
+        sketch = KLLSketch(seed=0)
+        for i in range(0, len(self.scores), 5000):
+            sketch.merge(KLLSketch(seed=i).extend(self.scores[i:i + 5000]))
+        self.assertEqual(sketch.count, len(self.scores))
+        self.assertRankError(sketch, self.scores)
+        with self.assertRaises(ValueError):
+            sketch.merge(KLLSketch(k=100))
+
+    def test_seed(self):
+        """Test sketches with the same seed give the same results.
+        """
+        a = KLLSketch(seed=3).extend(self.scores)
+        b = KLLSketch(seed=3).extend(self.scores)
+        self.assertEqual(a.quantile(.3), b.quantile(.3))
+        c = a.copy().extend(self.scores)
+        self.assertEqual(a.count, len(self.scores))
+        self.assertEqual(c.count, 2 * len(self.scores))
+
+
+class TestDistributionSummary(unittest.TestCase):
+    """Test case for DistributionSummary class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.scores = np.random.RandomState(2).randint(1, 6, 5000).astype(float)
+
+    def test_statistics(self):
+        """Test score, variance, and quantiles of a summary.
+        """
+        for scores in (
+                self.scores, ReviewArray(self.scores),
+                [AverageReview(v) for v in self.scores],
+                iter(self.scores.tolist())):
+            s = DistributionSummary(scores, seed=0)
+            self.assertEqual(s.count, len(self.scores))
+            self.assertAlmostEqual(s.score, AverageSummary(self.scores).score)
+            self.assertAlmostEqual(s.variance, np.var(self.scores))
+            self.assertAlmostEqual(s.std, np.std(self.scores))
+            self.assertEqual(s.median, np.median(self.scores))
+            self.assertEqual(s.quantile(0), 1)
+            self.assertEqual(s.quantile(1), 5)
+
+        s = DistributionSummary(AverageReview(3))
+        self.assertEqual((s.score, s.variance), (3, 0))
+        s = DistributionSummary.from_stream(iter(self.scores), chunksize=7)
+        self.assertAlmostEqual(s.variance, np.var(self.scores))
+
+    def test_merge(self):
+        """Test merging summaries.
+        """
+        left = DistributionSummary(self.scores[:2000], seed=0)
+        right = DistributionSummary(self.scores[2000:], seed=1)
+        merged = left + right
+        self.assertIsInstance(merged, DistributionSummary)
+        self.assertEqual(merged.count, len(self.scores))
+        self.assertAlmostEqual(merged.variance, np.var(self.scores))
+        self.assertEqual(merged.median, np.median(self.scores))
+        self.assertEqual(left.count, 2000)
+
+        merged = left + AverageSummary(self.scores[2000:])
+        self.assertIs(type(merged), AverageSummary)
+        self.assertAlmostEqual(merged.score, np.mean(self.scores))
+        self.assertIs(type(merged - left), AverageSummary)
+
+    def test_zscore(self):
+        """Test differences normalized by the standard deviation.
+        """
+        s = DistributionSummary(self.scores)
+        r = AverageReview(5)
+        self.assertEqual(s.difference(r), abs(5 - s.score))
+        self.assertAlmostEqual(
+            s.difference(r, zscore=True), abs(5 - s.score) / np.std(self.scores))
+        reviews = ReviewArray([1., 5.])
+        np.testing.assert_allclose(
+            s.differences(reviews, zscore=True),
+            np.abs(reviews.scores - s.score) / np.std(self.scores))
+        np.testing.assert_allclose(
+            s.difference(reviews, zscore=True),
+            s.differences(reviews, zscore=True))
+
+        s = DistributionSummary([3, 3])
+        self.assertEqual(s.difference(AverageReview(3), zscore=True), 0)
+        self.assertEqual(s.difference(AverageReview(4), zscore=True), np.inf)
+
+    def test_pickle(self):
+        """Test pickling summaries.
+        """
+        s = DistributionSummary(self.scores, seed=0)
+        res = pickle.loads(pickle.dumps(s))
+        self.assertEqual(res.score, s.score)
+        self.assertEqual(res.variance, s.variance)
+        self.assertEqual(res.quantile(.3), s.quantile(.3))
+
+
+if __name__ == "__main__":
+    unittest.main()
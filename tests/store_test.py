@@ -0,0 +1,122 @@
+#
+# store_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.store module.
+"""
+import datetime
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from review.histogram import DenseHistoReview
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.store import ReviewStore
+
+
+class TestReviewStore(unittest.TestCase):
+    """Test case for ReviewStore class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.path = tempfile.mkdtemp()
+        self.groups = {
+            "p{0}".format(i): [
+                random.random() * 5 for _ in range(random.randint(1, 20))]
+            for i in range(10)}
+
+    def tearDown(self):
+        """Remove the store.
+        """
+        shutil.rmtree(self.path)
+
+    def test_average(self):
+        """Test storing scalar reviews.
+        """
+        date = datetime.datetime(2017, 1, 1)
+        groups = {
+            k: [AverageReview(v, date) for v in g]
+            for k, g in self.groups.items()}
+        store = ReviewStore.write(self.path, groups)
+        self.assertEqual(len(store), len(groups))
+        self.assertFalse(os.path.exists(os.path.join(self.path, "bin")))
+
+        store = ReviewStore(self.path)
+        for k, g in groups.items():
+            reviews = store.reviews(k)
+            self.assertEqual(reviews.to_reviews(), g)
+            self.assertEqual(reviews[0].date, date)
+            self.assertTrue(
+                np.shares_memory(reviews.scores, store._columns["score"]))
+            self.assertAlmostEqual(
+                store.average_summary(k).score, AverageSummary(g).score)
+        self.assertEqual(
+            [k for k, _ in store.average_summaries()], store.products)
+
+    def test_histogram(self):
+        """Test storing histogram reviews.
+        """
+        groups = [
+            (k, [HistoReview({v: 1, v + 1: 2}) for v in g])
+            for k, g in sorted(self.groups.items())]
+        groups.append(("empty", []))
+        store = ReviewStore.write(self.path, groups)
+        self.assertIsNone(store._columns.get("date"))
+        target = HistoReview(3)
+        for k, g in groups[:-1]:
+            self.assertEqual(store.histo_reviews(k), g)
+            expect = HistoSummary(g)
+            res = store.histo_summary(k)
+            self.assertAlmostEqual(res.score, expect.score)
+            self.assertAlmostEqual(
+                res.difference(target), expect.difference(target))
+            self.assertAlmostEqual(
+                store.average_summary(k).score,
+                AverageSummary([r.score for r in g]).score)
+
+        dense = store.histo_summary(groups[0][0], bins=range(8))
+        self.assertIsInstance(dense._histo, DenseHistoReview)
+        self.assertEqual(len(list(store.histo_summaries())), len(groups) - 1)
+        with self.assertRaises(ValueError):
+            _ = store.histo_summary("empty")
+
+    def test_product_ids(self):
+        """Test product IDs are kept through the metadata file.
+        """
+        store = ReviewStore.write(
+            self.path, [("a", [1.]), (np.int64(2), [2.]), (3, [3.])])
+        store = ReviewStore(self.path)
+        self.assertEqual(store.products, ["a", 2, 3])
+        self.assertEqual(store.average_summary(2).score, 2.)
+        for product in (("a", 1), 1.5, True, None):
+            with self.assertRaises(TypeError):
+                ReviewStore.write(self.path, {product: [1., 2.]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+#
+# summation_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.summation module.
+"""
+import math
+import random
+import unittest
+
+import numpy as np
+
+from review import summation
+from review.grouped import average_summaries
+from review.grouped import histo_summaries
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.parallel import summarize_many
+from review.scalar import AverageSummary
+from review.scalar import ReviewArray
+from review.summation import RunningSum
+
+
+class TestRunningSum(unittest.TestCase):
+    """Test case for RunningSum class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.values = [random.random() * 10 ** random.randint(-8, 8)
+                       for _ in range(500)]
+        self.exact = math.fsum(self.values)
+
+    def chunked(self, mode, chunksize, values=None):
+        """Sum values chunk by chunk.
+        """
+        values = self.values if values is None else values
+        s = RunningSum(mode)
+        for i in range(0, len(values), chunksize):
+            s.add(values[i:i + chunksize])
+        return s.value
+
+    def test_modes(self):
+        """Test all modes compute sums.
+        """
+        for mode in summation.MODES:
+            res = self.chunked(mode, 64)
+            self.assertAlmostEqual(res / self.exact, 1.)
+            self.assertEqual(RunningSum(mode).add(2.5).add([1, 2]).value, 5.5)
+            self.assertEqual(RunningSum(mode).value, 0.)
+        with self.assertRaises(ValueError):
+            RunningSum("unknown")
+
+    def test_fsum(self):
+        """Test fsum mode is exact regardless of order, chunking, and merging.
+        """
+        for chunksize in (1, 7, 100, 1000):
+            self.assertEqual(self.chunked(summation.FSUM, chunksize), self.exact)
+        values = list(self.values)
+        random.shuffle(values)
+        self.assertEqual(self.chunked(summation.FSUM, 13, values), self.exact)
+
+        a = RunningSum(summation.FSUM).add(self.values[:200])
+        b = RunningSum(summation.FSUM).add(self.values[200:])
+        self.assertEqual(b.merge(a).value, self.exact)
+        self.assertEqual(
+            summation.total([1e100, 1., -1e100], summation.FSUM), 1.)
+
+    def test_kahan(self):
+        """Test kahan mode compensates rounding errors.
+        """
+        values = [1., 1e100, 1., -1e100] * 100
+        self.assertEqual(summation.total(values, summation.KAHAN), 200.)
+        self.assertEqual(summation.total(values, summation.NAIVE), 0.)
+
+        a = RunningSum(summation.KAHAN).add(values[:101])
+        b = RunningSum(summation.KAHAN).add(values[101:])
+        self.assertEqual(a.merge(b).value, 200.)
+
+    def test_vector(self):
+        """Test running sums of vectors.
+        """
+        rows = np.random.rand(50, 4)
+        for mode in summation.MODES:
+            s = RunningSum(mode, 4)
+            s.add(rows[:20]).add(rows[20])
+            s.merge(RunningSum(mode, 4).add(rows[21:]))
+            np.testing.assert_allclose(s.value, rows.sum(axis=0))
+            with self.assertRaises(ValueError):
+                s.add(np.zeros(3))
+        with self.assertRaises(ValueError):
+            RunningSum(summation.FSUM, 4).merge(RunningSum(summation.KAHAN, 4))
+
+    def test_partials(self):
+        """Test partial sums of fsum running sums.
+        """
+        a = RunningSum(summation.FSUM).add(self.values[:200])
+        b = RunningSum(summation.FSUM).add(self.values[200:])
+        self.assertEqual(
+            math.fsum(summation.add_partials(a.partials, b.partials)),
+            self.exact)
+        self.assertEqual(
+            math.fsum(summation.subtract_partials(
+                summation.add_partials(a.partials, b.partials), b.partials)),
+            a.value)
+        self.assertIsNone(RunningSum(summation.KAHAN).partials)
+
+    def test_group_totals(self):
+        """Test sums of groups in each mode.
+        """
+        groups = np.array([2, 0, 2, 2, 0])
+        values = np.array([1e100, 1., 1., -1e100, 2.])
+        for mode in summation.MODES:
+            sums, partials = summation.group_totals(groups, values, 4, mode)
+            self.assertEqual(sums[0], 3.)
+            self.assertEqual(sums[1], 0.)
+            self.assertEqual(partials is None, mode != summation.FSUM)
+        sums, partials = summation.group_totals(
+            groups, values, 3, summation.FSUM)
+        self.assertEqual(sums[2], 1.)
+        self.assertEqual(partials[1], [])
+
+
+class TestSummaries(unittest.TestCase):
+    """Test case for summaries with summation modes.
+    """
+
+    def test_average_summary(self):
+        """Test fsum mode gives the same score for any chunk size.
+        """
+        scores = [random.random() for _ in range(1000)]
+        expect = math.fsum(scores) / len(scores)
+        for chunksize in (1, 10, 333, 1024):
+            s = AverageSummary.from_stream(
+                scores, chunksize=chunksize, summation=summation.FSUM)
+            self.assertEqual(s.score, expect)
+
+    def test_histo_summary(self):
+        """Test fsum mode gives the same histogram for any order of reviews.
+        """
+        reviews = [
+            HistoReview({random.randint(1, 5): random.random()})
+            for _ in range(300)]
+        bins = list(range(1, 6))
+        expect = HistoSummary.from_stream(reviews, summation=summation.FSUM)
+        random.shuffle(reviews)
+        for b in (None, bins):
+            res = HistoSummary.from_stream(
+                iter(reviews), bins=b, summation=summation.FSUM)
+            for k in expect._histo:
+                self.assertEqual(res._histo[k], expect._histo[k])
+
+    def test_merge(self):
+        """Test merging fsum summaries of shards is exact.
+        """
+        scores = np.random.rand(3000) * 5
+        whole = AverageSummary(scores, summation.FSUM)
+        self.assertEqual(whole.score, math.fsum(scores) / len(scores))
+        merged = AverageSummary(ReviewArray(scores[:1000]), summation.FSUM)
+        for shard in (scores[1000:1500], scores[1500:]):
+            merged = merged + AverageSummary(shard.tolist(), summation.FSUM)
+        self.assertEqual(merged.score, whole.score)
+        self.assertEqual(
+            (merged - AverageSummary(scores[1000:], summation.FSUM)).score,
+            AverageSummary(scores[:1000], summation.FSUM).score)
+
+        reviews = [
+            HistoReview({random.randint(1, 5): random.random()})
+            for _ in range(300)]
+        whole = HistoSummary(reviews, summation=summation.FSUM)
+        merged = HistoSummary(reviews[:100], summation=summation.FSUM) + \
+            HistoSummary(reviews[100:], range(1, 6), summation.FSUM)
+        for k in whole._histo:
+            self.assertEqual(merged._histo[k], whole._histo[k])
+
+    def test_shards(self):
+        """Test sharded summaries give bit for bit the same results.
+        """
+        scores = np.random.rand(2000) * 5
+        whole = summarize_many(
+            [scores], AverageSummary, summation=summation.FSUM)[0]
+        shards = summarize_many(
+            [scores[:700], scores[700:]], AverageSummary, workers=2,
+            summation=summation.FSUM)
+        self.assertEqual((shards[0] + shards[1]).score, whole.score)
+
+        ratings = [
+            HistoReview({random.randint(1, 5): random.random()})
+            for _ in range(300)]
+        whole = summarize_many(
+            [ratings], HistoSummary, summation=summation.FSUM)[0]
+        shards = summarize_many(
+            [ratings[:120], ratings[120:]], HistoSummary,
+            summation=summation.FSUM)
+        merged = shards[0] + shards[1]
+        for k in whole._histo:
+            self.assertEqual(merged._histo[k], whole._histo[k])
+        with self.assertRaises(ValueError):
+            summarize_many([scores], AverageSummary, summation="unknown")
+
+        products = np.random.randint(0, 5, len(scores))
+        whole = average_summaries(products, scores, summation=summation.FSUM)
+        left = average_summaries(
+            products[:900], scores[:900], summation=summation.FSUM)
+        right = average_summaries(
+            products[900:], scores[900:], summation=summation.FSUM)
+        for p in whole:
+            self.assertEqual((left[p] + right[p]).score, whole[p].score)
+
+        ratings = np.random.randint(1, 6, len(scores))
+        whole = histo_summaries(
+            products, ratings, scores, summation=summation.FSUM)
+        left = histo_summaries(
+            products[:900], ratings[:900], scores[:900], bins=range(1, 6),
+            summation=summation.FSUM)
+        right = histo_summaries(
+            products[900:], ratings[900:], scores[900:], bins=range(1, 6),
+            summation=summation.FSUM)
+        for p in whole:
+            np.testing.assert_array_equal(
+                (left[p] + right[p]).total.array, whole[p].total.array)
+
+
+if __name__ == "__main__":
+    unittest.main()
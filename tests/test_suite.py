@@ -28,10 +28,23 @@ import unittest
 
 TESTS = (
     "tests.scalar_test",
-    "tests.histogram_test"
+    "tests.histogram_test",
+    "tests.timeline_test",
+    "tests.quantizer_test",
+    "tests.parallel_test",
+    "tests.serialize_test",
+    "tests.store_test",
+    "tests.instrument_test",
+    "tests.summation_test",
+    "tests.grouped_test",
+    "tests.sketch_test",
+    "tests.approximate_test"
 )
 """Collection of test modules."""
 
+if sys.version_info >= (3, 5):
+    TESTS += ("tests.aio_test",)
+
 
 def suite():
     """Returns a test suite.
@@ -0,0 +1,154 @@
+#
+# timeline_test.py
+#
+# Copyright (c) 2016-2017 Junpei Kawamoto
+#
+# This file is part of rgmining-review.
+#
+# rgmining-review is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# rgmining-review is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Foobar.  If not, see <http://www.gnu.org/licenses/>.
+#
+"""Unit tests for review.timeline module.
+"""
+import datetime
+import random
+import unittest
+
+import numpy as np
+
+from review.histogram import HistoReview
+from review.histogram import HistoSummary
+from review.scalar import AverageReview
+from review.scalar import AverageSummary
+from review.timeline import AverageTimeline
+from review.timeline import HistoTimeline
+
+
+def _date(day):
+    """Date of a given day in January 2017.
+    """
+    return datetime.datetime(2017, 1, 1) + datetime.timedelta(days=day)
+
+
+class TestAverageTimeline(unittest.TestCase):
+    """Test case for AverageTimeline class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            AverageReview(random.random(), _date(random.randint(0, 30)))
+            for _ in range(50)]
+        self.timeline = AverageTimeline(self.reviews)
+
+    def expect(self, start, end):
+        """Summary of reviews posted in a period computed by scanning.
+        """
+        return AverageSummary(
+            [r for r in self.reviews if start <= r.date <= end])
+
+    def test_window(self):
+        """Test window method.
+        """
+        for _ in range(10):
+            start = _date(random.randint(0, 15))
+            end = _date(random.randint(15, 30))
+            self.assertAlmostEqual(
+                self.timeline.window(start, end).score,
+                self.expect(start, end).score)
+        self.assertEqual(self.timeline.count(), len(self.reviews))
+
+    def test_at(self):
+        """Test at method.
+        """
+        t = _date(random.randint(15, 30))
+        self.assertAlmostEqual(
+            self.timeline.at(t).score, self.expect(_date(0), t).score)
+        with self.assertRaises(ValueError):
+            _ = self.timeline.at(_date(-1))
+
+    def test_last(self):
+        """Test last method.
+        """
+        now = _date(20)
+        res = self.timeline.last(7, now)
+        self.assertAlmostEqual(
+            res.score,
+            self.expect(_date(13) + datetime.timedelta(microseconds=1), now).score)
+        self.assertAlmostEqual(
+            res.score, self.timeline.last(datetime.timedelta(days=7), now).score)
+
+    def test_decayed(self):
+        """Test decayed method.
+        """
+        t = _date(25)
+        weights = [
+            2 ** (-(t - r.date).days / 3.) for r in self.reviews if r.date <= t]
+        scores = [r.score for r in self.reviews if r.date <= t]
+        self.assertAlmostEqual(
+            self.timeline.decayed(t, 3).score,
+            np.average(scores, weights=weights))
+
+    def test_create_without_dates(self):
+        """Test __init__ method with reviews without dates.
+        """
+        with self.assertRaises(ValueError):
+            _ = AverageTimeline([AverageReview(1.), AverageReview(2., _date(1))])
+
+
+class TestHistoTimeline(unittest.TestCase):
+    """Test case for HistoTimeline class.
+    """
+
+    def setUp(self):
+        """Set up for tests.
+        """
+        self.reviews = [
+            HistoReview(random.randint(1, 5), date=_date(random.randint(0, 30)))
+            for _ in range(50)]
+        self.timeline = HistoTimeline(self.reviews)
+
+    def test_window(self):
+        """Test window method.
+        """
+        start, end = _date(5), _date(20)
+        expect = HistoSummary(
+            [r for r in self.reviews if start <= r.date <= end])
+        res = self.timeline.window(start, end)
+        self.assertAlmostEqual(res.score, expect.score)
+        target = HistoReview(random.randint(1, 5))
+        self.assertAlmostEqual(
+            res.difference(target), expect.difference(target))
+
+    def test_decayed(self):
+        """Test decayed method.
+        """
+        t = _date(25)
+        reviews = [r for r in self.reviews if r.date <= t]
+        weights = [2 ** (-(t - r.date).days / 3.) for r in reviews]
+        expect = np.average(
+            [r.score for r in reviews], weights=weights)
+        self.assertAlmostEqual(self.timeline.decayed(t, 3).score, expect)
+
+    def test_create_with_bins(self):
+        """Test __init__ method with bins.
+        """
+        timeline = HistoTimeline(self.reviews, bins=range(1, 6))
+        self.assertEqual(len(timeline.bins), 5)
+        with self.assertRaises(ValueError):
+            _ = HistoTimeline(self.reviews, bins=range(1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()